@@ -0,0 +1,349 @@
+"""
+Versioned on-disk artifact for the fitted scaler and random forest.
+
+Build it once with ``python artifact.py --data dataset.csv`` and the API will
+load it at startup instead of downloading the CSV and retraining. After rows
+are appended to the CSV, ``python artifact.py --incremental`` updates the
+existing artifact instead of refitting every tree.
+
+Next to the joblib file, save_artifact writes a flat-forest companion
+(``<path>.flat.npz``) holding only NumPy arrays, with the scaler folded in.
+The flat engine serves from it without importing sklearn, pandas or scipy,
+which is most of a cold start (see load_flat_artifact). A quantized compact
+companion (``<path>.compact.npz``, see compact_forest.py) is written the same
+way for the compact engine. The table engine serves from a prediction table
+(``<path>.table.npz``, see prediction_table.py), written on request with
+``python artifact.py --table`` or ``python prediction_table.py``, with the flat
+companion as its fallback outside the grid.
+
+The companions are written before the joblib file and a small JSON manifest
+(``<path>.manifest.json``) naming the model is written last. A companion is
+only served when its created_at and data_hash match the manifest, and
+ModelHolder.watch reloads when the manifest changes, so a reader never pairs a
+companion with a model it was not exported from.
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+ARTIFACT_FORMAT = "fireshield-model"
+ARTIFACT_VERSION = 1
+DEFAULT_ARTIFACT_PATH = os.environ.get("FIRESHIELD_MODEL_PATH", "fire_model.joblib")
+
+
+def save_artifact(model, scaler, features: list, data_hash: str, path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """
+    Write the fitted scaler and model plus their metadata to ``path``.
+
+    Companions are only exported for forests of decision trees (see
+    flat_forest.is_tree_ensemble); other models, such as the gradient boosting
+    candidates of tune.py, are saved without them and can only be served with
+    the sklearn engine.
+    """
+    import joblib
+    from flat_forest import is_tree_ensemble
+
+    payload = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "features": list(features),
+        "classes": [str(label) for label in model.classes_],
+        "data_hash": data_hash,
+        "scaler": scaler,
+        "model": model,
+    }
+    # Companions first, then the joblib file, then the manifest that makes them current
+    if is_tree_ensemble(model):
+        save_flat_artifact(payload, path)
+        save_compact_artifact(payload, path)
+    # Uncompressed, so loading skips a decompression pass. The trees copy their node arrays
+    # into memory when unpickled, so load_artifact's mmap only maps plain arrays (the scaler
+    # statistics); the NumPy companions are what keep serving workers small.
+    tmp_path = _tmp_path(path)
+    try:
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        _discard(tmp_path)
+    _write_manifest(payload, path)
+    return path
+
+
+def _tmp_path(path: str, suffix: str = "") -> str:
+    """A temporary name next to ``path`` that no other writer (process or thread) uses."""
+    return f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp{suffix}"
+
+
+def _discard(tmp_path: str) -> None:
+    """Remove a temporary file left behind by a failed write."""
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def manifest_path(path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Where the manifest naming the model in the artifact at ``path`` lives."""
+    return f"{path}.manifest.json"
+
+
+def _write_manifest(payload: dict, path: str) -> None:
+    tmp_path = _tmp_path(manifest_path(path))
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(_companion_metadata(payload), f)
+        os.replace(tmp_path, manifest_path(path))
+    finally:
+        _discard(tmp_path)
+
+
+def read_manifest(path: str = DEFAULT_ARTIFACT_PATH):
+    """The metadata of the model last saved to ``path`` (created_at, data_hash, ...), or None."""
+    try:
+        with open(manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flat_artifact_path(path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Where the sklearn-free flat-forest companion of the artifact at ``path`` lives."""
+    return f"{path}.flat.npz"
+
+
+def _companion_metadata(payload: dict) -> dict:
+    return {"format": ARTIFACT_FORMAT, "version": ARTIFACT_VERSION, "created_at": payload["created_at"],
+            "data_hash": payload["data_hash"], "features": ",".join(payload["features"])}
+
+
+def _is_current(metadata: dict, path: str) -> bool:
+    """Whether companion ``metadata`` describes the model the manifest of ``path`` names."""
+    manifest = read_manifest(path)
+    return (manifest is not None and metadata.get("format") == ARTIFACT_FORMAT
+            and metadata.get("version") == str(ARTIFACT_VERSION)
+            and metadata.get("created_at") == manifest.get("created_at")
+            and metadata.get("data_hash") == manifest.get("data_hash"))
+
+
+def _save_companion(companion, payload: dict, companion_path: str) -> None:
+    tmp_path = _tmp_path(companion_path, ".npz")
+    try:
+        companion.save(tmp_path, **_companion_metadata(payload))
+        os.replace(tmp_path, companion_path)
+    finally:
+        _discard(tmp_path)
+
+
+def save_flat_artifact(payload: dict, path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Export the forest in ``payload`` (as loaded by load_artifact) to its flat companion file."""
+    from flat_forest import FlatForest
+
+    flat_path = flat_artifact_path(path)
+    _save_companion(FlatForest.from_sklearn(payload["model"], payload["scaler"]), payload, flat_path)
+    return flat_path
+
+
+def load_flat_artifact(path: str = DEFAULT_ARTIFACT_PATH):
+    """
+    Load the flat companion of the artifact at ``path``, using NumPy only.
+
+    Returns:
+        tuple: (FlatForest, metadata dict with created_at, data_hash, features), or None
+        when there is no companion or the manifest names another model (a save is under
+        way, or the artifact predates manifests); callers then fall back to load_artifact.
+    """
+    from flat_forest import FlatForest
+
+    flat_path = flat_artifact_path(path)
+    if not os.path.exists(flat_path):
+        return None
+    flat, metadata = FlatForest.load(flat_path)
+    return (flat, metadata) if _is_current(metadata, path) else None
+
+
+def compact_artifact_path(path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Where the quantized compact-forest companion of the artifact at ``path`` lives."""
+    return f"{path}.compact.npz"
+
+
+def save_compact_artifact(payload: dict, path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Export the forest in ``payload`` (as loaded by load_artifact) to its compact companion file."""
+    from compact_forest import CompactForest
+    from flat_forest import FlatForest
+
+    compact_path = compact_artifact_path(path)
+    _save_companion(CompactForest.from_flat(FlatForest.from_sklearn(payload["model"], payload["scaler"])),
+                    payload, compact_path)
+    return compact_path
+
+
+def load_compact_artifact(path: str = DEFAULT_ARTIFACT_PATH):
+    """
+    Load the compact companion of the artifact at ``path``, using NumPy only.
+
+    Returns:
+        tuple: (CompactForest, metadata dict), or None under the same conditions as
+        load_flat_artifact.
+    """
+    from compact_forest import CompactForest
+
+    compact_path = compact_artifact_path(path)
+    if not os.path.exists(compact_path):
+        return None
+    compact, metadata = CompactForest.load(compact_path)
+    return (compact, metadata) if _is_current(metadata, path) else None
+
+
+def table_artifact_path(path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Where the prediction-table companion of the artifact at ``path`` lives."""
+    return f"{path}.table.npz"
+
+
+def save_table_artifact(payload: dict, path: str = DEFAULT_ARTIFACT_PATH, grid: str = None, mode: str = None,
+                        table=None):
+    """
+    Write a prediction table for the forest in ``payload`` as the table companion of ``path``.
+
+    Parameters:
+        grid, mode: Table grid and lookup mode (default: FIRESHIELD_TABLE_GRID / FIRESHIELD_TABLE_MODE).
+        table (PredictionTable): Already built table to write, e.g. ForestFireModel.tabulate();
+            otherwise one is built, with the cached training rows (if any) as error probe.
+
+    Returns:
+        PredictionTable: The table written.
+    """
+    import numpy as np
+    from flat_forest import FlatForest
+    from prediction_table import DEFAULT_TABLE_GRID, DEFAULT_TABLE_MODE, PredictionTable
+
+    if table is None:
+        model, scaler = payload["model"], payload["scaler"]
+        probe = None
+        if os.path.exists(training_cache_path(path)):
+            with np.load(training_cache_path(path)) as cache:
+                probe = cache["X"]
+        table = PredictionTable.build(FlatForest.from_sklearn(model, scaler), grid or DEFAULT_TABLE_GRID,
+                                      lambda X: model.predict_proba(scaler.transform(X)), probe,
+                                      mode or DEFAULT_TABLE_MODE)
+    _save_companion(table, payload, table_artifact_path(path))
+    return table
+
+
+def load_table_artifact(path: str = DEFAULT_ARTIFACT_PATH, grid: str = None, mode: str = None):
+    """
+    Load the prediction table of the artifact at ``path``, with its flat companion as fallback.
+
+    Returns:
+        tuple: (PredictionTable, metadata dict), or None when either companion is missing
+        or not current (see load_flat_artifact), or the table covers another grid.
+    """
+    from prediction_table import DEFAULT_TABLE_GRID, DEFAULT_TABLE_MODE, PredictionTable, format_grid, parse_grid
+
+    lean = load_flat_artifact(path)
+    table_path = table_artifact_path(path)
+    if lean is None or not os.path.exists(table_path):
+        return None
+    table, metadata = PredictionTable.load(table_path, lean[0], mode or DEFAULT_TABLE_MODE)
+    if not _is_current(metadata, path) or table.grid != format_grid(*parse_grid(grid or DEFAULT_TABLE_GRID)):
+        return None
+    return table, metadata
+
+
+def load_artifact(path: str = DEFAULT_ARTIFACT_PATH, mmap: bool = True) -> dict:
+    """
+    Load an artifact written by save_artifact.
+
+    Parameters:
+        path (str): Artifact file.
+        mmap (bool): Memory-map plain numpy arrays such as the scaler statistics instead of
+            reading them into RAM. Tree node arrays are always copied into memory by sklearn.
+
+    Returns:
+        dict: The artifact payload (model, scaler, features, classes, data_hash, ...).
+    """
+    import joblib
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Model artifact not found at {path!r}. Build it with "
+            f"`python artifact.py --output {path}` or set FIRESHIELD_RETRAIN=1."
+        )
+
+    payload = joblib.load(path, mmap_mode="r" if mmap else None)
+    if not isinstance(payload, dict) or payload.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{path!r} is not a FireShield model artifact")
+    if payload.get("version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact version {payload.get('version')!r} in {path!r} "
+            f"(expected {ARTIFACT_VERSION}); rebuild it with `python artifact.py`"
+        )
+    if [str(label) for label in payload["model"].classes_] != payload["classes"]:
+        raise ValueError(f"Class order stored in {path!r} does not match the fitted model")
+    return payload
+
+
+def training_cache_path(path: str = DEFAULT_ARTIFACT_PATH) -> str:
+    """Where the training rows behind the artifact at ``path`` are cached for incremental updates."""
+    return f"{path}.train.npz"
+
+
+def build_artifact(data_url: str, path: str = DEFAULT_ARTIFACT_PATH, incremental: bool = False,
+                   new_trees: int = 10, table: bool = False) -> dict:
+    """
+    Train ForestFireModel on ``data_url`` and persist it to ``path``.
+
+    Parameters:
+        incremental (bool): Update the artifact already at ``path`` with the rows appended
+            to ``data_url`` since it was built (see ForestFireModel.train_incremental).
+            Local CSV files only; falls back to a full retrain when that is not possible.
+        new_trees (int): Trees added per incremental update.
+        table (bool): Also tabulate the forest for the table engine (see prediction_table.py).
+    """
+    from model import ForestFireModel
+
+    cache_path = training_cache_path(path)
+    if incremental and os.path.exists(path):
+        # Not memory-mapped: the update changes the scaler statistics and split thresholds
+        previous = load_artifact(path, mmap=False)
+        fire_model = ForestFireModel.from_fitted(data_url, previous["model"], previous["scaler"],
+                                                 previous["data_hash"])
+        if fire_model.train_incremental(cache_path, new_trees) == 0:
+            return previous
+    else:
+        fire_model = ForestFireModel(data_url=data_url)
+        fire_model.train(cache_path if "://" not in data_url else None)
+    save_artifact(fire_model.model, fire_model.scaler, fire_model.features, fire_model.data_hash, path)
+    payload = load_artifact(path)
+    if table:
+        save_table_artifact(payload, path, table=fire_model.tabulate())
+    return payload
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train the fire model and write a versioned artifact.")
+    parser.add_argument("--data", default="dataset.csv", help="CSV path or URL to train on")
+    parser.add_argument("--output", default=DEFAULT_ARTIFACT_PATH, help="Where to write the artifact")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the existing artifact with rows appended to --data since it was built")
+    parser.add_argument("--new-trees", type=int, default=10, help="Trees added per incremental update")
+    parser.add_argument("--table", action="store_true",
+                        help="Also write a prediction table for FIRESHIELD_ENGINE=table (FIRESHIELD_TABLE_GRID)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    payload = build_artifact(args.data, args.output, args.incremental, args.new_trees, args.table)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Model artifact v{payload['version']} saved to: {args.output} ({elapsed:.1f}s)")
+    print(f"   features: {payload['features']}")
+    print(f"   classes:  {payload['classes']}")
+    print(f"   trees:    {len(getattr(payload['model'], 'estimators_', []))}")
+    print(f"   data:     sha256:{payload['data_hash']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Async micro-batching for single-row predictions.
+
+Concurrent /predict calls are queued and gathered for up to ``max_wait_ms``
+(or until ``max_batch_size`` rows are waiting), scored with one vectorized
+call on a worker thread, and each caller gets its own row of the result.
+While one batch is being scored the next one fills up, so batch size grows
+with load; an idle server adds at most ``max_wait_ms`` to a request. Batch
+sizes and queue depths are recorded in histograms on metrics.REGISTRY, so
+they are exported at /metrics.
+"""
+import asyncio
+
+import numpy as np
+
+from metrics import BATCH_QUEUE_DEPTH, BATCH_SIZE
+
+
+class MicroBatcher:
+    """
+    Gathers single-row requests into batches for ``predict_fn``.
+
+    Parameters:
+        predict_fn: Called with an (n, n_features) float64 array; returns a tuple of
+            length-n arrays (e.g. fire and not-fire probabilities).
+        max_batch_size (int): Rows per batch at most.
+        max_wait_ms (float): How long the first row of a batch waits for company.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_depth = 0
+        self._queue = None
+        self._loop = None
+        self._task = None
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, row):
+        """Queue one feature row and wait for its share of the batch result."""
+        self._ensure_running()
+        future = self._loop.create_future()
+        self._queue.put_nowait((row, future))
+        return await future
+
+    async def _collect(self) -> list:
+        items = [await self._queue.get()]
+        depth = self._queue.qsize() + 1
+        BATCH_QUEUE_DEPTH.observe(depth)
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+        deadline = self._loop.time() + self.max_wait
+        while len(items) < self.max_batch_size:
+            if not self._queue.empty():
+                items.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self) -> None:
+        while True:
+            items = await self._collect()
+            BATCH_SIZE.observe(len(items))
+            rows = np.array([row for row, _ in items], dtype=np.float64)
+            try:
+                results = await asyncio.to_thread(self.predict_fn, rows)
+            except Exception as exc:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for i, (_, future) in enumerate(items):
+                if not future.done():
+                    future.set_result(tuple(float(column[i]) for column in results))
+
+    def stats(self) -> dict:
+        """Settings, the current and largest queue depth, and the process-wide batch count and mean size."""
+        batches = BATCH_SIZE.summary()
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": batches["count"],
+            "mean_batch_size": round(batches["sum"] / batches["count"], 3) if batches["count"] else 0.0,
+        }
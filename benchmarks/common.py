@@ -0,0 +1,62 @@
+"""
+Benchmark registry and the timing helpers shared by every benchmark module.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def summarize(samples_s) -> dict:
+    """Latency distribution in milliseconds."""
+    ms = np.asarray(samples_s) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p90_ms": round(float(np.percentile(ms, 90)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+def time_calls(func, repeat: int, warmup: int = 5) -> list:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_python(code: str, env: dict = None) -> str:
+    """Run ``code`` in a fresh interpreter at the repo root and return its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        cwd=ROOT, env={**os.environ, **(env or {})}, capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def random_features(n: int, seed: int = 0) -> np.ndarray:
+    """Rows shaped like dataset.csv: Temperature, RH, WS, Rain."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(20, 46, n),
+        rng.integers(20, 91, n),
+        rng.integers(6, 31, n),
+        rng.integers(0, 200, n) / 10,
+    ]).astype(np.float64)
@@ -0,0 +1,166 @@
+"""
+Inference engine benchmarks: the compact forest and the prediction table
+against the sklearn and flat forests.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import ROOT, benchmark, random_features, run_python, summarize, time_calls
+
+
+_WORKER_MEMORY = """
+import json, os, time
+t = time.perf_counter()
+from serving_model import ServingModel
+serving_model = ServingModel.from_artifact({path!r}, {engine!r})
+load_s = time.perf_counter() - t
+with open(f"/proc/{{os.getpid()}}/status") as f:
+    rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+print(json.dumps({{"load_s": load_s, "rss_kb": rss_kb}}))
+"""
+
+
+@benchmark
+def compact_model(args) -> dict:
+    """
+    Quantized compact forest against the sklearn forest and the flat forest:
+    accuracy on dataset.csv and agreement on random rows, size on disk and in
+    memory, per-process RSS and load time, and single-row / batch latency.
+    Fails if the compact forest reaches a different leaf than the flat forest
+    or drifts from sklearn by more than its quantization bound.
+    """
+    import tempfile
+    import joblib
+    import pandas as pd
+    from artifact import DEFAULT_ARTIFACT_PATH, load_artifact
+    from compact_forest import CompactForest
+    from flat_forest import FlatForest
+
+    payload = load_artifact(DEFAULT_ARTIFACT_PATH, mmap=False)
+    model, scaler = payload["model"], payload["scaler"]
+    flat = FlatForest.from_sklearn(model, scaler)
+    compacts = {"compact_uint8": CompactForest.from_flat(flat, np.uint8),
+                "compact_uint16": CompactForest.from_flat(flat, np.uint16)}
+
+    X = random_features(20_000 if args.quick else 100_000, seed=7)
+    X[::103, 0] += 0.5  # off the integer grid
+    expected = model.predict_proba(scaler.transform(X))
+    # sklearn rejects NaN, so missing values are only checked against the flat forest
+    with_gaps = X.copy()
+    with_gaps[::101, 2] = np.nan
+    leaves = flat.apply(with_gaps)
+    dataset = pd.read_csv(os.path.join(ROOT, "dataset.csv"))
+    dataset.columns = dataset.columns.str.strip()
+    data_X = dataset[payload["features"]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    data_y = dataset["Result"].astype(str).str.strip().str.lower().to_numpy()
+    known = ~np.isnan(data_X).any(axis=1)
+    data_X, data_y = data_X[known], data_y[known]
+    classes = np.array([str(label).strip() for label in model.classes_])
+
+    def accuracy(probs):
+        return round(float((classes[probs.argmax(axis=1)] == data_y).mean()), 4)
+
+    engines = {"sklearn": lambda rows: model.predict_proba(scaler.transform(rows)),
+               "flat": flat.predict_proba,
+               **{name: compact.predict_proba for name, compact in compacts.items()}}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        joblib_path = os.path.join(tmp, "model.joblib")
+        joblib.dump({"model": model, "scaler": scaler}, joblib_path)
+        disk = {"sklearn": joblib_path, "flat": os.path.join(tmp, "flat.npz")}
+        flat.save(disk["flat"])
+        for name, compact in compacts.items():
+            disk[name] = os.path.join(tmp, f"{name}.npz")
+            compact.save(disk[name])
+        tree_bytes = sum(estimator.tree_.__getstate__()["nodes"].nbytes + estimator.tree_.value.nbytes
+                         for estimator in model.estimators_)
+        memory = {"sklearn": tree_bytes, "flat": sum(getattr(flat, name).nbytes for name in flat._ARRAYS),
+                  **{name: compact.nbytes for name, compact in compacts.items()}}
+
+        for name, predict in engines.items():
+            single = X[:1]
+            batch = X[:10_000]
+            results[name] = {
+                "dataset_accuracy": accuracy(predict(data_X)),
+                "disk_kb": round(os.path.getsize(disk[name]) / 1024, 1),
+                "node_memory_kb": round(memory[name] / 1024, 1),
+                "single_row": summarize(time_calls(lambda: predict(single), args.repeat)),
+                "batch_10k": summarize(time_calls(lambda: predict(batch), 5 if args.quick else 20)),
+            }
+            if name.startswith("compact"):
+                compact = compacts[name]
+                probs = predict(X)
+                error = float(np.abs(probs - expected).max())
+                if not np.array_equal(compact.apply(with_gaps), leaves):
+                    raise AssertionError(f"{name} reached different leaves than the flat forest")
+                if error > compact.max_quantization_error() + 1e-12:
+                    raise AssertionError(f"{name} differs from sklearn by {error}, more than its "
+                                         f"quantization bound {compact.max_quantization_error()}")
+                results[name]["max_probability_error"] = error
+                results[name]["label_agreement"] = round(float(
+                    (probs.argmax(axis=1) == expected.argmax(axis=1)).mean()), 6)
+
+    for engine in ("sklearn", "flat", "compact"):
+        # The first start writes a missing companion file; measure the one after it
+        run_python(_WORKER_MEMORY.format(path=DEFAULT_ARTIFACT_PATH, engine=engine))
+        out = json.loads(run_python(_WORKER_MEMORY.format(path=DEFAULT_ARTIFACT_PATH, engine=engine)))
+        results["compact_uint8" if engine == "compact" else engine].update(
+            worker_rss_mb=round(out["rss_kb"] / 1024, 1), load_s=round(out["load_s"], 4))
+    results["node_memory_ratio"] = round(memory["sklearn"] / memory["compact_uint8"], 1)
+    return results
+
+
+@benchmark
+def prediction_table(args) -> dict:
+    """
+    Tabulated inference over the default grid: build time and size, error
+    against the forest per lookup mode, and single-row / batch latency next to
+    the flat and sklearn forests. Fails unless the table reproduces the forest
+    on grid points and rows off the grid fall back to the forest.
+    """
+    from artifact import DEFAULT_ARTIFACT_PATH, load_artifact
+    from flat_forest import FlatForest
+    from prediction_table import TABLE_MODES, PredictionTable
+
+    payload = load_artifact(DEFAULT_ARTIFACT_PATH, mmap=False)
+    model, scaler = payload["model"], payload["scaler"]
+    flat = FlatForest.from_sklearn(model, scaler)
+
+    start = time.perf_counter()
+    table = PredictionTable.build(flat, predict_proba=lambda X: model.predict_proba(scaler.transform(X)))
+    build_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(3)
+    grid_points = table.start + rng.integers(0, table.count, (50_000 if args.quick else 200_000, 4)) * table.step
+    expected = flat.predict_proba(grid_points)
+    for mode in TABLE_MODES:
+        error = float(np.abs(table.lookup(grid_points, mode) - expected).max())
+        if error > 1e-9:
+            raise AssertionError(f"{mode} table differs from the forest by {error} on grid points")
+    outside = random_features(5_000, seed=4)
+    outside[:, 0] += 30  # Temperature beyond the grid
+    outside[::7, 3] = np.nan
+    if not np.array_equal(table.predict_proba(outside), flat.predict_proba(outside)):
+        raise AssertionError("Rows off the grid were not scored by the forest")
+
+    rows = random_features(10_000, seed=8)
+    single = rows[:1]
+    engines = {"sklearn": lambda X: model.predict_proba(scaler.transform(X)), "flat": flat.predict_proba}
+    for mode in TABLE_MODES:
+        engines[f"table_{mode}"] = PredictionTable(table.values, table.scale, table.start, table.step,
+                                                   table.classes_, flat, mode).predict_proba
+    latency = {name: {"single_row": summarize(time_calls(lambda: predict(single), args.repeat)),
+                      "batch_10k": summarize(time_calls(lambda: predict(rows), 5 if args.quick else 20))}
+               for name, predict in engines.items()}
+    return {
+        "grid": table.grid,
+        "cells": int(table.values.size),
+        "table_mb": round(table.nbytes / 2**20, 2),
+        "dtype": str(table.values.dtype),
+        "build_s": round(build_s, 3),
+        "error": table.report,
+        "latency": latency,
+    }
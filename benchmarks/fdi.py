@@ -0,0 +1,103 @@
+"""
+FDI benchmarks: scalar against vectorized, and fdi.py against the legacy implementations.
+"""
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.common import benchmark, time_calls
+
+
+@benchmark
+def fdi_vectorized(args) -> dict:
+    """Scalar fdi() in a Python loop versus fdi_array() over the same inputs."""
+    from fdi import fdi, fdi_array
+
+    n = 10_000 if args.quick else 100_000
+    rng = np.random.default_rng(1)
+    temperature = rng.uniform(0, 45, n)
+    humidity = rng.uniform(5, 100, n)
+    wind = rng.uniform(0, 60, n)
+    days = rng.integers(0, 30, n)
+    rain = rng.uniform(0, 90, n)
+    rows = list(zip(temperature.tolist(), humidity.tolist(), wind.tolist(), days.tolist(), rain.tolist()))
+
+    start = time.perf_counter()
+    scalar = [fdi(*row) for row in rows]
+    scalar_s = time.perf_counter() - start
+
+    samples = time_calls(lambda: fdi_array(temperature, humidity, wind, days, rain), repeat=10, warmup=1)
+    vector = fdi_array(temperature, humidity, wind, days, rain)
+    vector_s = statistics.median(samples)
+
+    return {
+        "n": n,
+        "scalar_s": round(scalar_s, 4),
+        "vectorized_s": round(vector_s, 4),
+        "scalar_ns_per_point": round(scalar_s / n * 1e9, 1),
+        "vectorized_ns_per_point": round(vector_s / n * 1e9, 1),
+        "speedup": round(scalar_s / vector_s, 1),
+        "identical": bool(np.array_equal(np.asarray(scalar), vector)),
+    }
+
+
+@benchmark
+def fdi_implementations(args) -> dict:
+    """fdi.fdi versus the original if/elif ladder (inputs kept where their clamping rules agree)."""
+    import fdi as fdi_module
+    from benchmarks.legacy_fdi import ladder_fdi
+
+    n = 20_000 if args.quick else 200_000
+    rng = np.random.default_rng(2)
+    rows = list(zip(
+        rng.uniform(0, 45, n).tolist(),
+        rng.uniform(5, 100, n).tolist(),
+        rng.uniform(3, 60, n).tolist(),
+        rng.integers(1, 30, n).tolist(),
+        rng.uniform(1, 90, n).tolist(),
+    ))
+
+    results = {"n": n}
+    outputs = {}
+    for name, func in (("fdi", fdi_module.fdi), ("fire_danger_index", ladder_fdi)):
+        start = time.perf_counter()
+        outputs[name] = [func(*row) for row in rows]
+        elapsed = time.perf_counter() - start
+        results[name] = {"total_s": round(elapsed, 4), "ns_per_call": round(elapsed / n * 1e9, 1)}
+    results["identical"] = outputs["fdi"] == outputs["fire_danger_index"]
+    return results
+
+
+@benchmark
+def fdi_scalar_lookup(args) -> dict:
+    """
+    Scalar fdi() with precomputed tables versus the former list-scanning version
+    and the original if/elif ladder (their equivalence is tests/test_fdi.py's job).
+    The tables should match the ladder's speed and beat the list scan; they are
+    not expected to beat the ladder.
+    """
+    import fdi as fdi_module
+    from benchmarks.legacy_fdi import ladder_fdi, list_scan_fdi
+
+    n = 20_000 if args.quick else 200_000
+    rng = np.random.default_rng(3)
+    rows = list(zip(
+        rng.uniform(0, 45, n).tolist(),
+        rng.uniform(5, 100, n).tolist(),
+        rng.uniform(3, 60, n).tolist(),
+        rng.integers(1, 30, n).tolist(),
+        rng.uniform(1, 90, n).tolist(),
+    ))
+    results = {"n": n}
+    for name, func in (("lookup_tables", fdi_module.fdi), ("list_scan", list_scan_fdi),
+                       ("if_elif_ladder", ladder_fdi)):
+        start = time.perf_counter()
+        for row in rows:
+            func(*row)
+        elapsed = time.perf_counter() - start
+        results[name] = {"ns_per_call": round(elapsed / n * 1e9, 1)}
+    for name in ("list_scan", "if_elif_ladder"):
+        results[f"speedup_vs_{name}"] = round(
+            results[name]["ns_per_call"] / results["lookup_tables"]["ns_per_call"], 2)
+    return results
@@ -0,0 +1,392 @@
+"""
+Reference FDI implementations fdi.py is checked against (tests/test_fdi.py)
+and timed against (run.py): fire_danger_index.py's original if/elif ladder,
+kept verbatim, and fdi.py's own list-scanning version from before its
+precomputed lookup tables.
+"""
+
+
+def ladder_wind_factor(wind, burn_index):
+    """
+    Calculate wind factor.
+
+    Parameters:
+        wind (float): Wind speed (km/h).
+        burn_index (float): Burn Index.
+
+    Returns:
+        float: Wind factor value.
+    """
+    if (wind >= 0) and (wind < 3):
+        return burn_index + 0
+    elif (wind >= 3) and (wind < 9):
+        return burn_index + 5
+    elif (wind >= 9) and (wind < 17):
+        return burn_index + 10
+    elif (wind >= 17) and (wind < 26):
+        return burn_index + 15
+    elif (wind >= 26) and (wind < 33):
+        return burn_index + 20
+    elif (wind >= 33) and (wind < 37):
+        return burn_index + 25
+    elif (wind >= 37) and (wind < 42):
+        return burn_index + 30
+    elif (wind >= 42) and (wind < 46):
+        return burn_index + 35
+    else:
+        return burn_index + 40
+
+
+def ladder_fdi(temperature, humidity, wind, days_rain, rain):
+    """
+    Calculate the Fire Danger Index (FDI).
+
+    Parameters:
+        temperature (float): Temperature (°C).
+        humidity (float): Humidity (%).
+        wind (float): Wind speed (km/h).
+        days_rain (int): Days since last rain.
+        rain (float): Amount of last rain (mm).
+
+    Returns:
+        int: Fire Danger Index value (rounded).
+
+    Examples: >>> fdi(10, 50, 10, 1, 20), >>> fdi(40, 30, 30, 15, 5)
+    """
+    # Calculate factors
+    temperature_factor = (temperature - 3) * 6.7
+    humidity_factor = (90 - humidity) * 2.6
+
+    if rain <= 0:
+        rain = 1
+    if days_rain <= 0:
+        days_rain = 21
+    if wind <= 2:
+        wind = 3
+
+    burn_factor = temperature_factor - humidity_factor
+    burn_index = (burn_factor / 2 + humidity_factor) / 3.3
+
+    wind_fac = ladder_wind_factor(wind, burn_index)
+
+    # Initialize fdi value
+    fdi_value = 0
+
+    if (rain > 0) and (rain < 2.7):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.9
+        else:
+            fdi_value = wind_fac * 1
+    elif (rain >= 2.7) and (rain < 5.3):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 3:
+            fdi_value = wind_fac * 1
+    elif (rain >= 5.3) and (rain < 7.7):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 4:
+            fdi_value = wind_fac * 1
+    elif (rain >= 7.7) and (rain < 10.3):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 5:
+            fdi_value = wind_fac * 1
+    elif (rain >= 10.3) and (rain < 12.9):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 6:
+            fdi_value = wind_fac * 1
+    elif (rain >= 12.9) and (rain < 15.4):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.3
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 6:
+            fdi_value = wind_fac * 1
+    elif (rain >= 15.4) and (rain < 20.6):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 8:
+            fdi_value = wind_fac * 1
+    elif (rain >= 20.6) and (rain < 25.6):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 8:
+            fdi_value = wind_fac * 1
+    elif (rain >= 25.6) and (rain < 38.5):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.1
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.3
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 9:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 10:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 10:
+            fdi_value = wind_fac * 1
+    elif (rain >= 38.5) and (rain < 51.2):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.0
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 9:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 10:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 11:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 12:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 12:
+            fdi_value = wind_fac * 1
+    elif (rain >= 51.2) and (rain < 63.9):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.0
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.3
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 9:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 10:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 11:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 12:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 13:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 14:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 15:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 15:
+            fdi_value = wind_fac * 1
+    elif (rain >= 63.9) and (rain < 76.6):
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.0
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.1
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.3
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 9:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 10:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 11:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 12:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 13:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 14:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 15:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 16:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 17:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 18:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 19:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 20:
+            fdi_value = wind_fac * 0.9
+        elif days_rain > 20:
+            fdi_value = wind_fac * 1
+    elif rain >= 76.6:
+        if days_rain == 1:
+            fdi_value = wind_fac * 0.0
+        elif days_rain == 2:
+            fdi_value = wind_fac * 0.0
+        elif days_rain == 3:
+            fdi_value = wind_fac * 0.1
+        elif days_rain == 4:
+            fdi_value = wind_fac * 0.2
+        elif days_rain == 5:
+            fdi_value = wind_fac * 0.4
+        elif days_rain == 6:
+            fdi_value = wind_fac * 0.5
+        elif days_rain == 7:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 8:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 9:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 10:
+            fdi_value = wind_fac * 0.6
+        elif days_rain == 11:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 12:
+            fdi_value = wind_fac * 0.7
+        elif days_rain == 13:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 14:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 15:
+            fdi_value = wind_fac * 0.8
+        elif days_rain == 16:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 17:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 18:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 19:
+            fdi_value = wind_fac * 0.9
+        elif days_rain == 20:
+            fdi_value = wind_fac * 0.9
+        else:  # days_rain > 20
+            fdi_value = wind_fac * 1
+
+    return round(fdi_value)
+
+
+def list_scan_fdi(temperature, humidity, wind, days_rain, rain):
+    """fdi.fdi as it was before the precomputed lookup tables: same rules, list scans per call."""
+    temperature_factor = (temperature - 3) * 6.7
+    humidity_factor = (90 - humidity) * 2.6
+    rain = max(rain, 1)
+    days_rain = max(days_rain, 1)
+    wind = max(wind, 3)
+    burn_factor = temperature_factor - humidity_factor
+    burn_index = (burn_factor / 2 + humidity_factor) / 3.3
+
+    wind_fac = burn_index + 40
+    for threshold, add in zip([3, 9, 17, 26, 33, 37, 42, 46], [0, 5, 10, 15, 20, 25, 30, 35]):
+        if wind < threshold:
+            wind_fac = burn_index + add
+            break
+
+    thresholds = [
+        (0, 2.7, [0.7, 0.9, 1.0]),
+        (2.7, 5.3, [0.6, 0.8, 0.9, 1.0]),
+        (5.3, 7.7, [0.5, 0.7, 0.9, 0.9, 1.0]),
+        (7.7, 10.3, [0.4, 0.6, 0.8, 0.9, 0.9, 1.0]),
+        (10.3, 12.9, [0.4, 0.6, 0.7, 0.8, 0.9, 0.9, 1.0]),
+        (12.9, 15.4, [0.3, 0.5, 0.7, 0.8, 0.8, 0.9, 1.0]),
+        (15.4, 20.6, [0.2, 0.5, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+        (20.6, 25.6, [0.2, 0.4, 0.5, 0.7, 0.7, 0.8, 0.9, 0.9, 1.0]),
+        (25.6, 38.5, [0.1, 0.3, 0.4, 0.6, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+        (38.5, 51.2, [0.0, 0.2, 0.4, 0.5, 0.5, 0.6, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+        (51.2, 63.9, [0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.7, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 0.9, 1.0]),
+        (63.9, 76.6, [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0]),
+        (76.6, float("inf"), [0.0, 0.0, 0.1, 0.2, 0.4, 0.5, 0.6, 0.6, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0]),
+    ]
+    adjustment = 1.0
+    for low, high, factors in thresholds:
+        if low <= rain < high:
+            adjustment = factors[min(days_rain - 1, len(factors) - 1)]
+            break
+    return round(wind_fac * adjustment)
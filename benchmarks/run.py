@@ -0,0 +1,97 @@
+"""
+Latency and throughput benchmarks for the API and the FDI functions.
+
+Run from the repository root (the model artifact must exist, see artifact.py):
+
+    python benchmarks/run.py                     # everything, results in benchmark_results.json
+    python benchmarks/run.py --only fdi_vectorized cold_start --output out.json
+    python benchmarks/run.py --baseline last_release.json
+
+Each benchmark returns a JSON-serialisable dict; the run writes them together
+with environment metadata so results can be diffed between releases.
+
+The benchmarks themselves live in one module per area (serving.py, fdi.py,
+engines.py, weather.py, training.py) and register with ``benchmark`` from
+common.py; this runner only imports them, runs the selection and reports.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+# The area modules are imported as the benchmarks package from the repo root. The script's own
+# directory comes off the path, so benchmarks/fdi.py cannot shadow the top-level fdi module.
+sys.path[:] = [ROOT] + [path for path in sys.path if os.path.abspath(path or os.curdir) != HERE]
+
+import numpy as np
+
+from benchmarks import engines, fdi, serving, training, weather  # noqa: F401 (registers the benchmarks)
+from benchmarks.common import BENCHMARKS
+
+
+def environment() -> dict:
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, path=()) -> list:
+    """Relative change of every numeric leaf present in both result trees."""
+    changes = []
+    for key, value in results.items():
+        old = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict):
+            changes.extend(compare(value, old or {}, path + (key,)))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(old, (int, float)) and old:
+            changes.append((".".join(path + (key,)), old, value, (value - old) / old * 100))
+    return changes
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmark_results.json"))
+    parser.add_argument("--repeat", type=int, default=500, help="Samples per latency measurement")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast smoke run")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment(), "results": {}}
+    for name in args.only or BENCHMARKS:
+        print(f"▶ {name}", flush=True)
+        start = time.perf_counter()
+        report["results"][name] = BENCHMARKS[name](args)
+        print(f"  done in {time.perf_counter() - start:.1f}s", flush=True)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key, old, new, pct in compare(report["results"], baseline.get("results", {})):
+            print(f"  {key}: {old} -> {new} ({pct:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
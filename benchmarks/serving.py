@@ -0,0 +1,435 @@
+"""
+API benchmarks: /predict latency, batch and binary-body throughput, the result
+cache, cold start and import profile, and uvicorn worker and micro-batch scaling.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import ROOT, benchmark, run_python, summarize
+
+
+_NO_PREDICT_CACHE = {"FIRESHIELD_PREDICT_CACHE_SIZE": "0"}
+
+_PREDICT_LATENCY = """
+import json, time
+from fastapi.testclient import TestClient
+import main
+client = TestClient(main.app)
+payload = {{"Temperature": 34.0, "RH": 30.0, "WS": 10.0, "Rain": 0.0}}
+for _ in range(20):
+    client.post("/predict", json=payload)
+samples = []
+for _ in range({repeat}):
+    start = time.perf_counter()
+    client.post("/predict", json=payload)
+    samples.append(time.perf_counter() - start)
+print(json.dumps(samples))
+"""
+
+
+@benchmark
+def predict_latency(args) -> dict:
+    """Single-request /predict latency through FastAPI's test client, per inference engine."""
+    results = {}
+    for engine in ("sklearn", "flat", "compact"):
+        out = run_python(_PREDICT_LATENCY.format(repeat=args.repeat),
+                         {"FIRESHIELD_ENGINE": engine, **_NO_PREDICT_CACHE})
+        results[engine] = summarize(json.loads(out))
+    return results
+
+
+_BATCH_SCALING = """
+import json, time
+import numpy as np
+from fastapi.testclient import TestClient
+import main
+client = TestClient(main.app)
+rng = np.random.default_rng(0)
+results = {{}}
+for size in {sizes}:
+    body = {{
+        "Temperature": rng.integers(20, 46, size).tolist(),
+        "RH": rng.integers(20, 91, size).tolist(),
+        "WS": rng.integers(6, 31, size).tolist(),
+        "Rain": (rng.integers(0, 200, size) / 10).tolist(),
+    }}
+    client.post("/predict/batch", json=body)
+    samples = []
+    for _ in range({repeat}):
+        start = time.perf_counter()
+        client.post("/predict/batch", json=body)
+        samples.append(time.perf_counter() - start)
+    results[size] = samples
+print(json.dumps(results))
+"""
+
+
+@benchmark
+def batch_scaling(args) -> dict:
+    """/predict/batch latency and rows/s as the batch grows, per inference engine."""
+    sizes = [1, 10, 100, 1000] if args.quick else [1, 10, 100, 1000, 10000]
+    repeat = max(3, args.repeat // 20)
+    results = {}
+    for engine in ("sklearn", "flat"):
+        out = run_python(_BATCH_SCALING.format(sizes=sizes, repeat=repeat), {"FIRESHIELD_ENGINE": engine})
+        per_size = {}
+        for size, samples in json.loads(out).items():
+            stats = summarize(samples)
+            stats["rows_per_s"] = round(int(size) / (stats["p50_ms"] / 1000), 1)
+            per_size[size] = stats
+        results[engine] = per_size
+    return results
+
+
+_BINARY_INPUT = """
+import json, time
+import numpy as np
+import pyarrow as pa
+from fastapi.testclient import TestClient
+import main
+client = TestClient(main.app)
+rng = np.random.default_rng(0)
+results = {{}}
+for size in {sizes}:
+    X = np.column_stack([rng.integers(20, 46, size), rng.integers(20, 91, size),
+                         rng.integers(6, 31, size), rng.integers(0, 200, size) / 10]).astype(np.float64)
+    table = pa.table({{name: X[:, i] for i, name in enumerate(["Temperature", "RH", "WS", "Rain"])}})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    requests = {{
+        "json_columns": dict(json={{"Temperature": X[:, 0].tolist(), "RH": X[:, 1].tolist(),
+                                    "WS": X[:, 2].tolist(), "Rain": X[:, 3].tolist()}}),
+        "raw_float64": dict(content=np.ascontiguousarray(X.T).tobytes(),
+                            headers={{"content-type": "application/octet-stream"}}),
+        "arrow": dict(content=sink.getvalue().to_pybytes(),
+                      headers={{"content-type": "application/vnd.apache.arrow.stream"}}),
+    }}
+    per_format = {{}}
+    for name, kwargs in requests.items():
+        path = "/predict/batch" if name == "json_columns" else "/predict/binary"
+        client.post(path, **kwargs)
+        samples = []
+        for _ in range({repeat}):
+            start = time.perf_counter()
+            client.post(path, **kwargs)
+            samples.append(time.perf_counter() - start)
+        per_format[name] = samples
+    results[size] = per_format
+print(json.dumps(results))
+"""
+
+
+_PREDICT_CACHE = """
+import json, time
+import numpy as np
+from fastapi.testclient import TestClient
+import main
+client = TestClient(main.app)
+rows = np.load({path!r})
+samples, responses = [], []
+for row in rows.tolist():
+    payload = dict(zip(("Temperature", "RH", "WS", "Rain"), row))
+    start = time.perf_counter()
+    response = client.post("/predict", json=payload).json()
+    samples.append(time.perf_counter() - start)
+    responses.append(response["probabilities"]["fire"])
+stats = client.get("/predict/cache").json()
+if main.prediction_cache is not None:
+    main.model_holder.swap(main.ServingModel.from_artifact(main.DEFAULT_ARTIFACT_PATH, main.INFERENCE_ENGINE))
+    main.model_holder.current.version += "-reloaded"
+    client.post("/predict", json=dict(zip(("Temperature", "RH", "WS", "Rain"), rows[0].tolist())))
+    stats["after_reload"] = client.get("/predict/cache").json()
+print(json.dumps({{"samples": samples, "responses": responses, "stats": stats}}))
+"""
+
+
+@benchmark
+def predict_cache(args) -> dict:
+    """
+    /predict latency and hit ratio on a repeating workload (dataset.csv rows drawn
+    with replacement, so inputs recur like low-precision sensor readings), with
+    the result cache off, exact and rounded to one decimal. Fails if the exact
+    cache changes any answer or a model swap does not empty it.
+    """
+    import tempfile
+    import pandas as pd
+
+    n = 2_000 if args.quick else 10_000
+    data = pd.read_csv(os.path.join(ROOT, "dataset.csv"))
+    data.columns = data.columns.str.strip()
+    features = data[["Temperature", "RH (Relative Humidity)", "WS (Wind Speed)", "Rain"]]
+    features = features.apply(pd.to_numeric, errors="coerce").dropna()
+    rows = features.sample(n, replace=True, random_state=5).to_numpy(dtype=np.float64)
+    configs = {"off": {"FIRESHIELD_PREDICT_CACHE_SIZE": "0"},
+               "exact": {"FIRESHIELD_PREDICT_CACHE_SIZE": "10000"},
+               "rounded_1dp": {"FIRESHIELD_PREDICT_CACHE_SIZE": "10000", "FIRESHIELD_PREDICT_CACHE_DECIMALS": "1"}}
+    results = {"requests": n, "distinct_rows": int(len(np.unique(rows, axis=0)))}
+    outputs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rows.npy")
+        np.save(path, rows)
+        for name, env in configs.items():
+            outputs[name] = json.loads(run_python(_PREDICT_CACHE.format(path=path),
+                                                  {"FIRESHIELD_ENGINE": "sklearn", **env}))
+            results[name] = {"latency": summarize(outputs[name]["samples"]), "cache": outputs[name]["stats"]}
+    if outputs["exact"]["responses"] != outputs["off"]["responses"]:
+        raise AssertionError("The exact /predict cache changed a response")
+    for name in ("exact", "rounded_1dp"):
+        after = outputs[name]["stats"]["after_reload"]
+        if after["size"] != 1 or after["invalidations"] != 1:
+            raise AssertionError(f"{name} cache was not emptied by a model swap: {after}")
+    results["exact_speedup_mean"] = round(results["off"]["latency"]["mean_ms"]
+                                          / results["exact"]["latency"]["mean_ms"], 2)
+    return results
+
+
+@benchmark
+def binary_input(args) -> dict:
+    """Bulk scoring latency for columnar JSON versus raw float64 and Arrow IPC bodies (flat engine)."""
+    sizes = [1000, 10000] if args.quick else [1000, 10000, 100000]
+    repeat = max(3, args.repeat // 20)
+    out = run_python(_BINARY_INPUT.format(sizes=sizes, repeat=repeat), {"FIRESHIELD_ENGINE": "flat"})
+    results = {}
+    for size, per_format in json.loads(out).items():
+        results[size] = {}
+        for name, samples in per_format.items():
+            stats = summarize(samples)
+            stats["rows_per_s"] = round(int(size) / (stats["p50_ms"] / 1000), 1)
+            results[size][name] = stats
+    return results
+
+
+@benchmark
+def cold_start(args) -> dict:
+    """Wall time for a fresh interpreter to import main.py (model load included)."""
+    runs = 3 if args.quick else 5
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    results = {}
+    for engine in ("sklearn", "flat", "compact"):
+        process_s, import_s = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            import_s.append(float(run_python(code, {"FIRESHIELD_ENGINE": engine})))
+            process_s.append(time.perf_counter() - start)
+        results[engine] = {
+            "import_main_s": round(statistics.median(import_s), 4),
+            "process_total_s": round(statistics.median(process_s), 4),
+            "runs": runs,
+        }
+    return results
+
+
+# Training-only packages the flat engine must not import at startup
+_TRAINING_PACKAGES = ("sklearn", "pandas", "scipy", "joblib", "coremltools")
+
+
+def _import_profile(env: dict) -> list:
+    """(self_us, cumulative_us, depth, module) per import of main.py, from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+@benchmark
+def import_profile(args) -> dict:
+    """
+    ``-X importtime`` profile of ``import main`` per engine: total import time, the
+    heaviest top-level packages, and which training-only packages got loaded.
+    The flat and compact engines (served from the artifact's companions) must load none.
+    """
+    runs = 3 if args.quick else 5
+    results = {}
+    for engine in ("sklearn", "flat", "compact"):
+        profiles = [_import_profile({"FIRESHIELD_ENGINE": engine}) for _ in range(runs)]
+        totals = [next(cumulative for _, cumulative, _, name in rows if name == "main") for rows in profiles]
+        # Direct imports of main.py in the median run: the lines just above "main" nested under it
+        median_rows = profiles[totals.index(sorted(totals)[len(totals) // 2])]
+        end = next(i for i, row in enumerate(median_rows) if row[3] == "main")
+        start = end
+        while start > 0 and median_rows[start - 1][2] >= 1:
+            start -= 1
+        packages = {}
+        for _, cumulative, depth, name in median_rows[start:end]:
+            if depth == 1:
+                root = name.split(".")[0]
+                packages[root] = packages.get(root, 0) + cumulative
+        loaded = {name.split(".")[0] for rows in profiles for _, _, _, name in rows}
+        results[engine] = {
+            "import_main_ms": round(statistics.median(totals) / 1000, 1),
+            "modules_imported": end - start + 1,
+            "top_packages_ms": {name: round(us / 1000, 1)
+                                for name, us in sorted(packages.items(), key=lambda item: -item[1])[:10]},
+            "training_packages_loaded": sorted(loaded.intersection(_TRAINING_PACKAGES)),
+        }
+    for engine in ("flat", "compact"):
+        if results[engine]["training_packages_loaded"]:
+            raise AssertionError(f"{engine} engine startup imported {results[engine]['training_packages_loaded']}")
+    results["flat_speedup"] = round(results["sklearn"]["import_main_ms"] / results["flat"]["import_main_ms"], 2)
+    return results
+
+
+def _free_port() -> int:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_serving(port: int, timeout: float = 120.0) -> None:
+    import http.client
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/openapi.json")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Server on port {port} did not come up within {timeout}s")
+
+
+def _load_client(port: int, duration: float) -> int:
+    """Send keep-alive /predict requests for ``duration`` seconds; returns the count."""
+    import http.client
+
+    body = json.dumps({"Temperature": 34.0, "RH": 30.0, "WS": 10.0, "Rain": 0.0})
+    headers = {"Content-Type": "application/json"}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        conn.request("POST", "/predict", body=body, headers=headers)
+        conn.getresponse().read()
+        done += 1
+    return done
+
+
+def _process_memory_mb(pid: int) -> dict:
+    """Resident and proportional set size of a process (Linux /proc)."""
+    memory = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                memory["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                memory["pss_mb"] = round(int(line.split()[1]) / 1024, 1)
+    return memory
+
+
+def _descendants(pid: int) -> list:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            children.extend(int(child) for child in f.read().split())
+    return children + [grandchild for child in children for grandchild in _descendants(child)]
+
+
+@benchmark
+def multi_worker_scaling(args) -> dict:
+    """
+    Requests/s and per-worker memory as workers are added, for serve.py (fork
+    after model load, copy-on-write sharing) versus `uvicorn --workers`
+    (every worker loads its own model). PSS splits shared pages between the
+    processes mapping them, so it shows how much memory each worker really adds.
+    """
+    from multiprocessing import Pool
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        return {"skipped": "needs Linux /proc for memory accounting"}
+
+    worker_counts = [1, 2] if args.quick else [1, 2, 4]
+    duration = 3.0 if args.quick else 10.0
+    commands = {
+        "serve_py_fork": lambda port, n: [sys.executable, "serve.py", "--host", "127.0.0.1",
+                                          "--port", str(port), "--workers", str(n)],
+        "uvicorn_workers": lambda port, n: [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                            "--port", str(port), "--workers", str(n), "--log-level", "warning"],
+    }
+
+    results = {"cpu_count": os.cpu_count(), "duration_s": duration}
+    for mode, command in commands.items():
+        per_count = {}
+        for workers in worker_counts:
+            port = _free_port()
+            server = subprocess.Popen(command(port, workers), cwd=ROOT, env={**os.environ, **_NO_PREDICT_CACHE},
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                _wait_until_serving(port)
+                time.sleep(1.0)
+                clients = max(4, 2 * workers)
+                with Pool(clients) as pool:
+                    counts = pool.starmap(_load_client, [(port, duration)] * clients)
+                processes = [server.pid] + _descendants(server.pid)
+                memory = [_process_memory_mb(pid) for pid in processes]
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            per_count[workers] = {
+                "requests_per_s": round(sum(counts) / duration, 1),
+                "total_pss_mb": round(sum(m["pss_mb"] for m in memory), 1),
+                "pss_per_worker_mb": round(sum(m["pss_mb"] for m in memory) / workers, 1),
+                "processes": memory,
+            }
+        results[mode] = per_count
+    return results
+
+
+@benchmark
+def predict_microbatch(args) -> dict:
+    """
+    /predict throughput under concurrent load on one uvicorn worker, with
+    micro-batching off and on, per inference engine.
+    """
+    import http.client
+    from multiprocessing import Pool
+
+    duration = 3.0 if args.quick else 10.0
+    clients = 16 if args.quick else 64
+    results = {"clients": clients, "duration_s": duration}
+    for engine in ("sklearn", "flat"):
+        for window_ms in (0, 2):
+            port = _free_port()
+            env = {**os.environ, "FIRESHIELD_ENGINE": engine, "FIRESHIELD_BATCH_WINDOW_MS": str(window_ms),
+                   **_NO_PREDICT_CACHE}
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--log-level", "warning", "--no-access-log"],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_until_serving(port)
+                with Pool(clients) as pool:
+                    counts = pool.starmap(_load_client, [(port, duration)] * clients)
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                conn.request("GET", "/predict/batcher")
+                stats = json.loads(conn.getresponse().read())
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            entry = {"requests_per_s": round(sum(counts) / duration, 1)}
+            if stats.get("enabled"):
+                entry["mean_batch_size"] = stats["mean_batch_size"]
+                entry["max_queue_depth"] = stats["max_queue_depth"]
+            results[f"{engine}_window_{window_ms}ms"] = entry
+    return results
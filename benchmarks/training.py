@@ -0,0 +1,75 @@
+"""
+Training benchmarks: full against incremental retraining as the dataset grows.
+"""
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import ROOT, benchmark
+
+
+def _synthetic_dataset(n: int, seed: int) -> "pd.DataFrame":
+    """``n`` rows resampled from dataset.csv with small jitter, in its column layout."""
+    import pandas as pd
+
+    source = pd.read_csv(os.path.join(ROOT, "dataset.csv"))
+    rows = source.sample(n, replace=True, random_state=seed).reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    for column, step in (("Temperature", 1), ("RH (Relative Humidity)", 1), ("WS (Wind Speed)", 1), ("Rain ", 0.1)):
+        rows[column] = (pd.to_numeric(rows[column], errors="coerce") + rng.integers(-1, 2, n) * step).clip(lower=0)
+    return rows.round(1)
+
+
+@benchmark
+def retrain_scaling(args) -> dict:
+    """
+    Full retrain versus incremental update after appending 10% more rows, as the
+    dataset grows. Accuracy is measured on a separate synthetic sample.
+    """
+    import tempfile
+    from model import ForestFireModel
+
+    sizes = [1_000, 10_000] if args.quick else [1_000, 10_000, 100_000]
+    test = _synthetic_dataset(5_000, seed=99)
+    test.columns = test.columns.str.strip()
+    features = ["Temperature", "RH (Relative Humidity)", "WS (Wind Speed)", "Rain"]
+    y_test = test["Result"].astype(str).str.strip().str.lower()
+
+    def accuracy(fire_model):
+        predictions = fire_model.model.predict(fire_model.scaler.transform(test[features]))
+        return round(float((predictions == y_test).mean()), 4)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            data = _synthetic_dataset(size, seed=size)
+            base = size - size // 10
+            csv_path = os.path.join(tmp, f"data_{size}.csv")
+            cache_path = os.path.join(tmp, f"cache_{size}.npz")
+
+            data.to_csv(csv_path, index=False)
+            full = ForestFireModel(csv_path)
+            start = time.perf_counter()
+            full.train()
+            full_s = time.perf_counter() - start
+
+            data.iloc[:base].to_csv(csv_path, index=False)
+            incremental = ForestFireModel(csv_path)
+            incremental.train(cache_path)
+            data.iloc[base:].to_csv(csv_path, mode="a", header=False, index=False)
+            start = time.perf_counter()
+            added = incremental.train_incremental(cache_path, new_trees=10)
+            incremental_s = time.perf_counter() - start
+
+            results[size] = {
+                "appended_rows": size - base,
+                "rows_used": added,
+                "full_s": round(full_s, 3),
+                "incremental_s": round(incremental_s, 3),
+                "speedup": round(full_s / incremental_s, 1),
+                "trees": len(incremental.model.estimators_),
+                "full_accuracy": accuracy(full),
+                "incremental_accuracy": accuracy(incremental),
+            }
+    return results
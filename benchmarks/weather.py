@@ -0,0 +1,229 @@
+"""
+Weather pipeline benchmarks against the local Open-Meteo stub and recorded
+fixtures: the streaming risk map, rain-store replay and the forecast.
+"""
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import benchmark
+
+
+@benchmark
+def risk_map_streaming(args) -> dict:
+    """
+    Gridded risk map against the local Open-Meteo stub: points/s, HTTP requests
+    and peak traced memory, which should stay flat as the grid grows.
+    """
+    import asyncio
+    import tracemalloc
+    from artifact import DEFAULT_ARTIFACT_PATH
+    from rain_store import RainStore
+    from risk_map import BoundingBox, ndjson_stream
+    from serving_model import ServingModel
+    from weather_client import WeatherClient
+    from weather_stub import start_stub_server, stub_url
+
+    server = start_stub_server()
+    client = WeatherClient(stub_url(server), forecast_url=stub_url(server, "forecast"))
+    serving_model = ServingModel.from_artifact(DEFAULT_ARTIFACT_PATH, "flat")
+
+    async def consume(bbox, resolution):
+        # A fresh store per pass, so every pass fetches the rain history it needs
+        store = RainStore(":memory:", client)
+        tiles = 0
+        try:
+            async for _ in ndjson_stream(bbox, resolution, serving_model.predict_matrix, 32, client, store=store):
+                tiles += 1
+        finally:
+            store.close()
+        return tiles
+
+    results = {}
+    try:
+        for side in ([0.5, 1.0] if args.quick else [0.5, 1.0, 2.0]):
+            bbox = BoundingBox(32.0, -98.0, 32.0 + side, -98.0 + side)
+            resolution = 0.01
+            points = (round(side / resolution) + 1) ** 2
+            requests_before = server.request_count
+            start = time.perf_counter()
+            tiles = asyncio.run(consume(bbox, resolution))
+            elapsed = time.perf_counter() - start
+            requests = server.request_count - requests_before
+            # Separate pass: tracemalloc slows allocation-heavy code several times over
+            tracemalloc.start()
+            asyncio.run(consume(bbox, resolution))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[f"{points}_points"] = {
+                "tiles": tiles,
+                "seconds": round(elapsed, 2),
+                "points_per_s": round(points / elapsed, 1),
+                "http_requests": requests,
+                "peak_traced_mb": round(peak / 2**20, 1),
+            }
+    finally:
+        client.close()
+        server.shutdown()
+    return results
+
+
+def _last_rain_in_series(days: np.ndarray, rain: np.ndarray, lookback_days: int, today):
+    """Reference last rain straight from a daily series: (last_rain_date, rainfall, days_since_last_rain)."""
+    rainy = np.flatnonzero(rain > 0)
+    if rainy.size == 0:
+        return None, None, lookback_days
+    last_rain_date = days[rainy[-1]].astype(object)
+    return last_rain_date, float(rain[rainy[-1]]), (today - last_rain_date).days
+
+
+def _replay_sync_worker(store_path: str, fixture_path: str, coords: list) -> list:
+    from rain_store import RainStore
+    from weather_fixture import ReplayClient, WeatherFixture
+
+    store = RainStore(store_path, ReplayClient(WeatherFixture.load(fixture_path)))
+    try:
+        return [store.days_since_last_rain(lat, lon) for lat, lon in coords]
+    finally:
+        store.close()
+
+
+@benchmark
+def weather_replay(args) -> dict:
+    """
+    FDI fully offline from a weather fixture: cold sync and warm lookups through
+    the rain store, LRU eviction bound, and several processes sharing one store
+    file. Results are checked against the fixture's own rain series.
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    from datetime import date
+
+    from fdi import fdi
+    from rain_store import RainStore
+    from weather_fixture import ReplayClient, WeatherFixture
+
+    n = 200 if args.quick else 2000
+    today = date(2026, 7, 1)
+    coords = [(round(30 + i // 50 * 0.1, 4), round(-100 + i % 50 * 0.1, 4)) for i in range(n)]
+    results = {"locations": n}
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_path = os.path.join(tmp, "weather_fixture.json")
+        WeatherFixture.synthetic(coords, today).save(fixture_path)
+        fixture = WeatherFixture.load(fixture_path)
+        window_start = date.fromordinal(today.toordinal() - 90)
+        expected = [_last_rain_in_series(*fixture.daily(lat, lon, window_start, today), 90, today)
+                    for lat, lon in coords]
+
+        store = RainStore(os.path.join(tmp, "rain.sqlite"), ReplayClient(fixture), max_locations=n // 2)
+        start = time.perf_counter()
+        store.sync(coords)
+        results["cold_sync_s"] = round(time.perf_counter() - start, 3)
+
+        # Next day, a different half of the locations: everything older is evicted down to the bound
+        tomorrow = date.fromordinal(today.toordinal() + 1)
+        store.sync(coords[:n // 4], today=tomorrow)
+        results["store_after_eviction"] = store.stats()["locations"]
+        if results["store_after_eviction"] > n // 2:
+            raise AssertionError(f"Rain store holds {results['store_after_eviction']} locations, bound is {n // 2}")
+
+        start = time.perf_counter()
+        warm = [store.days_since_last_rain(lat, lon) for lat, lon in coords[:n // 4]]
+        values = [fdi(30, 30, 20, days, rain or 0) for _, rain, days in warm]
+        elapsed = time.perf_counter() - start
+        results["warm_fdi_us_per_location"] = round(elapsed / len(values) * 1e6, 1)
+        store.close()
+
+        # Four processes syncing overlapping halves of the locations into one fresh file
+        shared_path = os.path.join(tmp, "shared.sqlite")
+        chunks = [coords[i * n // 8:(i + 4) * n // 8] for i in range(4)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(4) as pool:
+            shared = list(pool.map(_replay_sync_worker, [shared_path] * 4, [fixture_path] * 4, chunks))
+        results["shared_store_4_processes_s"] = round(time.perf_counter() - start, 3)
+
+    mismatches = [coords[i] for i, got in enumerate(warm) if got != expected[i]]
+    for chunk_index, chunk in enumerate(shared):
+        offset = chunk_index * n // 8
+        mismatches += [coords[offset + i] for i, got in enumerate(chunk) if got != expected[offset + i]]
+    if mismatches:
+        raise AssertionError(f"Replayed rain history differs from the fixture for {len(mismatches)} lookups, "
+                             f"e.g. {mismatches[:3]}")
+    return results
+
+
+@benchmark
+def forecast_pipeline(args) -> dict:
+    """
+    16-day fire-risk forecast: the batched pipeline (rolling days-since-rain, one
+    forest pass, one fdi_array call) versus scoring each location-day on its own
+    with a fresh rain-history lookup, from a replayed fixture; results must match.
+    Also counts HTTP requests for the same batch against the local stub.
+    """
+    from datetime import date, timedelta
+
+    from artifact import DEFAULT_ARTIFACT_PATH
+    from fdi import fdi
+    from forecast import forecast_risk
+    from rain_store import RainStore
+    from serving_model import ServingModel
+    from weather_client import WeatherClient
+    from weather_fixture import ReplayClient, WeatherFixture
+    from weather_stub import start_stub_server, stub_url
+
+    n = 50 if args.quick else 200
+    days = 16
+    today = date(2026, 7, 1)
+    coords = [(round(30 + i // 20 * 0.1, 4), round(-100 + i % 20 * 0.1, 4)) for i in range(n)]
+    serving_model = ServingModel.from_artifact(DEFAULT_ARTIFACT_PATH, "flat")
+    client = ReplayClient(WeatherFixture.synthetic(coords, today))
+    store = RainStore(":memory:", client)
+    store.sync(coords)  # both variants start from a synced store
+
+    start = time.perf_counter()
+    batched = forecast_risk(coords, serving_model.predict_matrix, days, client, store)
+    batched_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mismatches = []
+    for location, (lat, lon) in zip(batched, coords):
+        _, features = client.daily_forecast([(lat, lon)], days)
+        for day in range(days):
+            # Archive plus the forecast so far, as a per-day archive query would see it
+            history_days, history = store.daily_rain(lat, lon, today - timedelta(days=90), today - timedelta(days=1))
+            rain_days = np.concatenate([history_days, np.arange(np.datetime64(today), np.datetime64(today) + day + 1)])
+            rain = np.concatenate([history, np.nan_to_num(features[0, :day + 1, 3])])
+            _, rainfall, days_since = _last_rain_in_series(rain_days, rain, 90 + day, today + timedelta(days=day))
+            row = features[0, day]
+            prob_fire, _ = serving_model.predict_matrix(row[None, :])
+            value = fdi(row[0], row[1], row[2], days_since, rainfall or 0)
+            if (days_since != location["days_since_rain"][day] or value != location["fdi"][day]
+                    or round(float(prob_fire[0]) * 100, 2) != location["fire_probability"][day]):
+                mismatches.append((lat, lon, day))
+    per_day_s = time.perf_counter() - start
+    store.close()
+    if mismatches:
+        raise AssertionError(f"Batched forecast differs from per-day scoring on {len(mismatches)} "
+                             f"location-days, e.g. {mismatches[:3]}")
+
+    server = start_stub_server()
+    live_client = WeatherClient(stub_url(server), forecast_url=stub_url(server, "forecast"))
+    live_store = RainStore(":memory:", live_client)
+    try:
+        forecast_risk(coords, serving_model.predict_matrix, days, live_client, live_store)
+        requests = server.request_count
+    finally:
+        live_store.close()
+        live_client.close()
+        server.shutdown()
+
+    location_days = n * days
+    return {
+        "location_days": location_days,
+        "batched_s": round(batched_s, 4),
+        "per_day_s": round(per_day_s, 4),
+        "batched_us_per_location_day": round(batched_s / location_days * 1e6, 1),
+        "speedup": round(per_day_s / batched_s, 1),
+        "http_requests_for_batch": requests,
+    }
@@ -0,0 +1,102 @@
+"""
+Binary columnar request/response bodies for bulk prediction.
+
+Two formats, chosen by Content-Type:
+
+* ``application/octet-stream``: the four feature columns (Temperature, RH,
+  WS, Rain) back to back as little-endian float64 (default) or float32, n
+  values each. The response holds the fire and not-fire columns in the same
+  dtype and layout.
+* ``application/vnd.apache.arrow.stream``: an Arrow IPC stream with those
+  four columns; the response is an Arrow stream with fire, not_fire and
+  prediction columns. Needs pyarrow.
+
+Raw bodies are wrapped with ``np.frombuffer`` and scored in place. Arrow
+bodies are copied once: every engine scores one (n, 4) matrix, and Arrow
+columns are separate buffers, so they are written into a new matrix (see
+parse_arrow). Neither format creates per-value Python objects. float32 values are scored as the float32 numbers they
+are (0.2f is 0.2000000030), so rows sitting exactly on a split can differ from
+the float64/JSON result; send float64 when that matters.
+"""
+import numpy as np
+
+RAW_CONTENT_TYPE = "application/octet-stream"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNS = ("Temperature", "RH", "WS", "Rain")
+DTYPES = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4")}
+
+
+class BinaryFormatError(ValueError):
+    """The request body does not match the declared binary format."""
+
+
+def parse_raw(body: bytes, dtype: str = "float64") -> np.ndarray:
+    """
+    View a raw column-major body as an (n, 4) feature matrix, without copying.
+
+    Returns:
+        np.ndarray: Read-only (n, 4) view into ``body``.
+    """
+    if dtype not in DTYPES:
+        raise BinaryFormatError(f"Unsupported dtype {dtype!r}; expected one of {sorted(DTYPES)}")
+    row_bytes = len(COLUMNS) * DTYPES[dtype].itemsize
+    if len(body) % row_bytes:
+        raise BinaryFormatError(
+            f"Body of {len(body)} bytes is not {len(COLUMNS)} equal {dtype} columns ({row_bytes} bytes per row)")
+    columns = np.frombuffer(body, dtype=DTYPES[dtype]).reshape(len(COLUMNS), -1)
+    return columns.T
+
+
+def encode_raw(prob_fire: np.ndarray, prob_no_fire: np.ndarray, dtype: str = "float64") -> bytes:
+    """Fire then not-fire probability columns (percent) as little-endian ``dtype``."""
+    out = np.empty((2, len(prob_fire)), dtype=DTYPES[dtype])
+    np.multiply(prob_fire, 100, out=out[0], casting="unsafe")
+    np.multiply(prob_no_fire, 100, out=out[1], casting="unsafe")
+    return out.tobytes()
+
+
+def parse_arrow(body: bytes) -> np.ndarray:
+    """
+    (n, 4) float64 feature matrix from an Arrow IPC stream with the four feature columns.
+
+    The stream's buffers are read in place, and float chunks without nulls are
+    viewed zero-copy, but the result is a new matrix. The columns are separate
+    Arrow buffers while the engines score a single 2-D array, so each value is
+    copied once (and cast to float64). Use the raw format to skip the copy.
+    """
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as exc:
+        raise BinaryFormatError(f"Invalid Arrow IPC stream: {exc}") from exc
+    missing = [name for name in COLUMNS if name not in table.column_names]
+    if missing:
+        raise BinaryFormatError(f"Arrow stream is missing columns: {missing}")
+
+    X = np.empty((table.num_rows, len(COLUMNS)), dtype=np.float64)
+    for i, name in enumerate(COLUMNS):
+        column = table.column(name)
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise BinaryFormatError(f"Column {name!r} has type {column.type}; expected a float or integer type")
+        if column.null_count:
+            raise BinaryFormatError(f"Column {name!r} contains nulls")
+        offset = 0
+        for chunk in column.chunks:
+            values = chunk.to_numpy(zero_copy_only=pa.types.is_floating(chunk.type))
+            X[offset:offset + len(values), i] = values
+            offset += len(values)
+    return X
+
+
+def encode_arrow(prob_fire: np.ndarray, prob_no_fire: np.ndarray) -> bytes:
+    """Arrow IPC stream with fire/not_fire probabilities (percent) and the predicted label."""
+    import pyarrow as pa
+
+    labels = pa.DictionaryArray.from_arrays(
+        pa.array((prob_fire > prob_no_fire).astype(np.int8)), pa.array(["not fire", "fire"]))
+    table = pa.table({"fire": prob_fire * 100, "not_fire": prob_no_fire * 100, "prediction": labels})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,169 @@
+"""
+Quantized, compact form of a FlatForest for memory-lean workers.
+
+Every split threshold of a feature is one of a few dozen distinct values (the
+points between neighbouring values of that feature in the training data), so
+instead of a float64 per node the forest keeps one small sorted grid per
+feature and each node stores a uint16 index into it. An input is mapped onto
+the grids once per row (``rank``: how many grid values lie below it), after
+which ``x <= grid[code]`` is simply ``rank <= code``. That is exact, because the
+grids hold the FlatForest thresholds unchanged, so every row lands in the same
+leaves as with sklearn.
+
+Node arrays are uint8 (feature) and uint16/uint32 (threshold code, the two
+children), 7 bytes per node against 48 in FlatForest. Leaf class
+probabilities are scaled to uint8 or uint16 and deduplicated into a small
+table; a fully grown forest has pure leaves, so that table is two rows and
+uint8 is lossless. Only the leaf probabilities can ever be approximate: by at
+most half a quantization step (1/510 for uint8, 1/131070 for uint16), see
+max_quantization_error.
+"""
+import numpy as np
+
+_LEAF_FEATURE = 0
+
+
+def _index_dtype(largest: int):
+    return np.uint16 if largest <= np.iinfo(np.uint16).max else np.uint32
+
+
+class CompactForest:
+    """
+    Random forest as quantized node arrays.
+
+    Nodes are laid out like FlatForest (leaves point at themselves and always
+    go left), except that a leaf's right child slot holds its row in
+    ``leaf_values``.
+
+    Parameters:
+        feature (np.ndarray): uint8 split feature per node.
+        code (np.ndarray): Per node, the index of its threshold in ``grids[feature]``
+            (the largest code, beyond every grid, for leaves).
+        children (np.ndarray): (n_nodes, 2) left and right child per node; see above for leaves.
+        grids (list): Sorted float64 threshold grid per feature.
+        leaf_values (np.ndarray): (n_distinct_leaves, n_classes) uint8/uint16 scaled probabilities.
+        scale (int): What a probability of 1 is stored as in ``leaf_values``.
+    """
+
+    def __init__(self, feature, code, children, grids, leaf_values, scale, roots, max_depth, classes):
+        self.feature = feature
+        self.code = code
+        self.children = children
+        self.grids = grids
+        self.leaf_values = leaf_values
+        self.scale = scale
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+
+    @classmethod
+    def from_flat(cls, flat, probability_dtype=None) -> "CompactForest":
+        """
+        Quantize a FlatForest.
+
+        Parameters:
+            flat (FlatForest): Forest to compact (scaler already folded in).
+            probability_dtype: np.uint8 or np.uint16 for the leaf probabilities. By default
+                uint8 when that stores them exactly, otherwise uint16.
+
+        Returns:
+            CompactForest: Same leaves as ``flat`` for every input.
+        """
+        is_leaf = np.isinf(flat.threshold)
+        n_features = int(flat.feature.max()) + 1
+        grids = [np.unique(flat.threshold[~is_leaf & (flat.feature == f)]) for f in range(n_features)]
+        leaf_code = max(len(grid) for grid in grids)
+        code_dtype = _index_dtype(leaf_code)
+
+        code = np.full(flat.n_nodes, leaf_code, dtype=code_dtype)
+        for f, grid in enumerate(grids):
+            split = ~is_leaf & (flat.feature == f)
+            code[split] = np.searchsorted(grid, flat.threshold[split])
+
+        if probability_dtype is None:
+            exact = np.all(np.round(flat.value[is_leaf] * 255) == flat.value[is_leaf] * 255)
+            probability_dtype = np.uint8 if exact else np.uint16
+        scale = int(np.iinfo(probability_dtype).max)
+        quantized = np.round(flat.value[is_leaf] * scale).astype(probability_dtype)
+        leaf_values, leaf_rows = np.unique(quantized, axis=0, return_inverse=True)
+
+        node_dtype = _index_dtype(max(flat.n_nodes - 1, len(leaf_values) - 1))
+        children = np.column_stack([flat.left, flat.right]).astype(node_dtype)
+        children[is_leaf, 1] = leaf_rows.ravel()
+        return cls(
+            feature=np.where(is_leaf, _LEAF_FEATURE, flat.feature).astype(np.uint8),
+            code=code,
+            children=children,
+            grids=grids,
+            leaf_values=leaf_values,
+            scale=scale,
+            roots=flat.roots.astype(node_dtype),
+            max_depth=flat.max_depth,
+            classes=flat.classes_,
+        )
+
+    _ARRAYS = ("feature", "code", "children", "leaf_values", "roots")
+
+    def save(self, path: str, **metadata) -> None:
+        """Write the forest (and string ``metadata``) to an uncompressed .npz file."""
+        np.savez(path, **{name: getattr(self, name) for name in self._ARRAYS},
+                 **{f"grid_{f}": grid for f, grid in enumerate(self.grids)},
+                 scale=self.scale, max_depth=self.max_depth, classes=self.classes_.astype(str),
+                 **{f"meta_{key}": str(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a forest written by save.
+
+        Returns:
+            tuple: (CompactForest, metadata dict).
+        """
+        with np.load(path, allow_pickle=False) as data:
+            n_features = sum(1 for name in data.files if name.startswith("grid_"))
+            compact = cls(*(data[name] for name in cls._ARRAYS[:3]),
+                          grids=[data[f"grid_{f}"] for f in range(n_features)],
+                          leaf_values=data["leaf_values"], scale=int(data["scale"]), roots=data["roots"],
+                          max_depth=int(data["max_depth"]), classes=data["classes"].astype(object))
+            metadata = {name[5:]: str(data[name]) for name in data.files if name.startswith("meta_")}
+        return compact, metadata
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the forest's arrays."""
+        return (sum(getattr(self, name).nbytes for name in self._ARRAYS)
+                + sum(grid.nbytes for grid in self.grids))
+
+    def rank(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_features) count of grid values below each input; NaN ranks past every grid."""
+        X = np.asarray(X, dtype=np.float64)
+        ranks = np.empty(X.shape[:1] + (len(self.grids),), dtype=self.code.dtype)
+        for f, grid in enumerate(self.grids):
+            ranks[:, f] = np.searchsorted(grid, X[:, f], side="left")
+        return ranks
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node of every tree for every row, shape (n_rows, n_trees)."""
+        ranks = self.rank(X)
+        # 1-D takes on the raveled arrays are cheaper than 2-D fancy indexing, and node
+        # indices are widened each step so 2 * node cannot overflow the stored dtype
+        row_start = (np.arange(len(ranks)) * ranks.shape[1])[:, None]
+        ranks, children = ranks.ravel(), self.children.ravel()
+        node = np.broadcast_to(self.roots.astype(np.intp), (len(row_start), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = ranks.take(row_start + self.feature.take(node)) > self.code.take(node)
+            node = children.take(2 * node.astype(np.intp) + go_right)
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw (unscaled) inputs, in ``classes_`` order."""
+        leaves = self.leaf_values[self.children[self.apply(X), 1]]
+        return leaves.mean(axis=1, dtype=np.float64) / self.scale
+
+    def max_quantization_error(self) -> float:
+        """Upper bound on how far predict_proba can be from the unquantized forest."""
+        return 0.5 / self.scale
@@ -4,29 +4,37 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 
+from metrics import stage
+
 DATA_URL = "https://raw.githubusercontent.com/SiddharthaSomalinga/FireShield/refs/heads/main/dataset.csv"
 
 def load_and_preprocess():
-    df = pd.read_csv(DATA_URL)
-    df.columns = df.columns.str.strip()
-    df['Result'] = df['Result'].astype(str).str.strip().str.lower()
+    with stage("data_loader", "read_csv"):
+        df = pd.read_csv(DATA_URL)
+
+    with stage("data_loader", "clean"):
+        df.columns = df.columns.str.strip()
+        df['Result'] = df['Result'].astype(str).str.strip().str.lower()
 
-    features = ['Temperature', 'RH (Relative Humidity)', 'WS (Wind Speed)', 'Rain']
-    target = 'Result'
+        features = ['Temperature', 'RH (Relative Humidity)', 'WS (Wind Speed)', 'Rain']
+        target = 'Result'
 
-    df = df.dropna(subset=[target])
-    df[features] = df[features].apply(pd.to_numeric, errors='coerce')
-    df[features] = df[features].fillna(df[features].mean())
+        df = df.dropna(subset=[target])
+        df[features] = df[features].apply(pd.to_numeric, errors='coerce')
+        df[features] = df[features].fillna(df[features].mean())
 
     X = df[features]
     y = df[target]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    with stage("data_loader", "split"):
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
+    with stage("data_loader", "scale"):
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
 
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train_scaled, y_train)
+    with stage("data_loader", "fit"):
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train_scaled, y_train)
 
     return model, scaler
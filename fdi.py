@@ -1,95 +1,241 @@
-import openmeteo_requests
-import pandas as pd
-import requests_cache
-from retry_requests import retry
-from datetime import datetime, timezone
+"""
+The Fire Danger Index, in one place.
+
+Scalar (fdi), vectorized (fdi_array) and cached per-location (fdi_at) entry
+points share the tables below. fire_danger_index.py used to carry a second
+copy that disagreed at the edges; its behaviour is available here through the
+legacy_* flags (LEGACY_RULES turns them all on).
+"""
+import os
+
+import numpy as np
+
+from metrics import CACHE_LOOKUPS, stage
+from ttl_cache import TTLCache
 
 def get_days_since_last_rain(latitude: float, longitude: float, lookback_days: int = 90):
-    cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
-
-    end_date = datetime.now().date()
-    start_date = (end_date - pd.Timedelta(days=lookback_days)).strftime("%Y-%m-%d")
-
-    url = "https://archive-api.open-meteo.com/v1/archive"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "start_date": start_date,
-        "end_date": end_date.strftime("%Y-%m-%d"),
-        "hourly": "rain"
-    }
-
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-
-    hourly = response.Hourly()
-    rain = hourly.Variables(0).ValuesAsNumpy()
-    timestamps = pd.date_range(
-        start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-        end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=hourly.Interval()),
-        inclusive="left"
-    )
-
-    df = pd.DataFrame({"datetime": timestamps, "rain": rain})
-    df = df.set_index("datetime").resample("D").sum()
-
-    rainy_days = df[df["rain"] > 0]
-    if rainy_days.empty:
-        return None, None, lookback_days
+    # Only the days missing since the last sync are fetched; see rain_store.RainStore.
+    # Imported here so the HTTP client stack loads on the first lookup, not at startup.
+    from rain_store import get_store
+    return get_store().days_since_last_rain(latitude, longitude, lookback_days)
+
+# Rain history per snapped coordinate; nearby points within the TTL share one archive lookup
+FDI_COORD_PRECISION = int(os.environ.get("FIRESHIELD_FDI_COORD_PRECISION", "2"))
+rain_history_cache = TTLCache(
+    maxsize=int(os.environ.get("FIRESHIELD_FDI_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("FIRESHIELD_FDI_CACHE_TTL", "3600")),
+)
+
+def cached_rain_history(latitude: float, longitude: float):
+    """
+    get_days_since_last_rain for the coordinate snapped to FDI_COORD_PRECISION, through the TTL cache.
+
+    Returns:
+        tuple: ((latitude, longitude) as snapped, (last_rain_date, rainfall, days_since_rain)).
+    """
+    key = (round(latitude, FDI_COORD_PRECISION), round(longitude, FDI_COORD_PRECISION))
+    rain_history = rain_history_cache.get(key)
+    if rain_history is None:
+        CACHE_LOOKUPS.inc("fdi_rain_history", "miss")
+        with stage("fdi", "weather_fetch"):
+            rain_history = get_days_since_last_rain(*key)
+        rain_history_cache.set(key, rain_history)
     else:
-        last_rain_date = rainy_days.index[-1].date()
-        rainfall_on_last_rain = rainy_days.iloc[-1]["rain"]
-        days_since_last_rain = (datetime.now(timezone.utc).date() - last_rain_date).days
-        return last_rain_date, rainfall_on_last_rain, days_since_last_rain
-
-def wind_factor(wind, burn_index):
-    for threshold, add in zip([3, 9, 17, 26, 33, 37, 42, 46], [0, 5, 10, 15, 20, 25, 30, 35]):
-        if wind < threshold:
-            return burn_index + add
-    return burn_index + 40
+        CACHE_LOOKUPS.inc("fdi_rain_history", "hit")
+    return key, rain_history
+
+# Wind speed band upper bounds (km/h) and the burn index increment for each band
+WIND_THRESHOLDS = [3, 9, 17, 26, 33, 37, 42, 46]
+WIND_ADDS = [0, 5, 10, 15, 20, 25, 30, 35]
+WIND_MAX_ADD = 40
+
+# Lookup table for (rain_range, max_days, multipliers)
+ADJUSTMENT_THRESHOLDS = [
+    (0, 2.7,   [0.7, 0.9, 1.0]),
+    (2.7, 5.3, [0.6, 0.8, 0.9, 1.0]),
+    (5.3, 7.7, [0.5, 0.7, 0.9, 0.9, 1.0]),
+    (7.7, 10.3,[0.4, 0.6, 0.8, 0.9, 0.9, 1.0]),
+    (10.3, 12.9,[0.4, 0.6, 0.7, 0.8, 0.9, 0.9, 1.0]),
+    (12.9, 15.4,[0.3, 0.5, 0.7, 0.8, 0.8, 0.9, 1.0]),
+    (15.4, 20.6,[0.2, 0.5, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+    (20.6, 25.6,[0.2, 0.4, 0.5, 0.7, 0.7, 0.8, 0.9, 0.9, 1.0]),
+    (25.6, 38.5,[0.1, 0.3, 0.4, 0.6, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+    (38.5, 51.2,[0.0, 0.2, 0.4, 0.5, 0.5, 0.6, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
+    (51.2, 63.9,[0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.7, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 0.9, 1.0]),
+    (63.9, 76.6,[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0]),
+    (76.6, float("inf"), [0.0, 0.0, 0.1, 0.2, 0.4, 0.5, 0.6, 0.6, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0])
+]
+
+# Precomputed indexes over the tables above, so the scalar path does no list
+# building or linear scans. This makes it as fast as fire_danger_index.py's
+# original hard-coded if/elif ladder (about 1 µs a call, see the
+# fdi_scalar_lookup benchmark) while reading the same tables as fdi_array; it
+# is not faster than the ladder, only than scanning the tables per call (~3x).
+# Wind thresholds are whole km/h, so the increment can be read straight from
+# the integer part of the wind speed.
+_WIND_ADD_BY_KMH = tuple(
+    next(add for threshold, add in zip(WIND_THRESHOLDS, WIND_ADDS) if kmh < threshold)
+    for kmh in range(WIND_THRESHOLDS[-1])
+)
+# Rain band edges sit on 0.1 mm steps: index the band by tenths of a mm, then one
+# comparison corrects values just under an edge whose rain * 10 rounds up onto it.
+_INF = float("inf")
+_RAIN_LOWS = tuple(low for low, _, _ in ADJUSTMENT_THRESHOLDS)
+_RAIN_TOP_BAND = len(ADJUSTMENT_THRESHOLDS) - 1
+_RAIN_BAND_BY_TENTH = tuple(
+    max(band for band, low in enumerate(_RAIN_LOWS) if low <= tenth / 10)
+    for tenth in range(int(_RAIN_LOWS[-1] * 10))
+)
+# Multipliers per band, padded to _MAX_DAYS with each band's last factor, which
+# is what min(days_rain - 1, len(factors) - 1) picks for longer dry spells
+_MAX_DAYS = max(len(factors) for _, _, factors in ADJUSTMENT_THRESHOLDS)
+_ADJUSTMENT_ROWS = tuple(
+    tuple(factors) + (factors[-1],) * (_MAX_DAYS - len(factors))
+    for _, _, factors in ADJUSTMENT_THRESHOLDS
+)
+
+def wind_factor(wind, burn_index, legacy_negative_wind=False):
+    if 0 <= wind < WIND_THRESHOLDS[-1]:
+        return burn_index + _WIND_ADD_BY_KMH[int(wind)]
+    if wind < 0 and not legacy_negative_wind:
+        return burn_index + WIND_ADDS[0]
+    # fire_danger_index.wind_factor let negative speeds fall through to the top band
+    return burn_index + WIND_MAX_ADD
 
 def get_adjustment_factor(rain, days_rain):
-    # Lookup table for (rain_range, max_days, multipliers)
-    thresholds = [
-        (0, 2.7,   [0.7, 0.9, 1.0]),
-        (2.7, 5.3, [0.6, 0.8, 0.9, 1.0]),
-        (5.3, 7.7, [0.5, 0.7, 0.9, 0.9, 1.0]),
-        (7.7, 10.3,[0.4, 0.6, 0.8, 0.9, 0.9, 1.0]),
-        (10.3, 12.9,[0.4, 0.6, 0.7, 0.8, 0.9, 0.9, 1.0]),
-        (12.9, 15.4,[0.3, 0.5, 0.7, 0.8, 0.8, 0.9, 1.0]),
-        (15.4, 20.6,[0.2, 0.5, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
-        (20.6, 25.6,[0.2, 0.4, 0.5, 0.7, 0.7, 0.8, 0.9, 0.9, 1.0]),
-        (25.6, 38.5,[0.1, 0.3, 0.4, 0.6, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
-        (38.5, 51.2,[0.0, 0.2, 0.4, 0.5, 0.5, 0.6, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0]),
-        (51.2, 63.9,[0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.7, 0.7, 0.7, 0.8, 0.8, 0.9, 0.9, 0.9, 1.0]),
-        (63.9, 76.6,[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0]),
-        (76.6, float("inf"), [0.0, 0.0, 0.1, 0.2, 0.4, 0.5, 0.6, 0.6, 0.6, 0.6, 0.7, 0.7, 0.8, 0.8, 0.8, 0.9, 0.9, 0.9, 0.9, 0.9, 1.0])
-    ]
-
-    for low, high, factors in thresholds:
-        if low <= rain < high:
-            index = min(days_rain - 1, len(factors) - 1)
-            return factors[index]
-    return 1.0
-
-def fdi(temperature, humidity, wind, days_rain, rain):
+    # NaN, negative and infinite rain fall outside every band
+    if not 0 <= rain < _INF:
+        return 1.0
+    if rain >= _RAIN_LOWS[-1]:
+        band = _RAIN_TOP_BAND
+    else:
+        band = _RAIN_BAND_BY_TENTH[int(rain * 10)]
+        if rain < _RAIN_LOWS[band]:
+            band -= 1
+    return _ADJUSTMENT_ROWS[band][min(days_rain - 1, _MAX_DAYS - 1)]
+
+# fire_danger_index.py's edge-case behaviour, as keyword arguments for fdi() and fdi_array()
+LEGACY_RULES = {"legacy_zero_days": True, "legacy_wind_clamp": True, "legacy_nonfinite_rain": True}
+
+def fdi(temperature, humidity, wind, days_rain, rain, *,
+        legacy_zero_days=False, legacy_wind_clamp=False, legacy_nonfinite_rain=False):
+    """
+    Calculate the Fire Danger Index (FDI).
+
+    Parameters:
+        temperature (float): Temperature (°C).
+        humidity (float): Humidity (%).
+        wind (float): Wind speed (km/h).
+        days_rain (int): Days since last rain (whole days).
+        rain (float): Amount of last rain (mm).
+        legacy_zero_days (bool): days_rain below 1 counts as 21 dry days instead of 1.
+        legacy_wind_clamp (bool): Only wind <= 2 is raised to 3, so wind in (2, 3) stays in the lowest band.
+        legacy_nonfinite_rain (bool): NaN rain gives 0 and infinite rain uses the top band,
+            instead of no rain adjustment.
+
+    Returns:
+        int: Fire Danger Index value (rounded).
+    """
     temperature_factor = (temperature - 3) * 6.7
     humidity_factor = (90 - humidity) * 2.6
 
-    rain = max(rain, 1)
-    days_rain = max(days_rain, 1)
-    wind = max(wind, 3)
+    # Same clamping as max(rain, 1), max(days_rain, 1), max(wind, 3), without the calls
+    if rain < 1:
+        rain = 1
+    if days_rain < 1:
+        days_rain = 21 if legacy_zero_days else 1
+    if wind < 3 and (wind <= 2 or not legacy_wind_clamp):
+        wind = 3
 
     burn_factor = temperature_factor - humidity_factor
     burn_index = (burn_factor / 2 + humidity_factor) / 3.3
     wind_fac = wind_factor(wind, burn_index)
 
-    adjustment = get_adjustment_factor(rain, days_rain)
+    if legacy_nonfinite_rain and not rain < _INF:
+        adjustment = 0.0 if rain != rain else _ADJUSTMENT_ROWS[_RAIN_TOP_BAND][min(days_rain - 1, _MAX_DAYS - 1)]
+    else:
+        adjustment = get_adjustment_factor(rain, days_rain)
     return round(wind_fac * adjustment)
 
+# Colour bands for FDI values: Blue (insignificant) 0-20, Green (low) 21-45,
+# Yellow (moderate) 46-60, Orange (high) 61-75 and Red (extremely high) above 75
+FDI_BANDS = [(20, "Blue"), (45, "Green"), (60, "Yellow"), (75, "Orange")]
+
+def fdi_band(value):
+    for upper, colour in FDI_BANDS:
+        if value <= upper:
+            return colour
+    return "Red"
+
+_BAND_UPPERS = np.array([upper for upper, _ in FDI_BANDS], dtype=np.float64)
+_BAND_COLOURS = np.array([colour for _, colour in FDI_BANDS] + ["Red"])
+
+def fdi_band_array(values):
+    """Vectorized fdi_band(): colour names for an array of FDI values."""
+    return _BAND_COLOURS[np.searchsorted(_BAND_UPPERS, np.asarray(values, dtype=np.float64), side="left")]
+
+# Array form of the tables above, built once at import for fdi_array
+_WIND_EDGES = np.array(WIND_THRESHOLDS, dtype=np.float64)
+_WIND_ADDS = np.array(WIND_ADDS + [WIND_MAX_ADD], dtype=np.float64)
+_RAIN_EDGES = np.array(_RAIN_LOWS, dtype=np.float64)
+# Rows are rain bands, columns are days since rain (1.._MAX_DAYS); the extra
+# rows are 1.0 for rain that falls outside every band and 0.0 for legacy NaN rain.
+_NO_ADJUSTMENT_ROW = len(ADJUSTMENT_THRESHOLDS)
+_ZERO_ROW = _NO_ADJUSTMENT_ROW + 1
+_ADJUSTMENT_MATRIX = np.array(_ADJUSTMENT_ROWS + ((1.0,) * _MAX_DAYS, (0.0,) * _MAX_DAYS), dtype=np.float64)
+
+def fdi_array(temperature, humidity, wind, days_rain, rain, *,
+              legacy_zero_days=False, legacy_wind_clamp=False, legacy_nonfinite_rain=False):
+    """
+    Vectorized fdi() over NumPy arrays (or anything broadcastable to one).
+
+    Applies the same clamping and legacy_* flags as fdi(); results are identical
+    to calling fdi() per element.
+
+    Returns:
+        np.ndarray: Integer FDI values with the broadcast shape of the inputs.
+    """
+    temperature = np.asarray(temperature, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind = np.asarray(wind, dtype=np.float64)
+    wind = np.where(wind <= 2, 3, wind) if legacy_wind_clamp else np.maximum(wind, 3)
+    days_rain = np.asarray(days_rain)
+    days_rain = np.where(days_rain < 1, 21 if legacy_zero_days else 1, days_rain)
+    rain = np.maximum(np.asarray(rain, dtype=np.float64), 1)
+
+    temperature_factor = (temperature - 3) * 6.7
+    humidity_factor = (90 - humidity) * 2.6
+    burn_factor = temperature_factor - humidity_factor
+    burn_index = (burn_factor / 2 + humidity_factor) / 3.3
+    wind_fac = burn_index + _WIND_ADDS[np.searchsorted(_WIND_EDGES, wind, side="right")]
+
+    band = np.searchsorted(_RAIN_EDGES, rain, side="right") - 1
+    if legacy_nonfinite_rain:
+        # +inf already lands in the top band
+        band = np.where(np.isnan(rain), _ZERO_ROW, band)
+    else:
+        band = np.where(np.isfinite(rain), band, _NO_ADJUSTMENT_ROW)
+    day = np.minimum(days_rain - 1, _MAX_DAYS - 1).astype(np.intp)
+    adjustment = _ADJUSTMENT_MATRIX[band, day]
+
+    result = np.rint(wind_fac * adjustment)
+    if not np.all(np.isfinite(result)):
+        raise ValueError("fdi_array inputs produced a non-finite FDI value")
+    return result.astype(np.int64)
+
+def fdi_at(latitude, longitude, temperature, humidity, wind, **rules):
+    """
+    FDI at a location, with its rain history from cached_rain_history.
+
+    Returns:
+        tuple: (fdi value, snapped (latitude, longitude), (last_rain_date, rainfall, days_since_rain)).
+    """
+    key, rain_history = cached_rain_history(latitude, longitude)
+    _, rainfall, days_since_rain = rain_history
+    with stage("fdi", "compute"):
+        value = fdi(temperature, humidity, wind, days_since_rain, rainfall or 0, **rules)
+    return value, key, rain_history
+
 # Example usage:
 if __name__ == "__main__":
     # The Fire Danger Index (FDI) uses 5 categories to rate the fire danger represented by colour codes [Blue (insignificant) (0-20), Green (low) (21-45), Yellow (moderate) (46-60), Orange (high) (61-75) and Red (extremely high) (75<)]. Each of the danger rating is accompanied by precaution statement.
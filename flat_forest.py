@@ -0,0 +1,204 @@
+"""
+Array-backed evaluator for a fitted RandomForestClassifier.
+
+All trees are flattened into shared node arrays (feature, threshold, left,
+right, leaf probabilities), and the StandardScaler is folded into the
+thresholds, so a prediction is a fixed number of vectorized gathers over raw
+inputs: no scaling step, no input validation, no per-tree Python calls.
+
+Evaluating (and loading a saved forest) needs only NumPy; sklearn is imported
+only to export from a fitted model.
+"""
+import numpy as np
+
+# sklearn.tree._tree.TREE_LEAF, without importing sklearn
+_TREE_LEAF = -1
+
+
+def is_tree_ensemble(model) -> bool:
+    """Whether ``model`` is a fitted forest of sklearn decision trees that FlatForest can export."""
+    estimators = getattr(model, "estimators_", None)
+    return estimators is not None and len(estimators) > 0 and all(hasattr(tree, "tree_") for tree in estimators)
+
+
+def float32_boundary(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float64 ``s`` with ``float32(s) <= threshold``.
+
+    sklearn casts inputs to float32 before comparing them with the (float64)
+    split thresholds, so the exact decision boundary for float64 inputs sits
+    halfway to the next float32 above the threshold.
+    """
+    below = threshold.astype(np.float32)
+    below = np.where(below > threshold, np.nextafter(below, np.float32(-np.inf)), below)
+    above = np.nextafter(below, np.float32(np.inf))
+    midpoint = (below.astype(np.float64) + above.astype(np.float64)) / 2
+    # A value exactly halfway rounds to the float32 with an even mantissa
+    rounds_down = (below.view(np.int32) & 1) == 0
+    return np.where(rounds_down, midpoint, np.nextafter(midpoint, -np.inf))
+
+
+def _to_ordered(x: np.ndarray) -> np.ndarray:
+    """float64 values as int64 keys in the same order, one apart for neighbouring floats."""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.int64)
+    magnitude = bits & np.int64(np.iinfo(np.int64).max)
+    return np.where(bits < 0, -magnitude, magnitude)
+
+
+def _from_ordered(key: np.ndarray) -> np.ndarray:
+    magnitude = np.abs(key)
+    return np.where(key < 0, magnitude | np.int64(np.iinfo(np.int64).min), magnitude).view(np.float64)
+
+
+def fold_scaler(boundary: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Largest raw ``x`` with ``(x - mean) / scale <= boundary`` in float64 arithmetic.
+
+    Starts from the algebraic inverse and searches the floats around it (by
+    bisection over their ordering, since a threshold folded close to zero can be
+    millions of ulps away from that estimate) so the folded comparison agrees
+    with StandardScaler.transform bit for bit.
+    """
+    def goes_left(key):
+        return (_from_ordered(key) - mean) / scale <= boundary
+
+    estimate = _to_ordered(boundary * scale + mean)
+    limit = _to_ordered(np.float64(np.finfo(np.float64).max))
+    # Bracket the answer, low going left and high not, with steps growing by powers of two
+    low, high = estimate, np.minimum(estimate, limit - 1) + 1
+    for power in range(64):
+        step = np.int64(1) << np.int64(power)
+        too_high, too_low = ~goes_left(low), goes_left(high)
+        if not (too_high.any() or too_low.any()):
+            break
+        low = np.where(too_high, np.maximum(estimate, -limit + step) - step, low)
+        high = np.where(too_low, np.minimum(estimate, limit - 2 * step) + 2 * step, high)
+    while True:
+        open_interval = high > low + 1
+        if not open_interval.any():
+            break
+        # Midpoint without overflowing int64
+        middle = (low >> 1) + (high >> 1) + (low & high & 1)
+        left = goes_left(middle)
+        low = np.where(open_interval & left, middle, low)
+        high = np.where(open_interval & ~left, middle, high)
+    return _from_ordered(low)
+
+
+class FlatForest:
+    """
+    Flattened random forest.
+
+    Leaves point at themselves and carry an infinite threshold, so every tree
+    can be stepped ``max_depth`` times in lockstep without masking.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> "FlatForest":
+        """
+        Export a fitted forest (and optionally the scaler it was trained behind).
+
+        Parameters:
+            model (RandomForestClassifier): Fitted forest, e.g. ForestFireModel.model.
+            scaler (StandardScaler): Scaler applied before the forest; folded into the thresholds.
+
+        Raises:
+            TypeError: When ``model`` is not a forest of decision trees (e.g. gradient boosting).
+        """
+        if not is_tree_ensemble(model):
+            raise TypeError(f"FlatForest exports forests of decision trees (random forest, extra-trees), "
+                            f"not {type(model).__name__}; serve it with the sklearn engine")
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == _TREE_LEAF
+            own_index = np.arange(n) + offset
+
+            feature = np.where(is_leaf, 0, tree.feature)
+            threshold = float32_boundary(tree.threshold.astype(np.float64))
+            if scaler is not None:
+                threshold = fold_scaler(threshold, scaler.mean_[feature], scaler.scale_[feature])
+            threshold = np.where(is_leaf, np.inf, threshold)
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            value /= value.sum(axis=1, keepdims=True)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+        )
+
+    _ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+    def save(self, path: str, **metadata) -> None:
+        """Write the node arrays (and string ``metadata``) to an uncompressed .npz file."""
+        np.savez(path, **{name: getattr(self, name) for name in self._ARRAYS},
+                 max_depth=self.max_depth, classes=self.classes_.astype(str),
+                 **{f"meta_{key}": str(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Read a forest written by save.
+
+        Returns:
+            tuple: (FlatForest, metadata dict).
+        """
+        with np.load(path, allow_pickle=False) as data:
+            flat = cls(*(data[name] for name in cls._ARRAYS), max_depth=int(data["max_depth"]),
+                       classes=data["classes"].astype(object))
+            metadata = {name[5:]: str(data[name]) for name in data.files if name.startswith("meta_")}
+        return flat, metadata
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf index of every tree for every row, shape (n_rows, n_trees)."""
+        X = np.asarray(X, dtype=np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw (unscaled) inputs, in ``classes_`` order."""
+        return self.value[self.apply(X)].mean(axis=1)
+
+
+def max_probability_error(flat: FlatForest, model, scaler, X: np.ndarray) -> float:
+    """Largest absolute difference between the flat forest and sklearn on the rows of ``X``."""
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict_proba(scaler.transform(X))
+    return float(np.abs(flat.predict_proba(X) - expected).max())
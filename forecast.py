@@ -0,0 +1,136 @@
+"""
+Fire-risk forecast: forest probability and FDI for each of the next 1-16 days.
+
+For a batch of locations this makes one daily-forecast request per batch (see
+WeatherClient.daily_forecast) and one rain-store sync for the archive history.
+Days since rain are then carried through the forecast with a running maximum
+over rainy-day indices, not an archive query per day. Every location-day is
+scored in a single forest pass and a single fdi_array call.
+
+    python forecast.py --location 33.1507,-96.8236 --days 10
+"""
+import argparse
+import json
+import sys
+from typing import Sequence
+
+import numpy as np
+
+from fdi import fdi_array, fdi_band_array
+from metrics import stage
+
+
+def rolling_rain_state(rain: np.ndarray, days_before: np.ndarray, rainfall_before: np.ndarray):
+    """
+    Days since rain and the amount of that rain, for every forecast day.
+
+    Parameters:
+        rain (np.ndarray): (n, days) forecast daily rain (mm); day 0 is today. NaN counts as dry.
+        days_before (np.ndarray): (n,) days since the last rain before the forecast, as of today.
+        rainfall_before (np.ndarray): (n,) rain (mm) on that day (0 if none within the lookback).
+
+    Returns:
+        tuple: (days_since_rain int64 (n, days), rainfall float64 (n, days)), the FDI's
+        days_rain and rain inputs. A rainy day counts as 0 days since rain.
+    """
+    day_index = np.arange(rain.shape[1])
+    last_rainy = np.maximum.accumulate(np.where(rain > 0, day_index, -1), axis=1)
+    forecast_rain = last_rainy >= 0
+    days_since = np.where(forecast_rain, day_index - last_rainy, days_before[:, None] + day_index)
+    rainfall = np.where(forecast_rain, np.take_along_axis(rain, np.maximum(last_rainy, 0), axis=1),
+                        rainfall_before[:, None])
+    return days_since.astype(np.int64), rainfall.astype(np.float64)
+
+
+def forecast_risk(coords: Sequence[tuple], predict_fn, days: int = 7, client=None, store=None,
+                  lookback_days: int = 90) -> list:
+    """
+    Score the daily forecast of every location.
+
+    Parameters:
+        coords: (latitude, longitude) pairs.
+        predict_fn: Takes an (n, 4) Temperature/RH/WS/Rain matrix and returns
+            (fire, not_fire) probability arrays, e.g. main.predict_matrix.
+        days (int): Forecast days, 1-16, starting today.
+        client (WeatherClient): Forecast source (defaults to the shared client).
+        store (RainStore): Rain history before today (defaults to the shared store).
+
+    Returns:
+        list: One dict per location, in input order, with the dates and per-day
+        weather inputs, days since rain, fire probability (percent), FDI and FDI band.
+    """
+    from rain_store import get_store
+    from weather_client import get_client
+
+    coords = [(float(lat), float(lon)) for lat, lon in coords]
+    client = client or get_client()
+    store = store or get_store()
+
+    with stage("forecast", "weather_fetch"):
+        dates, features = client.daily_forecast(coords, days)
+        store.sync(coords, lookback_days)
+    with stage("forecast", "rain_state"):
+        history = [store.last_rain(lat, lon, lookback_days) for lat, lon in coords]
+        days_before = np.array([days_since for _, _, days_since in history], dtype=np.int64)
+        rainfall_before = np.array([mm or 0 for _, mm, _ in history], dtype=np.float64)
+        days_since, rainfall = rolling_rain_state(features[:, :, 3], days_before, rainfall_before)
+
+    with stage("forecast", "score"):
+        # Missing forecast rain is treated as dry, like the risk map does for today; days
+        # missing any other input are scored on placeholders and reported as null
+        features[:, :, 3] = np.nan_to_num(features[:, :, 3])
+        missing = np.isnan(features[:, :, :3]).any(axis=2)
+        flat = np.nan_to_num(features).reshape(-1, features.shape[2])
+        prob_fire, _ = predict_fn(flat)
+        fdi_values = fdi_array(flat[:, 0], flat[:, 1], flat[:, 2], days_since.ravel(), rainfall.ravel())
+        bands = fdi_band_array(fdi_values)
+
+    shape = features.shape[:2]
+    prob_fire = np.round(prob_fire * 100, 2).reshape(shape)
+    fdi_values, bands = fdi_values.reshape(shape), bands.reshape(shape)
+    date_strings = dates.astype(str).tolist()
+    return [
+        {
+            "latitude": lat,
+            "longitude": lon,
+            "dates": date_strings,
+            "temperature": _with_gaps(features[i, :, 0], missing[i]),
+            "humidity": _with_gaps(features[i, :, 1], missing[i]),
+            "wind": _with_gaps(features[i, :, 2], missing[i]),
+            "rain": features[i, :, 3].tolist(),
+            "days_since_rain": days_since[i].tolist(),
+            "fire_probability": _with_gaps(prob_fire[i], missing[i]),
+            "fdi": _with_gaps(fdi_values[i], missing[i]),
+            "band": _with_gaps(bands[i], missing[i]),
+        }
+        for i, (lat, lon) in enumerate(coords)
+    ]
+
+
+def _with_gaps(values: np.ndarray, missing: np.ndarray) -> list:
+    """``values`` as a list, with None on the days flagged in ``missing``."""
+    values = values.tolist()
+    if missing.any():
+        values = [None if gap else value for value, gap in zip(values, missing.tolist())]
+    return values
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", action="append", required=True, help="lat,lon (repeatable)")
+    parser.add_argument("--days", type=int, default=7, help="Forecast days, 1-16")
+    parser.add_argument("--engine", choices=["sklearn", "flat", "compact", "table"], default="flat")
+    args = parser.parse_args(argv)
+
+    from artifact import DEFAULT_ARTIFACT_PATH
+    from serving_model import ServingModel
+
+    coords = [tuple(float(value) for value in location.split(",")) for location in args.location]
+    serving_model = ServingModel.from_artifact(DEFAULT_ARTIFACT_PATH, args.engine)
+    for location in forecast_risk(coords, serving_model.predict_matrix, args.days):
+        json.dump(location, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
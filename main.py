@@ -1,12 +1,52 @@
-from fastapi import FastAPI
+import os
+import time
+from typing import List, Optional, Union
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import numpy as np
-from data_loader import load_and_preprocess
+from artifact import DEFAULT_ARTIFACT_PATH
+from batcher import MicroBatcher
+from binary_io import (ARROW_CONTENT_TYPE, RAW_CONTENT_TYPE, BinaryFormatError, encode_arrow, encode_raw,
+                       parse_arrow, parse_raw)
+from fdi import fdi_at, fdi_band, rain_history_cache
+from forecast import forecast_risk
+from metrics import REGISTRY, MetricsMiddleware, stage
+from prediction_cache import PredictionCache
+from risk_map import BoundingBox, grid_shape, ndjson_stream
+from serving_model import ModelHolder, ServingModel
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+# Load model and scaler at startup from the prebuilt artifact (see artifact.py).
+# Retraining from the remote CSV only happens when explicitly requested.
+# Inference engine: "sklearn" (default), "flat", the array-compiled forest in flat_forest.py,
+# "compact", its quantized form in compact_forest.py, or "table", lookups in a precomputed
+# grid of predictions (prediction_table.py)
+INFERENCE_ENGINE = os.environ.get("FIRESHIELD_ENGINE", "sklearn")
+# The served model lives behind one reference that /admin/reload swaps atomically.
+if os.environ.get("FIRESHIELD_RETRAIN") == "1":
+    from data_loader import load_and_preprocess
+    model_holder = ModelHolder(ServingModel(*load_and_preprocess(), INFERENCE_ENGINE, version="startup-retrain"))
+else:
+    model_holder = ModelHolder(ServingModel.from_artifact(DEFAULT_ARTIFACT_PATH, INFERENCE_ENGINE))
+
+# Reload the artifact whenever it changes on disk (0 = off). Started per worker,
+# since serve.py forks after this module is imported.
+MODEL_WATCH_SECONDS = float(os.environ.get("FIRESHIELD_MODEL_WATCH_SECONDS", "0"))
+
+
+@app.on_event("startup")
+def start_model_watcher():
+    if MODEL_WATCH_SECONDS > 0:
+        model_holder.watch(DEFAULT_ARTIFACT_PATH, MODEL_WATCH_SECONDS)
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("FIRESHIELD_ADMIN_TOKEN")
 
-# Load model and scaler at startup
-model, scaler = load_and_preprocess()
 
 class Features(BaseModel):
     Temperature: float
@@ -14,21 +54,313 @@ class Features(BaseModel):
     WS: float
     Rain: float
 
+
+class FDIRequest(BaseModel):
+    latitude: float
+    longitude: float
+    Temperature: float
+    RH: float
+    WS: float
+
+
+class FeatureColumns(BaseModel):
+    Temperature: List[float]
+    RH: List[float]
+    WS: List[float]
+    Rain: List[float]
+
+
+def predict_matrix(input_array: np.ndarray):
+    """Score an (n, 4) feature matrix, returning fire and not-fire probabilities (0-1)."""
+    # One read of the reference: a reload mid-request cannot mix two models
+    return model_holder.current.predict_matrix(input_array)
+
+
+def predict_row(row: list):
+    with stage("predict", "build_array"):
+        input_array = np.array([row])
+    prob_fire, prob_no_fire = predict_matrix(input_array)
+    return float(prob_fire[0]), float(prob_no_fire[0])
+
+
+# Micro-batching of concurrent /predict calls, enabled by setting a window in ms
+BATCH_WINDOW_MS = float(os.environ.get("FIRESHIELD_BATCH_WINDOW_MS", "0"))
+batcher = MicroBatcher(
+    predict_matrix,
+    max_batch_size=int(os.environ.get("FIRESHIELD_BATCH_MAX_SIZE", "64")),
+    max_wait_ms=BATCH_WINDOW_MS,
+) if BATCH_WINDOW_MS > 0 else None
+
+
+# Memoized /predict results per model version (0 = off, for deployments that must score every call).
+# With FIRESHIELD_PREDICT_CACHE_DECIMALS set, inputs are rounded to that many decimals first.
+PREDICT_CACHE_SIZE = int(os.environ.get("FIRESHIELD_PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_DECIMALS = os.environ.get("FIRESHIELD_PREDICT_CACHE_DECIMALS")
+prediction_cache = PredictionCache(
+    maxsize=PREDICT_CACHE_SIZE,
+    decimals=int(PREDICT_CACHE_DECIMALS) if PREDICT_CACHE_DECIMALS else None,
+) if PREDICT_CACHE_SIZE > 0 else None
+
+
 @app.post("/predict")
-def predict_fire(data: Features):
-    input_array = np.array([[data.Temperature, data.RH, data.WS, data.Rain]])
-    scaled = scaler.transform(input_array)
-    probs = model.predict_proba(scaled)[0]
-    labels = model.classes_
+async def predict_fire(data: Features, request: Request):
+    start = time.perf_counter()
+    row = [data.Temperature, data.RH, data.WS, data.Rain]
+    cached = None
+    if prediction_cache is not None:
+        with stage("predict", "cache_lookup"):
+            version, key = model_holder.current.version, prediction_cache.key(row)
+            cached = prediction_cache.get(version, key)
+        row = list(key)
 
-    prob_fire = sum(probs[i] for i, label in enumerate(labels) if label.strip() == "fire")
-    prob_no_fire = sum(probs[i] for i, label in enumerate(labels) if label.strip() == "not fire")
+    if cached is not None:
+        prob_fire, prob_no_fire = cached
+    else:
+        if batcher is not None:
+            prob_fire, prob_no_fire = await batcher.submit(row)
+        else:
+            prob_fire, prob_no_fire = await run_in_threadpool(predict_row, row)
+        if prediction_cache is not None:
+            prediction_cache.set(version, key, (prob_fire, prob_no_fire))
 
     prediction = "fire" if prob_fire > prob_no_fire else "not fire"
+    with stage("predict", "serialize"):
+        response = JSONResponse({
+            "prediction": prediction,
+            "probabilities": {
+                "fire": round(prob_fire * 100, 2),
+                "not_fire": round(prob_no_fire * 100, 2)
+            }
+        })
+    # Lets MetricsMiddleware attribute the rest of the request time to validation/routing
+    request.scope["fireshield.handler"] = ("predict", time.perf_counter() - start)
+    return response
+
+
+@app.get("/predict/batcher")
+def predict_batcher_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/predict/cache")
+def predict_cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return prediction_cache.stats()
+
+
+@app.post("/predict/batch")
+def predict_fire_batch(data: Union[List[Features], FeatureColumns]):
+    """
+    Score many rows with a single scaler/forest pass.
+
+    Accepts either a list of Features objects or columnar arrays, and returns
+    columnar results in input order.
+    """
+    if isinstance(data, FeatureColumns):
+        columns = (data.Temperature, data.RH, data.WS, data.Rain)
+        if len({len(column) for column in columns}) > 1:
+            raise HTTPException(status_code=422, detail="All feature columns must have the same length")
+        input_array = np.column_stack(columns).astype(np.float64)
+    else:
+        input_array = np.array([[f.Temperature, f.RH, f.WS, f.Rain] for f in data], dtype=np.float64)
+
+    if input_array.size == 0:
+        return {"predictions": [], "probabilities": {"fire": [], "not_fire": []}}
+
+    prob_fire, prob_no_fire = predict_matrix(input_array.reshape(-1, 4))
+    predictions = np.where(prob_fire > prob_no_fire, "fire", "not fire")
     return {
-        "prediction": prediction,
+        "predictions": predictions.tolist(),
         "probabilities": {
-            "fire": round(prob_fire * 100, 2),
-            "not_fire": round(prob_no_fire * 100, 2)
+            "fire": np.round(prob_fire * 100, 2).tolist(),
+            "not_fire": np.round(prob_no_fire * 100, 2).tolist()
         }
     }
+
+
+@app.post("/predict/binary")
+async def predict_fire_binary(request: Request, dtype: str = "float64"):
+    """
+    Score a binary columnar body (see binary_io.py) and answer in the same format.
+
+    Raw ``application/octet-stream`` bodies are Temperature, RH, WS and Rain
+    columns of little-endian ``dtype`` values; the response carries the fire and
+    not-fire probabilities (percent, unrounded) as two columns of that dtype.
+    Arrow IPC bodies get an Arrow stream back.
+    """
+    content_type = request.headers.get("content-type", RAW_CONTENT_TYPE).split(";")[0].strip()
+    if content_type not in (RAW_CONTENT_TYPE, ARROW_CONTENT_TYPE):
+        raise HTTPException(status_code=415, detail=f"Expected {RAW_CONTENT_TYPE} or {ARROW_CONTENT_TYPE}")
+    body = await request.body()
+    try:
+        with stage("predict_binary", "decode"):
+            input_array = parse_arrow(body) if content_type == ARROW_CONTENT_TYPE else parse_raw(body, dtype)
+    except BinaryFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow request bodies need pyarrow installed on the server")
+
+    if len(input_array):
+        prob_fire, prob_no_fire = await run_in_threadpool(predict_matrix, input_array)
+    else:
+        prob_fire = prob_no_fire = np.empty(0)
+
+    with stage("predict_binary", "encode"):
+        if content_type == ARROW_CONTENT_TYPE:
+            content = encode_arrow(prob_fire, prob_no_fire)
+        else:
+            content = encode_raw(prob_fire, prob_no_fire, dtype)
+    return Response(content, media_type=content_type, headers={"X-Rows": str(len(input_array))})
+
+
+@app.post("/fdi")
+def fire_danger_index(data: FDIRequest):
+    value, key, (last_rain_date, rainfall, days_since_rain) = fdi_at(
+        data.latitude, data.longitude, data.Temperature, data.RH, data.WS)
+    return {
+        "fdi": value,
+        "band": fdi_band(value),
+        "rain_history": {
+            "latitude": key[0],
+            "longitude": key[1],
+            "last_rain_date": last_rain_date,
+            "rainfall_mm": rainfall,
+            "days_since_rain": days_since_rain
+        }
+    }
+
+
+@app.get("/fdi/cache")
+def fdi_cache_stats():
+    return rain_history_cache.stats()
+
+
+REGISTRY.gauge_callback("fireshield_fdi_cache_entries", "Entries in the /fdi rain-history cache",
+                        lambda: len(rain_history_cache))
+REGISTRY.gauge_callback("fireshield_predict_cache_entries", "Entries in the /predict result cache",
+                        lambda: len(prediction_cache) if prediction_cache is not None else 0)
+REGISTRY.gauge_callback("fireshield_batcher_queue_depth", "Rows waiting for the /predict micro-batcher",
+                        lambda: batcher.stats()["queue_depth"] if batcher is not None else 0)
+
+
+class RiskMapRequest(BaseModel):
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+    resolution: float
+    tile_size: int = 32
+
+
+# Upper bound on grid points per /risk-map request (each point costs weather lookups)
+RISK_MAP_MAX_POINTS = int(os.environ.get("FIRESHIELD_RISK_MAP_MAX_POINTS", "250000"))
+
+
+@app.post("/risk-map")
+def risk_map(data: RiskMapRequest):
+    """
+    Fire probability and FDI over a bounding box, streamed as NDJSON tiles.
+
+    Each line is one tile of up to tile_size x tile_size grid points (see
+    risk_map.score_tile), sent as soon as it has been scored.
+    """
+    bbox = BoundingBox(data.min_latitude, data.min_longitude, data.max_latitude, data.max_longitude)
+    try:
+        rows, columns = grid_shape(bbox, data.resolution)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if not 1 <= data.tile_size <= 256:
+        raise HTTPException(status_code=422, detail="tile_size must be between 1 and 256")
+    if rows * columns > RISK_MAP_MAX_POINTS:
+        raise HTTPException(status_code=422,
+                            detail=f"Grid has {rows * columns} points; the limit is {RISK_MAP_MAX_POINTS}")
+    return StreamingResponse(
+        ndjson_stream(bbox, data.resolution, predict_matrix, data.tile_size),
+        media_type="application/x-ndjson",
+        headers={"X-Grid-Shape": f"{rows}x{columns}"},
+    )
+
+
+class Location(BaseModel):
+    latitude: float
+    longitude: float
+
+
+class ForecastRequest(BaseModel):
+    locations: List[Location]
+    days: int = 7
+
+
+# Upper bound on locations per /forecast request (each one is a forecast and archive lookup)
+FORECAST_MAX_LOCATIONS = int(os.environ.get("FIRESHIELD_FORECAST_MAX_LOCATIONS", "1000"))
+
+
+@app.post("/forecast")
+def fire_risk_forecast(data: ForecastRequest):
+    """
+    Fire probability and FDI for each of the next ``days`` days (1-16) per location.
+
+    Days since rain start from the stored rain history and roll forward through
+    the forecast rain; see forecast.forecast_risk for the per-location fields.
+    """
+    from weather_client import MAX_FORECAST_DAYS
+
+    if not 1 <= data.days <= MAX_FORECAST_DAYS:
+        raise HTTPException(status_code=422, detail=f"days must be between 1 and {MAX_FORECAST_DAYS}")
+    if not 1 <= len(data.locations) <= FORECAST_MAX_LOCATIONS:
+        raise HTTPException(status_code=422,
+                            detail=f"Send between 1 and {FORECAST_MAX_LOCATIONS} locations")
+    coords = [(location.latitude, location.longitude) for location in data.locations]
+    return {"days": data.days, "locations": forecast_risk(coords, predict_matrix, data.days)}
+
+
+# ``path`` must be the served artifact or lie inside FIRESHIELD_ARTIFACT_DIR, and ``data_url``
+# must be FIRESHIELD_TRAIN_DATA; anything else is rejected with 422 (see ModelHolder)
+class ReloadRequest(BaseModel):
+    source: str = "artifact"
+    path: Optional[str] = None
+    data_url: Optional[str] = None
+
+
+def require_admin(token: Optional[str]) -> None:
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set FIRESHIELD_ADMIN_TOKEN")
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.post("/admin/reload", status_code=202)
+def reload_model(data: ReloadRequest = ReloadRequest(), x_admin_token: Optional[str] = Header(None)):
+    """
+    Load a new artifact (or retrain) in the background and swap it in.
+
+    Returns immediately; poll GET /admin/model for the outcome. Requests keep
+    being served by the current model until the new one is fully built.
+    """
+    require_admin(x_admin_token)
+    try:
+        started = model_holder.reload_in_background(data.source, data.path, data.data_url)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if not started:
+        raise HTTPException(status_code=409, detail="A reload is already in progress")
+    return {"status": "reloading", "current_version": model_holder.current.version}
+
+
+@app.get("/admin/model")
+def model_status(x_admin_token: Optional[str] = Header(None)):
+    """Served model version, engine and source, plus the outcome of the last reload."""
+    require_admin(x_admin_token)
+    return model_holder.status()
+
+
+REGISTRY.gauge_callback("fireshield_model_generation", "Models loaded by this process (1 + successful reloads)",
+                        lambda: model_holder.generation)
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
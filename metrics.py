@@ -0,0 +1,205 @@
+"""
+Lightweight Prometheus-style counters, histograms and per-stage timers.
+
+Everything lives in process memory and is rendered in the Prometheus text
+exposition format by ``REGISTRY.render()`` (served at ``/metrics``). An
+observation is a perf_counter read, a bisect and a locked increment, so the
+instrumentation can stay on in production. Set FIRESHIELD_METRICS=0 to turn
+the timers into no-ops.
+"""
+import bisect
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("FIRESHIELD_METRICS", "1") != "0"
+
+# Seconds; spans the ~10 µs flat-forest stages up to multi-second training phases
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), then sum and count
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def summary(self, *labels) -> dict:
+        series = self._series.get(labels)
+        if series is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": series[-1], "sum": series[-2]}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_callback(self, name: str, documentation: str, callback) -> None:
+        """Gauge whose value is read at scrape time by calling ``callback()``."""
+        self._collectors.append((name, documentation, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, documentation, callback in self._collectors:
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {callback()}"])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "fireshield_stage_seconds", "Time spent in each processing stage", ["component", "stage"])
+HTTP_REQUESTS = REGISTRY.counter(
+    "fireshield_http_requests_total", "HTTP requests by route, method and status", ["route", "method", "status"])
+HTTP_SECONDS = REGISTRY.histogram(
+    "fireshield_http_request_seconds", "End-to-end HTTP request time by route", ["route"])
+CACHE_LOOKUPS = REGISTRY.counter(
+    "fireshield_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+TABLE_ROWS = REGISTRY.counter(
+    "fireshield_table_rows_total", "Rows scored by the prediction table, by lookup or forest fallback", ["result"])
+
+# Rows; powers of two up to well past the default micro-batch cap of 64
+ROW_BUCKETS = tuple(2 ** power for power in range(11))
+BATCH_SIZE = REGISTRY.histogram(
+    "fireshield_batcher_batch_size", "Rows per /predict micro-batch", buckets=ROW_BUCKETS)
+BATCH_QUEUE_DEPTH = REGISTRY.histogram(
+    "fireshield_batcher_collect_queue_depth", "Rows queued for the /predict micro-batcher when a batch starts",
+    buckets=ROW_BUCKETS)
+
+
+class _StageTimer:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def stage(component: str, name: str):
+    """Context manager timing one stage: ``with stage("predict", "transform"): ...``."""
+    return _StageTimer((component, name)) if ENABLED else _NOOP
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_SECONDS.observe(elapsed, path)
+            HTTP_REQUESTS.inc(path, scope["method"], status["code"])
+            # Handlers that report their own time get the remainder (body parsing,
+            # validation, routing) recorded as a separate stage
+            handler = scope.get("fireshield.handler")
+            if handler is not None:
+                component, handler_seconds = handler
+                STAGE_SECONDS.observe(max(elapsed - handler_seconds, 0.0), component, "validate_and_route")
@@ -1,11 +1,52 @@
+import hashlib
+import io
+import os
+import uuid
+
 import pandas as pd
 import numpy as np
-import coremltools as ct
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from typing import Tuple
 
+from flat_forest import float32_boundary, fold_scaler
+from metrics import stage
+
+
+def _rescale_thresholds(forest: RandomForestClassifier, old_mean, old_scale, new_mean, new_scale,
+                        X_seen: np.ndarray) -> None:
+    """
+    Re-express every split threshold of ``forest`` after the scaler's statistics changed.
+
+    Each split is mapped back to R, the largest raw value that went left under
+    the old scaling (sklearn compares in float32, see flat_forest.py), and the
+    new threshold is R's float32 image under the new scaling, so every raw value
+    up to R still goes left. Values above R that share that float32 cell would
+    now go left too; when one of the training values in ``X_seen`` is among them,
+    the threshold drops one float32 below it instead, so every row the trees
+    were fitted on keeps its side.
+    """
+    # Training values per feature, sorted, with +inf as the "nothing above R" sentinel
+    above = [np.append(np.unique(column[~np.isnan(column)]), np.inf) for column in X_seen.T]
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        split = tree.children_left != -1
+        feature = tree.feature[split]
+        raw = fold_scaler(float32_boundary(tree.threshold[split]), old_mean[feature], old_scale[feature])
+        scaled = ((raw - new_mean[feature]) / new_scale[feature]).astype(np.float32)
+
+        next_seen = np.empty_like(raw)
+        for f, values in enumerate(above):
+            at = feature == f
+            next_seen[at] = values[np.searchsorted(values, raw[at], side="right")]
+        next_scaled = ((next_seen - new_mean[feature]) / new_scale[feature]).astype(np.float32)
+        scaled = np.minimum(scaled, np.nextafter(next_scaled, np.float32(-np.inf)))
+
+        # tree_.threshold is a writable view of the node array
+        tree.threshold[split] = scaled.astype(np.float64)
+
 
 class ForestFireModel:
     def __init__(self, data_url: str):
@@ -14,9 +55,16 @@ class ForestFireModel:
         self.target_column = 'Result'
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
+        self.data_hash = None
 
-    def load_data(self) -> pd.DataFrame:
-        df = pd.read_csv(self.data_url)
+    @classmethod
+    def from_fitted(cls, data_url: str, model, scaler, data_hash: str) -> "ForestFireModel":
+        """Wrap an already fitted forest and scaler (e.g. from an artifact) for incremental updates."""
+        fire_model = cls(data_url)
+        fire_model.model, fire_model.scaler, fire_model.data_hash = model, scaler, data_hash
+        return fire_model
+
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
         df.columns = df.columns.str.strip()
 
         # Clean target
@@ -25,19 +73,153 @@ class ForestFireModel:
 
         # Convert to numeric
         df[self.features] = df[self.features].apply(pd.to_numeric, errors='coerce')
-        df[self.features] = df[self.features].fillna(df[self.features].mean())
+        return df
 
+    def load_data(self) -> pd.DataFrame:
+        df = self.clean(pd.read_csv(self.data_url))
+        df[self.features] = df[self.features].fillna(df[self.features].mean())
         return df
 
-    def train(self) -> None:
-        df = self.load_data()
+    def data_fingerprint(self, df: pd.DataFrame, previous: str = "") -> str:
+        """sha256 of the cleaned feature and target columns, chained onto ``previous`` for appended data."""
+        hashed = pd.util.hash_pandas_object(df[self.features + [self.target_column]], index=False)
+        return hashlib.sha256(previous.encode() + hashed.values.tobytes()).hexdigest()
+
+    def train(self, cache_path: str = None) -> None:
+        """
+        Fit the scaler and forest from scratch on the whole dataset.
+
+        Parameters:
+            cache_path (str): Optional .npz file to store the training rows in, so
+                later train_incremental calls only need to parse appended rows.
+        """
+        with stage("model", "load_data"):
+            df = self.load_data()
         X = df[self.features]
         y = df[self.target_column]
 
+        # Fingerprint of the cleaned training data, stored alongside saved artifacts
+        self.data_hash = self.data_fingerprint(df)
+
         X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        self.model.fit(X_train_scaled, y_train)
+        with stage("model", "scale"):
+            X_train_scaled = self.scaler.fit_transform(X_train)
+        with stage("model", "fit"):
+            self.model.fit(X_train_scaled, y_train)
+
+        if cache_path:
+            with open(self.data_url, "rb") as f:
+                consumed = f.read()
+            self._save_cache(cache_path, X_train.to_numpy(np.float64), y_train.to_numpy(str), consumed)
+
+    def _save_cache(self, cache_path: str, X: np.ndarray, y: np.ndarray, consumed: bytes) -> None:
+        tmp_path = f"{cache_path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp.npz"
+        np.savez(tmp_path, X=X, y=y, consumed_bytes=len(consumed),
+                 prefix_sha256=hashlib.sha256(consumed).hexdigest(), data_hash=self.data_hash)
+        os.replace(tmp_path, cache_path)
+
+    def _load_cache(self, cache_path: str, data: bytes):
+        """Cached (X, y, consumed_bytes), or None if the cache does not describe a prefix of ``data``."""
+        if not os.path.exists(cache_path):
+            return None
+        with np.load(cache_path) as cache:
+            consumed = int(cache["consumed_bytes"])
+            if (str(cache["data_hash"]) != self.data_hash or len(data) < consumed
+                    or hashlib.sha256(data[:consumed]).hexdigest() != str(cache["prefix_sha256"])):
+                return None
+            return cache["X"], cache["y"], consumed
+
+    def train_incremental(self, cache_path: str, new_trees: int = 10, max_estimators: int = 300) -> int:
+        """
+        Update the fitted model with rows appended to the CSV since the last (re)train.
+
+        Only the appended bytes are parsed; rows seen before come from the array
+        cache. The scaler statistics are updated with ``partial_fit`` (and the
+        existing trees' thresholds re-expressed in the new scaling), then
+        ``new_trees`` trees are added with ``warm_start``, fitted on all training
+        rows so far. The oldest trees are dropped beyond ``max_estimators``.
+
+        Falls back to a full ``train`` when there is no usable cache (first run,
+        or the CSV was edited rather than appended to).
+
+        Returns:
+            int: Number of new rows used (-1 after a full retrain).
+        """
+        if "://" in self.data_url:
+            raise ValueError("Incremental training needs a local CSV path, not a URL")
+        with open(self.data_url, "rb") as f:
+            data = f.read()
+
+        cached = self._load_cache(cache_path, data) if self.data_hash else None
+        if cached is None:
+            # Same estimator and settings, refitted from scratch
+            self.model = clone(self.model).set_params(warm_start=False)
+            self.scaler = clone(self.scaler)
+            self.train(cache_path)
+            return -1
+        X_seen, y_seen, consumed = cached
+        if len(data) == consumed:
+            return 0
+
+        with stage("model", "load_data"):
+            header = data[:data.index(b"\n") + 1]
+            df = self.clean(pd.read_csv(io.BytesIO(header + data[consumed:])))
+        if df.empty:
+            self._save_cache(cache_path, X_seen, y_seen, data)
+            return 0
+
+        X_new = df[self.features].to_numpy(np.float64)
+        y_new = df[self.target_column].to_numpy(str)
+        if len(df) >= 5:
+            X_new, _, y_new, _ = train_test_split(X_new, y_new, test_size=0.2, random_state=42)
+
+        with stage("model", "scale"):
+            old_mean, old_scale = self.scaler.mean_.copy(), self.scaler.scale_.copy()
+            self.scaler.partial_fit(pd.DataFrame(X_new, columns=self.features))  # NaNs are ignored
+            X_new = np.where(np.isnan(X_new), self.scaler.mean_, X_new)
+            _rescale_thresholds(self.model, old_mean, old_scale, self.scaler.mean_, self.scaler.scale_, X_seen)
+
+        X_train = np.concatenate([X_seen, X_new])
+        y_train = np.concatenate([y_seen, y_new])
+        with stage("model", "fit"):
+            keep = max_estimators - new_trees
+            if len(self.model.estimators_) > keep:
+                self.model.estimators_ = self.model.estimators_[-keep:]
+                # warm_start seeds a tree by its position, so at the cap the new trees would
+                # reuse the previous update's seeds; move to the next seed each time
+                seed = self.model.random_state
+                if isinstance(seed, (int, np.integer)):
+                    self.model.set_params(random_state=(int(seed) + 1) % 2**32)
+            self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + new_trees)
+            self.model.fit(self.scaler.transform(pd.DataFrame(X_train, columns=self.features)), y_train)
+            self.model.set_params(warm_start=False)
+
+        self.data_hash = self.data_fingerprint(df, self.data_hash)
+        self._save_cache(cache_path, X_train, y_train, data)
+        return len(X_new)
+
+    def tabulate(self, grid: str = None, mode: str = None):
+        """
+        Evaluate the fitted forest over a 4-D input grid, for the table engine.
+
+        Parameters:
+            grid (str): "start:stop:step" per feature (default: FIRESHIELD_TABLE_GRID).
+            mode (str): "nearest" or "linear" lookups (default: FIRESHIELD_TABLE_MODE).
+
+        Returns:
+            PredictionTable: With the error against the forest reported on the
+            training data and on random rows inside the grid.
+        """
+        from flat_forest import FlatForest
+        from prediction_table import DEFAULT_TABLE_GRID, DEFAULT_TABLE_MODE, PredictionTable
+
+        with stage("model", "tabulate"):
+            probe = self.load_data()[self.features].to_numpy(np.float64)
+            return PredictionTable.build(
+                FlatForest.from_sklearn(self.model, self.scaler), grid or DEFAULT_TABLE_GRID,
+                lambda X: self.model.predict_proba(self.scaler.transform(pd.DataFrame(X, columns=self.features))),
+                probe, mode or DEFAULT_TABLE_MODE)
 
     def predict(self, input_data: list) -> Tuple[str, float, float]:
         input_array = np.array([input_data])
@@ -0,0 +1,69 @@
+"""
+Memoized /predict results for repeated inputs.
+
+Sensor readings are low-precision (whole degrees, percent and km/h, rain in
+0.1 mm steps, like dataset.csv), so identical feature rows recur and each
+repeat would otherwise cost a full forest pass. Results are kept in an LRU
+keyed on the model version and the feature row, optionally rounded. Rounded
+rows are also what gets scored, so a cached answer is always the answer the
+model gives for its key.
+
+The cache belongs to one model: the first lookup against a different model
+version empties it, and entries are keyed by version as well, so a result
+computed by a model that was swapped out mid-request is never served for
+its replacement.
+"""
+import threading
+from typing import Optional
+
+from metrics import CACHE_LOOKUPS
+from ttl_cache import TTLCache
+
+
+class PredictionCache:
+    """
+    Bounded LRU of (fire, not_fire) probabilities per model version and feature row.
+
+    Parameters:
+        maxsize (int): Maximum number of cached rows.
+        decimals (int): Round features to this many decimals before lookup and
+            scoring; None keeps exact inputs, so caching never changes an answer.
+    """
+
+    def __init__(self, maxsize: int = 10000, decimals: Optional[int] = None):
+        self.decimals = decimals
+        self.version = None
+        self.invalidations = 0
+        self._entries = TTLCache(maxsize=maxsize, ttl=None)
+        self._lock = threading.Lock()
+
+    def key(self, row: list) -> tuple:
+        """The row as it is cached and scored: a tuple of floats, rounded if configured."""
+        if self.decimals is None:
+            return tuple(float(value) for value in row)
+        # + 0.0 folds -0.0 (from rounding small negatives) into 0.0
+        return tuple(round(float(value), self.decimals) + 0.0 for value in row)
+
+    def get(self, version: str, key: tuple):
+        """Cached probabilities for ``key`` under model ``version``, or None."""
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self.version = version
+                self._entries.clear()
+        result = self._entries.get((version, key))
+        CACHE_LOOKUPS.inc("predict", "miss" if result is None else "hit")
+        return result
+
+    def set(self, version: str, key: tuple, result: tuple) -> None:
+        self._entries.set((version, key), result)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        del stats["ttl_seconds"]
+        return {"enabled": True, **stats, "decimals": self.decimals, "model_version": self.version,
+                "invalidations": self.invalidations}
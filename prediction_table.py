@@ -0,0 +1,265 @@
+"""
+Tabulated inference: the forest's class probabilities precomputed on a 4-D grid.
+
+Inputs are low-precision and their ranges small, so the input space that
+matters fits in a table: by default Temperature 20-45 °C, RH 20-90 % and WS
+6-30 km/h in steps of 1 and Rain 0-20 mm in steps of 0.1, 9.3 million cells of
+one byte. A prediction is then one indexed read ("nearest") or a 16-corner
+multilinear interpolation ("linear") instead of a forest pass. Rows outside
+the grid, or with missing values, are scored by the forest the table was
+built from.
+
+The forest is piecewise constant between its split thresholds, so building
+evaluates it once per distinct combination of threshold intervals the grid
+values fall in, not once per cell. On grid points the table equals the
+forest; between them "nearest" and "linear" approximate it, and every table
+carries the error measured on probe rows (see error_report).
+
+    python prediction_table.py --grid 20:45:1,20:90:1,6:30:1,0:20:0.1 --mode linear
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from metrics import TABLE_ROWS
+
+TABLE_MODES = ("nearest", "linear")
+# start:stop:step per feature (Temperature, RH, WS, Rain), both ends included
+DEFAULT_TABLE_GRID = os.environ.get("FIRESHIELD_TABLE_GRID", "20:45:1,20:90:1,6:30:1,0:20:0.1")
+DEFAULT_TABLE_MODE = os.environ.get("FIRESHIELD_TABLE_MODE", "nearest")
+
+
+def parse_grid(spec: str) -> tuple:
+    """
+    Parse "start:stop:step,..." (one entry per feature) into (start, step, count) arrays.
+
+    Raises:
+        ValueError: When an entry is malformed or spans fewer than two grid points.
+    """
+    start, step, count = [], [], []
+    for entry in spec.split(","):
+        try:
+            low, high, stride = (float(value) for value in entry.split(":"))
+        except ValueError:
+            raise ValueError(f"Grid entry {entry!r} is not start:stop:step") from None
+        points = int(np.floor((high - low) / stride + 1e-9)) + 1 if stride > 0 else 0
+        if points < 2:
+            raise ValueError(f"Grid entry {entry!r} needs a positive step and at least two points")
+        start.append(low)
+        step.append(stride)
+        count.append(points)
+    return np.array(start), np.array(step), np.array(count, dtype=np.intp)
+
+
+def format_grid(start: np.ndarray, step: np.ndarray, count: np.ndarray) -> str:
+    """Inverse of parse_grid."""
+    return ",".join(f"{low:g}:{low + (n - 1) * stride:g}:{stride:g}" for low, stride, n in zip(start, step, count))
+
+
+class PredictionTable:
+    """
+    Class probabilities on a regular grid, with a forest fallback outside it.
+
+    ``values`` holds every class but the last (whose probability is the rest)
+    as integers over ``scale``: uint8 over the tree count when the forest's
+    probabilities are whole votes (pure leaves), uint16 over 65535 otherwise.
+
+    Parameters:
+        forest: FlatForest or CompactForest scoring rows outside the grid.
+        mode (str): "nearest" (single lookup) or "linear" (multilinear interpolation).
+        report (dict): Error against the forest, as built by error_report.
+    """
+
+    def __init__(self, values, scale, start, step, classes, forest=None, mode: str = DEFAULT_TABLE_MODE,
+                 report: dict = None):
+        if mode not in TABLE_MODES:
+            raise ValueError(f"Unknown table mode {mode!r}; expected 'nearest' or 'linear'")
+        self.values = values
+        self.scale = scale
+        self.start = start
+        self.step = step
+        self.count = np.array(values.shape[:-1], dtype=np.intp)
+        self.stop = start + (self.count - 1) * step
+        self.classes_ = classes
+        self.forest = forest
+        self.mode = mode
+        self.report = report or {}
+
+    @classmethod
+    def build(cls, flat, grid: str = DEFAULT_TABLE_GRID, predict_proba=None, probe: np.ndarray = None,
+              mode: str = DEFAULT_TABLE_MODE, chunk_rows: int = 500_000) -> "PredictionTable":
+        """
+        Evaluate a forest over ``grid`` and tabulate it.
+
+        Parameters:
+            flat (FlatForest): The forest (scaler folded in); its split thresholds decide which
+                grid values can share an evaluation, and it is the fallback outside the grid.
+            grid (str): "start:stop:step" per feature, see parse_grid.
+            predict_proba: Evaluates raw (n, 4) rows; defaults to ``flat.predict_proba``. The
+                sklearn pipeline is faster on the large batches a build scores.
+            probe (np.ndarray): Rows to report the table's error on (e.g. the training rows),
+                in addition to random points inside the grid.
+        """
+        start, step, count = parse_grid(grid)
+        predict_proba = predict_proba or flat.predict_proba
+
+        # Grid values with the same number of split thresholds below them go down the same
+        # branches of every tree, so one representative per interval is evaluated
+        representatives, expand = [], []
+        for f in range(len(count)):
+            axis = np.round(start[f] + np.arange(count[f]) * step[f], 10)
+            thresholds = np.unique(flat.threshold[(flat.feature == f) & np.isfinite(flat.threshold)])
+            interval = np.searchsorted(thresholds, axis, side="left")
+            _, first, inverse = np.unique(interval, return_index=True, return_inverse=True)
+            representatives.append(axis[first])
+            expand.append(inverse.ravel())
+
+        mesh = np.stack(np.meshgrid(*representatives, indexing="ij"), axis=-1).reshape(-1, len(count))
+        probs = np.concatenate([predict_proba(mesh[i:i + chunk_rows]) for i in range(0, len(mesh), chunk_rows)])
+        probs = probs.reshape(tuple(len(axis) for axis in representatives) + (probs.shape[1],))[..., :-1]
+
+        n_trees = len(flat.roots)
+        votes = probs * n_trees
+        if n_trees <= np.iinfo(np.uint8).max and np.abs(votes - np.round(votes)).max() < 1e-9:
+            scale, stored = n_trees, np.round(votes).astype(np.uint8)
+        else:
+            scale = int(np.iinfo(np.uint16).max)
+            stored = np.round(probs * scale).astype(np.uint16)
+
+        table = cls(stored[np.ix_(*expand)], scale, start, step, flat.classes_, flat, mode)
+        table.report = table.error_report(predict_proba, probe)
+        return table
+
+    def save(self, path: str, **metadata) -> None:
+        """Write the table (without its fallback forest) and string ``metadata`` to an uncompressed .npz."""
+        np.savez(path, values=self.values, scale=self.scale, start=self.start, step=self.step,
+                 classes=self.classes_.astype(str), report=json.dumps(self.report),
+                 **{f"meta_{key}": str(value) for key, value in metadata.items()})
+
+    @classmethod
+    def load(cls, path: str, forest=None, mode: str = DEFAULT_TABLE_MODE):
+        """
+        Read a table written by save and attach its fallback ``forest``.
+
+        Returns:
+            tuple: (PredictionTable, metadata dict).
+        """
+        with np.load(path, allow_pickle=False) as data:
+            table = cls(data["values"], int(data["scale"]), data["start"], data["step"],
+                        data["classes"].astype(object), forest, mode, json.loads(str(data["report"])))
+            metadata = {name[5:]: str(data[name]) for name in data.files if name.startswith("meta_")}
+        return table, metadata
+
+    @property
+    def max_abs_error(self):
+        """Largest error measured for the mode the table looks up with, or None without a report."""
+        return self.report.get("max_abs_error", {}).get(self.mode)
+
+    @property
+    def grid(self) -> str:
+        return format_grid(self.start, self.step, self.count)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def inside(self, X: np.ndarray) -> np.ndarray:
+        """Rows the table covers; NaN is never inside."""
+        return np.all((X >= self.start) & (X <= self.stop), axis=1)
+
+    def lookup(self, X: np.ndarray, mode: str = None) -> np.ndarray:
+        """Class probabilities for rows inside the grid, by ``mode`` (default: the table's)."""
+        mode = mode or self.mode
+        X = np.asarray(X, dtype=np.float64)
+        values = self.values.reshape(-1, self.values.shape[-1])
+        position = (X - self.start) / self.step
+        if mode == "nearest":
+            index = np.clip(np.rint(position).astype(np.intp), 0, self.count - 1)
+            partial = values[np.ravel_multi_index(index.T, tuple(self.count))].astype(np.float64)
+        else:
+            lower = np.clip(np.floor(position).astype(np.intp), 0, self.count - 2)
+            fraction = position - lower
+            partial = np.zeros((len(X), values.shape[1]))
+            for corner in itertools.product((0, 1), repeat=len(self.count)):
+                weight = np.prod(np.where(corner, fraction, 1 - fraction), axis=1)
+                partial += weight[:, None] * values[np.ravel_multi_index((lower + corner).T, tuple(self.count))]
+        partial /= self.scale
+        return np.column_stack([partial, 1 - partial.sum(axis=1)])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for raw inputs, in ``classes_`` order; the forest scores rows off the grid."""
+        X = np.asarray(X, dtype=np.float64)
+        inside = self.inside(X)
+        n_inside = int(inside.sum())
+        if n_inside == len(X):
+            probs = self.lookup(X)
+        else:
+            probs = np.empty((len(X), len(self.classes_)))
+            probs[inside] = self.lookup(X[inside])
+            probs[~inside] = self.forest.predict_proba(X[~inside])
+            TABLE_ROWS.inc("fallback", amount=len(X) - n_inside)
+        TABLE_ROWS.inc("lookup", amount=n_inside)
+        return probs
+
+    def random_rows(self, n: int, seed: int = 0) -> np.ndarray:
+        """Uniform random rows inside the grid, almost all of them between grid points."""
+        rng = np.random.default_rng(seed)
+        return self.start + rng.random((n, len(self.count))) * (self.stop - self.start)
+
+    def error_report(self, predict_proba, probe: np.ndarray = None, random_rows: int = 100_000) -> dict:
+        """
+        Error of each mode against the forest.
+
+        Parameters:
+            predict_proba: The forest, scoring raw rows.
+            probe (np.ndarray): Extra rows, e.g. the training data; rows off the grid are skipped.
+            random_rows (int): Uniform random rows inside the grid to measure too.
+
+        Returns:
+            dict: {mode: {row set: {rows, max_abs_error, mean_abs_error, label_agreement}}},
+            plus "max_abs_error": {mode: largest error over the row sets}.
+        """
+        row_sets = {"random": self.random_rows(random_rows)}
+        if probe is not None and len(probe):
+            probe = np.asarray(probe, dtype=np.float64)
+            row_sets["probe"] = probe[self.inside(probe)]
+        report = {}
+        for name, rows in row_sets.items():
+            expected = predict_proba(rows) if len(rows) else np.empty((0, len(self.classes_)))
+            for mode in TABLE_MODES:
+                got = self.lookup(rows, mode)
+                error = np.abs(got - expected).max(axis=1) if len(rows) else np.zeros(0)
+                report.setdefault(mode, {})[name] = {
+                    "rows": int(len(rows)),
+                    "max_abs_error": round(float(error.max(initial=0)), 6),
+                    "mean_abs_error": round(float(error.mean()) if len(rows) else 0.0, 6),
+                    "label_agreement": round(float((got.argmax(axis=1) == expected.argmax(axis=1)).mean())
+                                             if len(rows) else 1.0, 6),
+                }
+        report["max_abs_error"] = {mode: max(stats["max_abs_error"] for stats in report[mode].values())
+                                   for mode in TABLE_MODES}
+        return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", default=DEFAULT_TABLE_GRID, help="start:stop:step per feature")
+    parser.add_argument("--mode", choices=TABLE_MODES, default=DEFAULT_TABLE_MODE)
+    args = parser.parse_args(argv)
+
+    from artifact import DEFAULT_ARTIFACT_PATH, load_artifact, save_table_artifact, table_artifact_path
+
+    start = time.perf_counter()
+    table = save_table_artifact(load_artifact(DEFAULT_ARTIFACT_PATH), DEFAULT_ARTIFACT_PATH, args.grid, args.mode)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Prediction table saved to: {table_artifact_path(DEFAULT_ARTIFACT_PATH)} ({elapsed:.1f}s)")
+    print(f"   grid:  {table.grid} ({table.values.size} cells, {table.nbytes / 2**20:.1f} MiB)")
+    print(f"   error: {json.dumps(table.report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Per-location daily rain history kept in SQLite and synced incrementally.
+
+Each location stores daily rain totals plus the last day known to be complete,
+so a sync only fetches the days after it instead of the whole lookback window.
+It also records the first day ever fetched; a sync with a longer lookback than
+that refetches the location's whole window once, so older rain is not missed.
+The most recent rainy day is kept on the location row, making "days since last
+rain" a primary-key lookup.
+
+The file is bounded: daily rows older than the retention window are pruned,
+and locations not used for ``max_idle_days`` or beyond the ``max_locations``
+most recently used are evicted. SQLite in WAL mode with a busy timeout lets
+several worker processes share one file; every write is a short transaction
+and re-fetching a day is idempotent, so two workers syncing the same location
+at once only duplicate work.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from metrics import CACHE_LOOKUPS, stage
+from weather_client import WEATHER_MODE, WeatherClient, get_client
+
+DEFAULT_STORE_PATH = os.environ.get("FIRESHIELD_RAIN_STORE", "rain_history.sqlite")
+DEFAULT_MAX_LOCATIONS = int(os.environ.get("FIRESHIELD_RAIN_STORE_MAX_LOCATIONS", "10000"))
+DEFAULT_MAX_IDLE_DAYS = int(os.environ.get("FIRESHIELD_RAIN_STORE_MAX_IDLE_DAYS", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    location TEXT PRIMARY KEY,
+    complete_through INTEGER,
+    last_rain_day INTEGER,
+    last_rain_mm REAL,
+    last_used INTEGER,
+    fetched_from INTEGER
+);
+CREATE TABLE IF NOT EXISTS daily_rain (
+    location TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    rain_mm REAL,
+    PRIMARY KEY (location, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_rain_day ON daily_rain (day);
+"""
+
+
+def location_key(latitude: float, longitude: float) -> str:
+    return f"{latitude:.4f},{longitude:.4f}"
+
+
+class RainStore:
+    """
+    Daily rain totals per location, backed by a SQLite file.
+
+    Parameters:
+        path (str): SQLite file (":memory:" for a throwaway store).
+        client (WeatherClient): Client used to fetch missing days (defaults to the shared one).
+        retention_days (int): Days of history kept per location; older rows are pruned on sync.
+        max_locations (int): Most recently used locations kept; older ones beyond it are evicted on sync.
+        max_idle_days (int): Locations not used for this many days are evicted on sync.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, client: Optional[WeatherClient] = None,
+                 retention_days: int = 366, max_locations: int = DEFAULT_MAX_LOCATIONS,
+                 max_idle_days: int = DEFAULT_MAX_IDLE_DAYS):
+        self.client = client
+        self.retention_days = retention_days
+        self.max_locations = max_locations
+        self.max_idle_days = max_idle_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # Switching to WAL can report "locked" without waiting while another worker
+        # is opening the same new file, so setup is retried briefly
+        for attempt in range(20):
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                break
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) or attempt == 19:
+                    raise
+                time.sleep(0.05)
+        # WAL with synchronous=NORMAL stays consistent after a crash and skips an fsync per commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add the columns that stores created by earlier versions lack."""
+        # last_used starts at complete_through; fetched_from stays NULL, so each old
+        # location's window is fetched once in full on its next sync
+        added = {"last_used": "UPDATE locations SET last_used = complete_through", "fetched_from": None}
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(locations)")}
+        for column, backfill in added.items():
+            if column in columns:
+                continue
+            try:
+                with self._conn:
+                    self._conn.execute(f"ALTER TABLE locations ADD COLUMN {column} INTEGER")
+                    if backfill:
+                        self._conn.execute(backfill)
+            except sqlite3.OperationalError as exc:
+                # Another worker added the column first
+                if "duplicate column" not in str(exc):
+                    raise
+        self._conn.execute("CREATE INDEX IF NOT EXISTS locations_last_used ON locations (last_used)")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _today(self, today: Optional[date]) -> date:
+        # The client's clock, so replayed fixtures keep the date they were recorded on
+        return today or (self.client or get_client()).today()
+
+    def sync(self, coords: Sequence[Tuple[float, float]], lookback_days: int = 90, today: Optional[date] = None) -> int:
+        """
+        Fetch the days each location is missing, up to ``today``.
+
+        Locations that need the same date range are fetched together in one
+        multi-location request. Days the archive has not filled in yet (null
+        values) are not marked complete, so they are retried on the next sync.
+        A location last fetched with a shorter lookback has its whole window
+        fetched again, which backfills the older days.
+
+        Returns:
+            int: Number of location-days fetched.
+        """
+        today = self._today(today)
+        window_start = today - timedelta(days=lookback_days)
+        keys = [location_key(lat, lon) for lat, lon in coords]
+
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT location, complete_through, last_used, fetched_from FROM locations "
+                f"WHERE location IN ({placeholders})",
+                keys,
+            ).fetchall() if keys else []
+        complete_through = {key: complete for key, complete, _, _ in rows}
+        fetched_from = {key: first for key, _, _, first in rows}
+        today_ordinal = today.toordinal()
+        touched = [(today_ordinal, key) for key, _, last_used, _ in rows if last_used != today_ordinal]
+
+        # Group locations by the first day they are missing
+        pending = defaultdict(dict)
+        for (lat, lon), key in zip(coords, keys):
+            synced, first = complete_through.get(key), fetched_from.get(key)
+            if synced is None or first is None or first > window_start.toordinal():
+                # New, or never fetched this far back: fetch the whole window
+                start = window_start
+            else:
+                start = max(window_start, date.fromordinal(synced + 1))
+            if start <= today:
+                pending[start][key] = (lat, lon)
+                CACHE_LOOKUPS.inc("rain_store", "miss")
+            else:
+                CACHE_LOOKUPS.inc("rain_store", "hit")
+
+        if touched:
+            # At most one write per location per day keeps LRU order without slowing lookups
+            with self._lock, self._conn:
+                self._conn.executemany("UPDATE locations SET last_used = ? WHERE location = ?", touched)
+
+        client = self.client or get_client()
+        fetched = 0
+        for start, locations in pending.items():
+            with stage("rain_store", "fetch"):
+                series = client.daily_rain(list(locations.values()), start, today)
+            with stage("rain_store", "store"), self._lock, self._conn:
+                for key, (days, rain) in zip(locations, series):
+                    self._store(key, days, rain, complete_through.get(key), today_ordinal)
+                    fetched += len(days)
+        if pending:
+            with self._lock, self._conn:
+                self._prune(today)
+        return fetched
+
+    def _store(self, key: str, days: np.ndarray, rain: np.ndarray, previous_complete: Optional[int],
+               used: int) -> None:
+        ordinals = [d.toordinal() for d in days.astype(date)]
+        values = [None if np.isnan(mm) else float(mm) for mm in rain]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO daily_rain (location, day, rain_mm) VALUES (?, ?, ?)",
+            zip([key] * len(ordinals), ordinals, values),
+        )
+
+        # Complete through the last day before the first gap in the new data
+        gaps = np.flatnonzero(np.isnan(rain))
+        last_known = len(ordinals) - 1 if gaps.size == 0 else gaps[0] - 1
+        complete = ordinals[last_known] if last_known >= 0 else previous_complete
+
+        self._conn.execute("INSERT OR IGNORE INTO locations (location) VALUES (?)", (key,))
+        self._conn.execute("UPDATE locations SET complete_through = ?, last_used = ? WHERE location = ?",
+                           (complete, used, key))
+        if ordinals:
+            self._conn.execute("UPDATE locations SET fetched_from = MIN(COALESCE(fetched_from, ?1), ?1) "
+                               "WHERE location = ?2", (ordinals[0], key))
+
+        rainy = np.flatnonzero(np.nan_to_num(rain) > 0)
+        if rainy.size:
+            self._conn.execute(
+                "UPDATE locations SET last_rain_day = ?, last_rain_mm = ? "
+                "WHERE location = ? AND (last_rain_day IS NULL OR last_rain_day <= ?)",
+                (ordinals[rainy[-1]], float(rain[rainy[-1]]), key, ordinals[rainy[-1]]),
+            )
+
+    def _prune(self, today: date) -> None:
+        cutoff = (today - timedelta(days=self.retention_days)).toordinal()
+        self._conn.execute("DELETE FROM daily_rain WHERE day < ?", (cutoff,))
+
+        # Locations used today are never evicted, so a sync cannot drop what it just stored
+        idle_cutoff = (today - timedelta(days=self.max_idle_days)).toordinal()
+        evicted = [row[0] for row in self._conn.execute(
+            "SELECT location FROM locations WHERE last_used IS NULL OR last_used < ? "
+            "UNION SELECT location FROM (SELECT location, last_used FROM locations "
+            "ORDER BY last_used DESC, location LIMIT -1 OFFSET ?) WHERE last_used < ?",
+            (idle_cutoff, self.max_locations, today.toordinal()),
+        )]
+        if evicted:
+            self._conn.executemany("DELETE FROM daily_rain WHERE location = ?", [(key,) for key in evicted])
+            self._conn.executemany("DELETE FROM locations WHERE location = ?", [(key,) for key in evicted])
+
+    def stats(self) -> dict:
+        with self._lock:
+            locations = self._conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0]
+            days = self._conn.execute("SELECT COUNT(*) FROM daily_rain").fetchone()[0]
+        return {"locations": locations, "daily_rows": days, "max_locations": self.max_locations,
+                "max_idle_days": self.max_idle_days, "retention_days": self.retention_days}
+
+    def last_rain(self, latitude: float, longitude: float, lookback_days: int = 90, today: Optional[date] = None):
+        """
+        Last rain for a synced location, without any network access.
+
+        Returns:
+            tuple: (last_rain_date, rainfall_on_last_rain, days_since_last_rain), or
+            (None, None, lookback_days) when there was no rain within the lookback.
+        """
+        today = self._today(today)
+        with stage("rain_store", "lookup"), self._lock:
+            row = self._conn.execute(
+                "SELECT last_rain_day, last_rain_mm FROM locations WHERE location = ?",
+                (location_key(latitude, longitude),),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None, None, lookback_days
+        last_rain_date = date.fromordinal(row[0])
+        days_since = (today - last_rain_date).days
+        if days_since > lookback_days:
+            return None, None, lookback_days
+        return last_rain_date, row[1], days_since
+
+    def daily_rain(self, latitude: float, longitude: float, start_date: date, end_date: date):
+        """Stored (days, rain_mm) arrays for a location between two dates (inclusive)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, rain_mm FROM daily_rain WHERE location = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (location_key(latitude, longitude), start_date.toordinal(), end_date.toordinal()),
+            ).fetchall()
+        days = np.array([date.fromordinal(day) for day, _ in rows], dtype="datetime64[D]")
+        rain = np.array([mm for _, mm in rows], dtype=np.float64)
+        return days, rain
+
+    def days_since_last_rain(self, latitude: float, longitude: float, lookback_days: int = 90):
+        """Sync one location and return its last rain, like fdi.get_days_since_last_rain."""
+        self.sync([(latitude, longitude)], lookback_days)
+        return self.last_rain(latitude, longitude, lookback_days)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_store() -> RainStore:
+    """
+    Process-wide RainStore at DEFAULT_STORE_PATH, opened on first use.
+
+    In replay mode the store is in memory, so fixture data never mixes with live history.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = RainStore(":memory:" if WEATHER_MODE == "replay" else DEFAULT_STORE_PATH)
+        return _default_store
@@ -0,0 +1,199 @@
+"""
+Streaming fire-risk map over a bounding box.
+
+The box is cut into square tiles of grid points. For each tile, current
+conditions are fetched in batched multi-location Open-Meteo requests and rain
+history comes from the rain store (rain_store.py), which only fetches the days
+it does not hold yet; the forest probability and FDI are computed for all its points
+at once. Tiles are produced in order with a small number in flight, so memory
+is bounded by the tile size, never the grid size.
+
+    python risk_map.py --bbox 32.5,-97.5,33.5,-96.5 --resolution 0.05 --output map.ndjson
+
+Each output line is one tile as JSON (see score_tile); POST /risk-map streams
+the same lines.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+from fdi import fdi_array, fdi_band_array
+from metrics import stage
+
+
+class BoundingBox(NamedTuple):
+    min_latitude: float
+    min_longitude: float
+    max_latitude: float
+    max_longitude: float
+
+
+def grid_shape(bbox: BoundingBox, resolution: float) -> tuple:
+    """(rows, columns) of grid points covering ``bbox`` at ``resolution`` degrees, edges included."""
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+    if bbox.min_latitude > bbox.max_latitude or bbox.min_longitude > bbox.max_longitude:
+        raise ValueError("bounding box minimums must not exceed its maximums")
+    if not (-90 <= bbox.min_latitude and bbox.max_latitude <= 90
+            and -180 <= bbox.min_longitude and bbox.max_longitude <= 180):
+        raise ValueError("bounding box must lie within latitude -90..90 and longitude -180..180")
+    # The small epsilon keeps an edge that is a whole number of steps away from being lost to rounding
+    rows = math.floor((bbox.max_latitude - bbox.min_latitude) / resolution + 1e-9) + 1
+    columns = math.floor((bbox.max_longitude - bbox.min_longitude) / resolution + 1e-9) + 1
+    return rows, columns
+
+
+def iter_tiles(bbox: BoundingBox, resolution: float, tile_size: int) -> Iterator[tuple]:
+    """Yield (tile_row, tile_col, latitudes, longitudes) per tile; only one tile's axes exist at a time."""
+    rows, columns = grid_shape(bbox, resolution)
+    for tile_row, row_start in enumerate(range(0, rows, tile_size)):
+        row_index = np.arange(row_start, min(row_start + tile_size, rows))
+        latitudes = np.round(bbox.min_latitude + row_index * resolution, 4)
+        for tile_col, col_start in enumerate(range(0, columns, tile_size)):
+            col_index = np.arange(col_start, min(col_start + tile_size, columns))
+            longitudes = np.round(bbox.min_longitude + col_index * resolution, 4)
+            yield tile_row, tile_col, latitudes, longitudes
+
+
+def score_tile(tile_row: int, tile_col: int, latitudes: np.ndarray, longitudes: np.ndarray, predict_fn,
+               client: "WeatherClient", store: "RainStore", lookback_days: int = 90) -> dict:
+    """
+    Fetch weather for every point of a tile and score it.
+
+    Parameters:
+        predict_fn: Takes an (n, 4) Temperature/RH/WS/Rain matrix and returns
+            (fire, not_fire) probability arrays, e.g. main.predict_matrix.
+        client (WeatherClient): Source of current conditions.
+        store (RainStore): Rain history, synced for the tile's points first.
+
+    Returns:
+        dict: Tile position, its latitude/longitude axes and row-major grids of the
+        weather inputs, fire probability (percent), FDI, FDI band and days since rain.
+        Points whose temperature, humidity or wind is missing have null scores.
+    """
+    lat_grid, lon_grid = np.meshgrid(latitudes, longitudes, indexing="ij")
+    coords = list(zip(lat_grid.ravel().tolist(), lon_grid.ravel().tolist()))
+
+    with stage("risk_map", "weather_fetch"):
+        features = client.current_conditions(coords)
+        # Today's total can still be null early in the day; treat it as dry
+        features[:, 3] = np.nan_to_num(features[:, 3])
+        store.sync(coords, lookback_days)
+
+    with stage("risk_map", "score"):
+        last_rain = [store.last_rain(lat, lon, lookback_days) for lat, lon in coords]
+        days_since_rain = np.array([days for _, _, days in last_rain])
+        rainfall = np.array([mm or 0 for _, mm, _ in last_rain], dtype=np.float64)
+        # Points missing temperature, humidity or wind are not scored and reported as null
+        missing = ~np.isfinite(features[:, :3]).all(axis=1)
+        scored = ~missing
+        prob_fire = np.zeros(len(coords))
+        fdi_values = np.zeros(len(coords), dtype=np.int64)
+        if scored.any():
+            prob_fire[scored], _ = predict_fn(features[scored])
+            fdi_values[scored] = fdi_array(features[scored, 0], features[scored, 1], features[scored, 2],
+                                           days_since_rain[scored], rainfall[scored])
+
+    shape = lat_grid.shape
+    return {
+        "tile": [tile_row, tile_col],
+        "latitude": latitudes.tolist(),
+        "longitude": longitudes.tolist(),
+        "temperature": _grid(features[:, 0], ~np.isfinite(features[:, 0]), shape),
+        "humidity": _grid(features[:, 1], ~np.isfinite(features[:, 1]), shape),
+        "wind": _grid(features[:, 2], ~np.isfinite(features[:, 2]), shape),
+        "rain": features[:, 3].reshape(shape).tolist(),
+        "days_since_rain": days_since_rain.reshape(shape).tolist(),
+        "fire_probability": _grid(np.round(prob_fire * 100, 2), missing, shape),
+        "fdi": _grid(fdi_values, missing, shape),
+        "band": _grid(fdi_band_array(fdi_values), missing, shape),
+    }
+
+
+def _grid(values: np.ndarray, missing: np.ndarray, shape: tuple) -> list:
+    """``values`` as a row-major nested list of ``shape``, with None at the points flagged in ``missing``."""
+    values = values.astype(object)
+    values[missing] = None
+    return values.reshape(shape).tolist()
+
+
+async def stream_tiles(bbox: BoundingBox, resolution: float, predict_fn, tile_size: int = 32,
+                       client: "WeatherClient" = None, lookback_days: int = 90, max_in_flight: int = 2,
+                       store: "RainStore" = None):
+    """
+    Async iterator of scored tiles, in grid order.
+
+    Up to ``max_in_flight`` tiles are fetched and scored concurrently on worker
+    threads; a tile is yielded as soon as it and every tile before it are done.
+    ``client`` and ``store`` default to the shared WeatherClient and RainStore.
+    """
+    from rain_store import get_store
+    from weather_client import get_client
+
+    client = client or get_client()
+    store = store or get_store()
+    pending = deque()
+    tiles = iter_tiles(bbox, resolution, tile_size)
+    try:
+        for tile in tiles:
+            pending.append(asyncio.ensure_future(
+                asyncio.to_thread(score_tile, *tile, predict_fn, client, store, lookback_days)))
+            if len(pending) >= max_in_flight:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def ndjson_stream(*args, **kwargs):
+    """stream_tiles as newline-delimited JSON bytes, for a streaming HTTP response."""
+    async for tile in stream_tiles(*args, **kwargs):
+        yield json.dumps(tile, separators=(",", ":")).encode() + b"\n"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bbox", required=True, help="min_lat,min_lon,max_lat,max_lon")
+    parser.add_argument("--resolution", type=float, required=True, help="Grid spacing in degrees")
+    parser.add_argument("--tile-size", type=int, default=32, help="Grid points per tile side")
+    parser.add_argument("--lookback-days", type=int, default=90)
+    parser.add_argument("--engine", choices=["sklearn", "flat", "compact", "table"], default="sklearn")
+    parser.add_argument("--output", help="NDJSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from artifact import DEFAULT_ARTIFACT_PATH
+    from serving_model import ServingModel
+
+    bbox = BoundingBox(*(float(value) for value in args.bbox.split(",")))
+    rows, columns = grid_shape(bbox, args.resolution)
+    serving_model = ServingModel.from_artifact(DEFAULT_ARTIFACT_PATH, args.engine)
+
+    async def write(out):
+        count = 0
+        async for line in ndjson_stream(bbox, args.resolution, serving_model.predict_matrix, args.tile_size,
+                                        lookback_days=args.lookback_days):
+            out.write(line.decode())
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "w") as out:
+            tiles = asyncio.run(write(out))
+    else:
+        tiles = asyncio.run(write(sys.stdout))
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows * columns} grid points in {tiles} tiles in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
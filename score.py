@@ -0,0 +1,202 @@
+"""
+Stream-score large CSV/Parquet archives of station observations.
+
+    python score.py observations.csv scored.csv
+    python score.py archive.parquet scored.parquet --chunksize 200000 --workers 4 --engine flat
+    python score.py observations.csv scored.csv --days-column "Days Since Rain"
+
+Input is read in chunks and cleaned like ForestFireModel.load_data (stripped
+column names, numeric coercion, missing values filled with the training
+means stored in the scaler). Each chunk gets a vectorized forest prediction
+and, when a days-since-rain column is given, an FDI value. Results are
+appended to the output as they are produced, so memory stays bounded by
+chunksize x in-flight chunks. Parquet input/output needs pyarrow; Parquet
+output has a fixed schema (see ChunkWriter), so chunks with different inferred
+column types still append to the same file.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from artifact import DEFAULT_ARTIFACT_PATH, load_artifact
+from fdi import fdi_array, fdi_band
+from serving_model import ENGINES, ServingModel
+
+_scorer = None
+
+
+class ChunkScorer:
+    """Loads the model artifact once and scores DataFrame chunks with it, like the API does."""
+
+    def __init__(self, artifact_path: str, engine: str = "sklearn", days_column: str = None):
+        # The full artifact, not just a companion: cleaning needs the scaler's training means
+        payload = load_artifact(artifact_path)
+        self.scaler = payload["scaler"]
+        self.features = payload["features"]
+        self.days_column = days_column
+        if engine == "table":
+            # The prediction table is only ever built by `python artifact.py --table`
+            self.serving_model = ServingModel.from_artifact(artifact_path, engine)
+        else:
+            self.serving_model = ServingModel(payload["model"], self.scaler, engine,
+                                              f"{payload['data_hash'][:12]}@{payload['created_at']}",
+                                              source=artifact_path)
+
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        df.columns = df.columns.str.strip()
+        missing = [column for column in self.features if column not in df.columns]
+        if missing:
+            raise ValueError(f"Input is missing feature columns: {missing}")
+        df[self.features] = df[self.features].apply(pd.to_numeric, errors='coerce')
+        # Chunks cannot see the whole file, so gaps are filled with the training means
+        df[self.features] = df[self.features].fillna(dict(zip(self.features, self.scaler.mean_))).astype(np.float64)
+        return df
+
+    def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = self.clean(df)
+        X = df[self.features].to_numpy(dtype=np.float64)
+
+        prob_fire, prob_no_fire = self.serving_model.predict_matrix(X)
+        df["prediction"] = np.where(prob_fire > prob_no_fire, "fire", "not fire")
+        df["prob_fire"] = np.round(prob_fire * 100, 2)
+        df["prob_not_fire"] = np.round(prob_no_fire * 100, 2)
+
+        if self.days_column:
+            temperature, humidity, wind, rain = X.T
+            days = pd.to_numeric(df[self.days_column], errors='coerce').to_numpy()
+            valid = ~np.isnan(days)
+            values = np.full(len(df), np.nan)
+            values[valid] = fdi_array(temperature[valid], humidity[valid], wind[valid],
+                                      days[valid].astype(np.int64), rain[valid])
+            df["fdi"] = values
+            df["fdi_band"] = [fdi_band(v) if not np.isnan(v) else None for v in values]
+        return df
+
+
+def _init_worker(artifact_path, engine, days_column):
+    global _scorer
+    _scorer = ChunkScorer(artifact_path, engine, days_column)
+
+
+def _score_in_worker(df: pd.DataFrame) -> pd.DataFrame:
+    return _scorer.score(df)
+
+
+def read_chunks(path: str, chunksize: int):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+# Parquet types of the columns ChunkScorer adds (FDI is float64 so missing values are NaN)
+_SCORED_COLUMNS = {"prediction": "string", "prob_fire": "float64", "prob_not_fire": "float64",
+                   "fdi": "float64", "fdi_band": "string"}
+
+
+def output_schema(table):
+    """
+    The Parquet schema every chunk shaped like ``table`` is cast to.
+
+    Scored columns get fixed types. Input columns keep the type inferred from
+    ``table`` (the cleaned features are always float64), except that integers are
+    widened to float64, since a later chunk with a gap reads them as floats, and
+    all-null columns become strings.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in table.schema:
+        if field.name in _SCORED_COLUMNS:
+            field = field.with_type(pa.type_for_alias(_SCORED_COLUMNS[field.name]))
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._parquet_writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, output_schema(table))
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_file(input_path: str, output_path: str, chunksize: int = 100_000, workers: int = 1,
+               engine: str = "sklearn", days_column: str = None,
+               artifact_path: str = DEFAULT_ARTIFACT_PATH) -> int:
+    """Score ``input_path`` into ``output_path`` chunk by chunk; returns the number of rows written."""
+    writer = ChunkWriter(output_path)
+    try:
+        if workers <= 1:
+            scorer = ChunkScorer(artifact_path, engine, days_column)
+            for chunk in read_chunks(input_path, chunksize):
+                writer.write(scorer.score(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(artifact_path, engine, days_column)) as pool:
+                # At most two chunks per worker in flight; results are written in input order
+                in_flight = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    in_flight.append(pool.submit(_score_in_worker, chunk))
+                    if len(in_flight) >= 2 * workers:
+                        writer.write(in_flight.popleft().result())
+                while in_flight:
+                    writer.write(in_flight.popleft().result())
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or .parquet file of observations")
+    parser.add_argument("output", help="CSV or .parquet file to write")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Score chunks in a pool of this many processes")
+    parser.add_argument("--engine", choices=ENGINES, default="sklearn")
+    parser.add_argument("--days-column", help="Days-since-rain column; enables FDI output (Rain is the rain amount)")
+    parser.add_argument("--model", default=DEFAULT_ARTIFACT_PATH, help="Model artifact path")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.input) == os.path.abspath(args.output):
+        parser.error("input and output must be different files")
+
+    start = time.perf_counter()
+    rows = score_file(args.input, args.output, args.chunksize, args.workers, args.engine,
+                      args.days_column, args.model)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows} rows into {args.output} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Multi-worker server that loads the model once and forks workers after it.
+
+    python serve.py --workers 4 --port 10000
+
+The parent binds the listening socket and imports main.py (model artifact,
+optional flat engine), then freezes the GC so collections don't write to
+the inherited objects, and forks the workers. The workers share the model's
+pages copy-on-write instead of each loading its own copy, and accept
+connections from the same socket. Dead workers are restarted; SIGINT/SIGTERM
+stop them all. Needs a platform with os.fork (Linux/macOS).
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, access_log=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 10000, workers: int = 2, log_level: str = "warning") -> None:
+    sock = bind_socket(host, port)
+
+    start = time.perf_counter()
+    import main  # loads the model once, in the parent
+    print(f"Model loaded in {time.perf_counter() - start:.2f}s "
+          f"(engine={main.INFERENCE_ENGINE}); forking {workers} workers on {host}:{port}", flush=True)
+
+    # Move everything allocated so far out of the collector's reach so that GC
+    # passes in the workers don't dirty (and un-share) the model's pages.
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(main.app, sock, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if not stopping and started is not None:
+            # Back off if workers are dying straight after start (e.g. a broken deploy)
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+            print(f"Worker {pid} exited with status {status}; restarting", file=sys.stderr, flush=True)
+            spawn()
+    sock.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve main:app with workers forked after model load.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "10000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
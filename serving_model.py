@@ -0,0 +1,245 @@
+"""
+The model the API is serving, and atomic hot reload of it.
+
+Everything a prediction needs (forest, scaler, optional flat engine, class
+columns) lives on one immutable ServingModel. Requests read ``holder.current``
+once and use that object to the end, so swapping in a new model is a single
+reference assignment: in-flight requests finish on the old model and nothing
+on the request path ever waits for a reload.
+
+With the flat engine the model comes from the artifact's flat companion
+(artifact.load_flat_artifact) when it matches the artifact's manifest, so
+serving imports NumPy but not sklearn; training code is only imported by reloads that retrain. The
+compact engine does the same with the quantized companion (compact_forest.py),
+and the table engine with the prediction table (prediction_table.py), which
+falls back to the flat forest outside its grid. The table is only ever built by
+``python artifact.py --table``; without a current one the table engine serves
+the flat engine instead, with a warning.
+"""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from artifact import (DEFAULT_ARTIFACT_PATH, build_artifact, load_artifact, load_compact_artifact, load_flat_artifact,
+                      load_table_artifact, manifest_path)
+from metrics import stage
+
+# Training data used by reloads with source="retrain" or "incremental"
+DEFAULT_TRAIN_DATA = os.environ.get("FIRESHIELD_TRAIN_DATA", "dataset.csv")
+# Directory reloads may load artifacts from and save them to, besides DEFAULT_ARTIFACT_PATH itself
+# (default: the directory of DEFAULT_ARTIFACT_PATH)
+ARTIFACT_DIR = os.environ.get("FIRESHIELD_ARTIFACT_DIR", os.path.dirname(os.path.abspath(DEFAULT_ARTIFACT_PATH)))
+
+ENGINES = ("sklearn", "flat", "compact", "table")
+# Companion files each NumPy-only engine starts from
+_LEAN_LOADERS = {"flat": load_flat_artifact, "compact": load_compact_artifact, "table": load_table_artifact}
+
+
+class ServingModel:
+    """
+    A fitted scaler + forest ready to score (n, 4) raw feature matrices.
+
+    ``model`` and ``scaler`` may be None with the other engines when
+    ``flat_model`` (a FlatForest, CompactForest or PredictionTable to match,
+    with the scaler folded in) is given instead. The table engine always needs
+    its PredictionTable passed in; building one takes minutes of forest passes.
+    ``requested_engine`` is the engine asked for when another one is serving
+    in its place, so reloads keep asking for it.
+    """
+
+    def __init__(self, model, scaler, engine: str = "sklearn", version: str = None, source: str = None,
+                 flat_model=None, requested_engine: str = None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown inference engine {engine!r}; expected one of {', '.join(ENGINES)}")
+        if model is None and (engine == "sklearn" or flat_model is None):
+            raise ValueError("A ServingModel without an sklearn model needs a NumPy-only engine and a flat_model")
+        if engine == "table" and flat_model is None:
+            raise ValueError("The table engine needs a prebuilt PredictionTable; "
+                             "build it with `python artifact.py --table`")
+        self.model = model
+        self.scaler = scaler
+        self.engine = engine
+        self.requested_engine = requested_engine or engine
+        self.version = version or f"untracked-{int(time.time())}"
+        self.source = source
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+
+        self.flat_model = flat_model
+        if engine != "sklearn" and flat_model is None:
+            from flat_forest import FlatForest
+            self.flat_model = FlatForest.from_sklearn(model, scaler)
+            if engine == "compact":
+                from compact_forest import CompactForest
+                self.flat_model = CompactForest.from_flat(self.flat_model)
+        self.classes_ = model.classes_ if model is not None else self.flat_model.classes_
+
+        # Resolve the probability columns for each label once instead of per request
+        labels = [str(label).strip() for label in self.classes_]
+        self.fire_idx = np.array([i for i, label in enumerate(labels) if label == "fire"], dtype=np.intp)
+        self.not_fire_idx = np.array([i for i, label in enumerate(labels) if label == "not fire"], dtype=np.intp)
+
+    @classmethod
+    def from_artifact(cls, path: str = DEFAULT_ARTIFACT_PATH, engine: str = "sklearn") -> "ServingModel":
+        requested_engine = engine
+        if engine in _LEAN_LOADERS:
+            lean = _LEAN_LOADERS[engine](path)
+            if lean is None and engine == "table":
+                print(f"⚠️ No current prediction table for {path}; serving the flat engine instead. "
+                      f"Build the table with `python artifact.py --table`.", file=sys.stderr, flush=True)
+                engine = "flat"
+                lean = load_flat_artifact(path)
+            if lean is not None:
+                flat_model, metadata = lean
+                version = f"{metadata['data_hash'][:12]}@{metadata['created_at']}"
+                return cls(None, None, engine, version, source=path, flat_model=flat_model,
+                           requested_engine=requested_engine)
+
+        # No current companion: build the engine from the joblib file. Companions are only
+        # ever written by whoever saves the artifact, never by a serving worker.
+        payload = load_artifact(path)
+        version = f"{payload['data_hash'][:12]}@{payload['created_at']}"
+        return cls(payload["model"], payload["scaler"], engine, version, source=path,
+                   requested_engine=requested_engine)
+
+    def predict_matrix(self, input_array: np.ndarray):
+        """Score an (n, 4) feature matrix, returning fire and not-fire probabilities (0-1)."""
+        if self.flat_model is not None:
+            with stage("predict", f"{self.engine}_predict_proba"):
+                probs = self.flat_model.predict_proba(input_array)
+        else:
+            with stage("predict", "transform"):
+                scaled = self.scaler.transform(input_array)
+            with stage("predict", "predict_proba"):
+                probs = self.model.predict_proba(scaled)
+        with stage("predict", "class_sum"):
+            prob_fire = probs[:, self.fire_idx].sum(axis=1)
+            prob_no_fire = probs[:, self.not_fire_idx].sum(axis=1)
+        return prob_fire, prob_no_fire
+
+    def describe(self) -> dict:
+        description = {
+            "version": self.version,
+            "engine": self.engine,
+            "requested_engine": self.requested_engine,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "classes": [str(label) for label in self.classes_],
+        }
+        if self.engine == "table":
+            description["table"] = {"grid": self.flat_model.grid, "mode": self.flat_model.mode,
+                                    "max_abs_error": self.flat_model.max_abs_error}
+        return description
+
+
+class ModelHolder:
+    """
+    Holds the current ServingModel and replaces it from a background thread.
+
+    Only one reload runs at a time; a failed reload keeps the current model and
+    records the error. Reloads only load (a joblib file is a pickle) and write
+    artifacts at DEFAULT_ARTIFACT_PATH or inside ``artifact_dir``, and only
+    retrain on ``train_data``.
+    """
+
+    def __init__(self, initial: ServingModel, artifact_dir: str = ARTIFACT_DIR, train_data: str = DEFAULT_TRAIN_DATA):
+        self.current = initial
+        self.artifact_dir = os.path.realpath(artifact_dir)
+        self.train_data = train_data
+        self.generation = 1
+        self.last_reload = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def swap(self, new_model: ServingModel) -> None:
+        self.current = new_model
+        self.generation += 1
+
+    def reload_in_background(self, source: str = "artifact", path: str = None, data_url: str = None) -> bool:
+        """
+        Start a reload; returns False if one is already running.
+
+        Parameters:
+            source (str): "artifact" to load ``path`` (default: the artifact currently served),
+                "retrain" to fit ForestFireModel on ``data_url`` and save it to ``path`` first, or
+                "incremental" to update that artifact with rows appended to ``data_url``.
+
+        Raises:
+            ValueError: For an unknown source, or a ``path`` or ``data_url`` outside the allowed ones.
+        """
+        if source not in ("artifact", "retrain", "incremental"):
+            raise ValueError(f"Unknown reload source {source!r}; expected 'artifact', 'retrain' or 'incremental'")
+        self._check_allowed(path, data_url)
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(target=self._reload, args=(source, path, data_url),
+                                  name="model-reload", daemon=True)
+        thread.start()
+        return True
+
+    def _check_allowed(self, path: str, data_url: str) -> None:
+        if path is not None:
+            real_path = os.path.realpath(path)
+            if (real_path != os.path.realpath(DEFAULT_ARTIFACT_PATH)
+                    and os.path.commonpath([real_path, self.artifact_dir]) != self.artifact_dir):
+                raise ValueError(f"Artifacts can only be reloaded from {DEFAULT_ARTIFACT_PATH} or inside "
+                                 f"{self.artifact_dir} (FIRESHIELD_ARTIFACT_DIR)")
+        if data_url is not None and data_url != self.train_data:
+            raise ValueError(f"Reloads can only train on {self.train_data} (FIRESHIELD_TRAIN_DATA)")
+
+    def _reload(self, source: str, path: str, data_url: str) -> None:
+        started = time.perf_counter()
+        engine = self.current.requested_engine
+        path = path or self.current.source or DEFAULT_ARTIFACT_PATH
+        try:
+            if source != "artifact":
+                build_artifact(data_url or self.train_data, path, incremental=source == "incremental")
+            new_model = ServingModel.from_artifact(path, engine)
+            previous = self.current.version
+            self.swap(new_model)
+            self.last_reload = {"status": "ok", "source": source, "previous_version": previous,
+                                "version": new_model.version}
+        except Exception as exc:
+            self.last_reload = {"status": "error", "source": source, "error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            self.last_reload["seconds"] = round(time.perf_counter() - started, 3)
+            self.last_reload["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self._reload_lock.release()
+
+    def watch(self, path: str, interval: float = 5.0) -> None:
+        """
+        Poll the artifact at ``path`` and reload it whenever it is saved again.
+
+        The manifest save_artifact writes last is what is polled, so a reload never
+        starts while the joblib file and its companions are only partly replaced.
+        """
+        manifest = manifest_path(path)
+
+        def loop():
+            last_mtime = os.path.getmtime(manifest) if os.path.exists(manifest) else None
+            while True:
+                time.sleep(interval)
+                try:
+                    mtime = os.path.getmtime(manifest)
+                except OSError:
+                    continue
+                if mtime != last_mtime and self.reload_in_background("artifact", path):
+                    last_mtime = mtime
+
+        self._watcher = threading.Thread(target=loop, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def status(self) -> dict:
+        return {
+            "current": self.current.describe(),
+            "generation": self.generation,
+            "reloading": self.reloading,
+            "last_reload": self.last_reload,
+        }
@@ -0,0 +1,69 @@
+"""MicroBatcher: per-caller results, batch splitting and error propagation."""
+import asyncio
+
+import numpy as np
+
+from batcher import MicroBatcher
+from metrics import BATCH_SIZE, REGISTRY
+
+
+class RecordingModel:
+    """Returns each row's first two columns as its (fire, not fire) pair and records batch sizes."""
+
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self.error = error
+
+    def __call__(self, rows: np.ndarray):
+        self.batches.append(len(rows))
+        if self.error is not None:
+            raise self.error
+        return rows[:, 0], rows[:, 1]
+
+
+def _submit_all(batcher: MicroBatcher, rows: list) -> list:
+    async def run():
+        return await asyncio.gather(*(batcher.submit(row) for row in rows), return_exceptions=True)
+
+    return asyncio.run(run())
+
+
+def test_each_caller_gets_its_own_row():
+    model = RecordingModel()
+    rows = [[i, 100 - i, 10.0, 0.0] for i in range(20)]
+    results = _submit_all(MicroBatcher(model, max_batch_size=64, max_wait_ms=20), rows)
+
+    assert results == [(float(i), float(100 - i)) for i in range(20)]
+    assert model.batches == [20]
+
+
+def test_batches_are_split_at_max_batch_size():
+    model = RecordingModel()
+    before = BATCH_SIZE.summary()["count"]
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=20)
+    results = _submit_all(batcher, [[i, -i, 0.0, 0.0] for i in range(10)])
+
+    assert model.batches == [4, 4, 2]
+    assert [fire for fire, _ in results] == list(map(float, range(10)))
+    assert BATCH_SIZE.summary()["count"] - before == 3
+    assert batcher.stats()["max_queue_depth"] == 10
+    assert 'fireshield_batcher_batch_size_bucket{le="4"}' in REGISTRY.render()
+
+
+def test_model_exception_reaches_every_waiting_caller():
+    model = RecordingModel(ValueError("model failed"))
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit([i, 0.0, 0.0, 0.0]) for i in range(6)),
+                                       return_exceptions=True)
+        # The batcher keeps serving after a failed batch
+        model.error = None
+        return results, await batcher.submit([7.0, 3.0, 0.0, 0.0])
+
+    results, after = asyncio.run(run())
+
+    assert model.batches == [4, 2, 1]
+    assert all(isinstance(result, ValueError) for result in results)
+    assert after == (7.0, 3.0)
+
@@ -0,0 +1,85 @@
+"""Raw and Arrow binary bodies: round trips and malformed input."""
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from binary_io import COLUMNS, BinaryFormatError, encode_arrow, encode_raw, parse_arrow, parse_raw
+
+X = np.array([[30.5, 25.0, 15.0, 0.0], [20.0, 70.0, 8.5, 2.2], [35.0, 12.0, 22.0, 0.4]])
+
+
+def _arrow(columns) -> bytes:
+    table = columns if isinstance(columns, pa.Table) else pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_raw_round_trip_is_a_view_of_the_body(dtype):
+    body = X.T.astype(dtype).tobytes()
+    parsed = parse_raw(body, dtype)
+    np.testing.assert_array_equal(parsed, X.astype(dtype))
+    assert parsed.base is not None and not parsed.flags.writeable
+
+    encoded = np.frombuffer(encode_raw(X[:, 0] / 100, X[:, 1] / 100, dtype), dtype=dtype).reshape(2, -1)
+    np.testing.assert_allclose(encoded, X[:, :2].T.astype(dtype), rtol=1e-6)
+
+
+def test_raw_empty_body_is_zero_rows():
+    assert parse_raw(b"").shape == (0, 4)
+
+
+def test_raw_rejects_bodies_that_are_not_whole_rows():
+    with pytest.raises(BinaryFormatError, match="32 bytes per row"):
+        parse_raw(X.T.tobytes()[:-8])
+
+
+def test_raw_rejects_unknown_dtypes():
+    with pytest.raises(BinaryFormatError, match="Unsupported dtype"):
+        parse_raw(X.T.tobytes(), "int8")
+
+
+def test_arrow_round_trip_with_chunks_and_integer_columns():
+    table = pa.concat_tables([
+        pa.table({name: X[:2, i] for i, name in enumerate(COLUMNS)}),
+        pa.table({name: X[2:, i] for i, name in enumerate(COLUMNS)}),
+    ])
+    table = table.set_column(1, "RH", table.column("RH").cast(pa.int32()))
+    np.testing.assert_array_equal(parse_arrow(_arrow(table)), X)
+
+    response = pa.ipc.open_stream(encode_arrow(np.array([0.9, 0.2]), np.array([0.1, 0.8]))).read_all()
+    assert response.column("fire").to_pylist() == [90.0, 20.0]
+    assert response.column("prediction").to_pylist() == ["fire", "not fire"]
+
+
+def test_arrow_float32_columns_are_widened():
+    body = _arrow({name: X[:, i].astype(np.float32) for i, name in enumerate(COLUMNS)})
+    parsed = parse_arrow(body)
+    assert parsed.dtype == np.float64
+    np.testing.assert_array_equal(parsed, X.astype(np.float32))
+
+
+def test_arrow_rejects_missing_columns():
+    with pytest.raises(BinaryFormatError, match=r"missing columns: \['Rain'\]"):
+        parse_arrow(_arrow({name: X[:, i] for i, name in enumerate(COLUMNS[:3])}))
+
+
+def test_arrow_rejects_nulls():
+    columns = {name: pa.array(X[:, i]) for i, name in enumerate(COLUMNS)}
+    columns["WS"] = pa.array([1.0, None, 3.0])
+    with pytest.raises(BinaryFormatError, match="'WS' contains nulls"):
+        parse_arrow(_arrow(columns))
+
+
+def test_arrow_rejects_non_numeric_columns():
+    columns = {name: X[:, i] for i, name in enumerate(COLUMNS)}
+    columns["Temperature"] = ["hot", "warm", "cold"]
+    with pytest.raises(BinaryFormatError, match="'Temperature' has type string"):
+        parse_arrow(_arrow(columns))
+
+
+def test_arrow_rejects_bodies_that_are_not_a_stream():
+    with pytest.raises(BinaryFormatError, match="Invalid Arrow IPC stream"):
+        parse_arrow(b"not an arrow stream")
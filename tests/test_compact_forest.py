@@ -0,0 +1,56 @@
+"""CompactForest against FlatForest and sklearn, with uint8 and uint16 leaf probabilities."""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from compact_forest import CompactForest, _index_dtype
+from flat_forest import FlatForest
+from tests.test_flat_forest import fit_forest, threshold_rows
+
+
+@pytest.fixture(scope="module", params=[{"n_estimators": 20}, {"n_estimators": 10, "max_depth": 5}],
+                ids=["pure_leaves", "impure_leaves"])
+def fitted(request):
+    model, scaler, X = fit_forest(RandomForestClassifier, **request.param)
+    rows = np.vstack([X, threshold_rows(model, scaler, X)])
+    return model, scaler, FlatForest.from_sklearn(model, scaler), rows
+
+
+@pytest.mark.parametrize("probability_dtype", [np.uint8, np.uint16])
+def test_same_leaves_and_probabilities_within_the_quantization_step(fitted, probability_dtype):
+    model, scaler, flat, rows = fitted
+    compact = CompactForest.from_flat(flat, probability_dtype)
+
+    assert compact.leaf_values.dtype == probability_dtype
+    np.testing.assert_array_equal(compact.apply(rows), flat.apply(rows))
+    expected = model.predict_proba(scaler.transform(rows))
+    error = np.abs(compact.predict_proba(rows) - expected).max()
+    assert error <= compact.max_quantization_error() + 1e-12
+
+
+def test_default_width_is_exact_uint8_for_pure_leaves_and_uint16_otherwise(fitted):
+    model, scaler, flat, rows = fitted
+    compact = CompactForest.from_flat(flat)
+    pure = model.max_depth is None
+    assert compact.leaf_values.dtype == (np.uint8 if pure else np.uint16)
+    if pure:
+        np.testing.assert_allclose(compact.predict_proba(rows), flat.predict_proba(rows), rtol=0, atol=1e-12)
+
+
+def test_code_widths_follow_the_forest_size(fitted):
+    _, _, flat, _ = fitted
+    compact = CompactForest.from_flat(flat)
+    assert compact.feature.dtype == np.uint8
+    assert compact.code.dtype == np.uint16 and compact.children.dtype == np.uint16
+    assert compact.nbytes < sum(getattr(flat, name).nbytes for name in FlatForest._ARRAYS)
+    # Forests past 65535 nodes (or grid values) switch to uint32 indexes
+    assert _index_dtype(65535) == np.uint16 and _index_dtype(65536) == np.uint32
+
+
+def test_save_and_load_round_trip(fitted, tmp_path):
+    _, _, flat, rows = fitted
+    compact = CompactForest.from_flat(flat, np.uint16)
+    compact.save(str(tmp_path / "compact.npz"), data_hash="abc")
+    loaded, metadata = CompactForest.load(str(tmp_path / "compact.npz"))
+    assert metadata == {"data_hash": "abc"}
+    np.testing.assert_array_equal(loaded.predict_proba(rows), compact.predict_proba(rows))
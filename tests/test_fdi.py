@@ -0,0 +1,115 @@
+"""
+fdi.py against the reference implementations in benchmarks/legacy_fdi.py.
+
+The scalar fdi() reads precomputed band tables, so the inputs that matter are
+the band edges: every wind and rain edge and the floats on either side of it
+are checked for every day count. The unified core is then checked over those
+edges, random rows and the awkward cases (NaN/inf, negatives, days <= 0 or
+> 21, wind in (2, 3)): with LEGACY_RULES it is the original ladder, by
+default the list-scanning fdi, and fdi_array is scalar fdi under every
+combination of legacy flags.
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+import fdi as fdi_module
+from benchmarks.legacy_fdi import ladder_fdi, ladder_wind_factor, list_scan_fdi
+
+WEATHER = [(0.0, 100.0), (10.0, 50.0), (25.0, 40.0), (40.0, 30.0), (45.0, 5.0)]
+
+
+def boundary_values(edges, below: int = 2, above: int = 2) -> list:
+    """Every edge plus its neighbouring float64 values on both sides."""
+    values = set()
+    for edge in edges:
+        lower = upper = float(edge)
+        values.add(lower)
+        for _ in range(below):
+            lower = float(np.nextafter(lower, -np.inf))
+            values.add(lower)
+        for _ in range(above):
+            upper = float(np.nextafter(upper, np.inf))
+            values.add(upper)
+    return sorted(values)
+
+
+@pytest.mark.parametrize("temperature, humidity", WEATHER)
+def test_lookup_tables_match_ladder_on_band_edges(temperature, humidity):
+    # Where both modules clamp alike (days >= 1, wind >= 3, rain > 0)
+    winds = [w for w in boundary_values(fdi_module.WIND_THRESHOLDS + [3.5, 50, 80]) if w >= 3]
+    rains = [r for r in boundary_values(list(fdi_module._RAIN_LOWS) + [0.5, 1, 90, 200]) if r > 0]
+    mismatches = []
+    for wind in winds:
+        for day in range(1, 26):
+            for rain in rains:
+                row = (temperature, humidity, wind, day, rain)
+                expected = ladder_fdi(*row)
+                if fdi_module.fdi(*row) != expected or list_scan_fdi(*row) != expected:
+                    mismatches.append(row)
+    assert not mismatches, f"{len(mismatches)} rows differ from the if/elif ladder, e.g. {mismatches[:5]}"
+
+
+def test_lookup_tables_match_list_scan_on_random_rows():
+    rng = np.random.default_rng(3)
+    rows = zip(rng.uniform(0, 45, 20_000).tolist(), rng.uniform(5, 100, 20_000).tolist(),
+               rng.uniform(3, 60, 20_000).tolist(), rng.integers(1, 30, 20_000).tolist(),
+               rng.uniform(1, 90, 20_000).tolist())
+    mismatches = [row for row in rows if fdi_module.fdi(*row) != list_scan_fdi(*row)]
+    assert not mismatches, f"e.g. {mismatches[:5]}"
+
+
+def _fdi_or_error(func, *args, **kwargs):
+    """func's result, or the exception type it raised, so both-raise counts as agreement."""
+    try:
+        return func(*args, **kwargs)
+    except Exception as exc:
+        return type(exc)
+
+
+SPECIALS = [float("nan"), float("inf"), float("-inf"), -5.0, -0.5, 0.0]
+EDGE_WINDS = boundary_values(fdi_module.WIND_THRESHOLDS + [0, 2, 2.5, 80], below=1, above=1) + SPECIALS
+EDGE_RAINS = boundary_values(list(fdi_module._RAIN_LOWS) + [0, 1, 200], below=1, above=1) + SPECIALS
+
+
+@pytest.fixture(scope="module")
+def property_rows() -> list:
+    """Every edge combination for three kinds of weather, plus random rows."""
+    n = 5_000
+    rows = [(t, h, w, d, r) for t, h in [(0.0, 100.0), (25.0, 40.0), (45.0, 5.0)]
+            for w in EDGE_WINDS for d in range(-2, 26) for r in EDGE_RAINS]
+    rng = np.random.default_rng(4)
+    return rows + list(zip(rng.uniform(-10, 50, n).tolist(), rng.uniform(0, 100, n).tolist(),
+                           rng.uniform(-5, 70, n).tolist(), rng.integers(-3, 40, n).tolist(),
+                           rng.uniform(-5, 120, n).tolist()))
+
+
+def test_legacy_rules_match_ladder(property_rows):
+    legacy = fdi_module.LEGACY_RULES
+    mismatches = [row for row in property_rows
+                  if _fdi_or_error(fdi_module.fdi, *row, **legacy) != _fdi_or_error(ladder_fdi, *row)]
+    assert not mismatches, f"{len(mismatches)} rows differ, e.g. {mismatches[:3]}"
+
+
+def test_default_rules_match_list_scan(property_rows):
+    mismatches = [row for row in property_rows
+                  if _fdi_or_error(fdi_module.fdi, *row) != _fdi_or_error(list_scan_fdi, *row)]
+    assert not mismatches, f"{len(mismatches)} rows differ, e.g. {mismatches[:3]}"
+
+
+@pytest.mark.parametrize("wind", EDGE_WINDS)
+def test_legacy_negative_wind_matches_ladder(wind):
+    core = fdi_module.wind_factor(wind, 10.0, legacy_negative_wind=True)
+    expected = ladder_wind_factor(wind, 10.0)
+    assert core == expected or (core != core and wind != wind)
+
+
+@pytest.mark.parametrize("flags", list(itertools.product((False, True), repeat=len(fdi_module.LEGACY_RULES))))
+def test_fdi_array_matches_scalar(property_rows, flags):
+    rules = dict(zip(sorted(fdi_module.LEGACY_RULES), flags))
+    columns = [np.array(column) for column in zip(*property_rows)]
+    vector = fdi_module.fdi_array(*columns, **rules)
+    scalar = np.array([fdi_module.fdi(*row, **rules) for row in property_rows])
+    differ = np.flatnonzero(vector != scalar)
+    assert not len(differ), f"{len(differ)} rows differ under {rules}, e.g. {[property_rows[i] for i in differ[:3]]}"
@@ -0,0 +1,104 @@
+"""FlatForest against sklearn, including inputs that sit exactly on split thresholds."""
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from flat_forest import FlatForest, float32_boundary, fold_scaler
+
+
+def fit_forest(estimator=RandomForestClassifier, **params):
+    """A forest behind a StandardScaler, on one-decimal readings like dataset.csv's, plus those readings."""
+    rng = np.random.default_rng(0)
+    X = np.round(np.column_stack([rng.uniform(18, 42, 600), rng.uniform(15, 90, 600),
+                                  rng.uniform(5, 30, 600), rng.exponential(0.6, 600)]), 1)
+    y = np.where(X[:, 0] - X[:, 1] / 3 - X[:, 3] * 4 + rng.normal(0, 3, 600) > 8, "fire", "not fire")
+    scaler = StandardScaler().fit(X)
+    model = estimator(random_state=0, **params).fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+def threshold_rows(model, scaler, X: np.ndarray) -> np.ndarray:
+    """
+    Raw rows that put one feature on, or a few ulps around, every split threshold, in raw
+    and scaled space, including the float32 neighbours sklearn's comparison rounds to.
+    """
+    base = np.median(X, axis=0)
+    rows = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        split = tree.children_left != -1
+        for feature, threshold in zip(tree.feature[split], tree.threshold[split]):
+            below = np.float64(np.float32(threshold))
+            scaled = [threshold, below, np.nextafter(np.float32(threshold), np.float32(np.inf)),
+                      float32_boundary(np.array([threshold]))[0]]
+            for value in scaled:
+                raw = value * scaler.scale_[feature] + scaler.mean_[feature]
+                for ulps in range(-3, 4):
+                    row = base.copy()
+                    row[feature] = raw + ulps * np.spacing(raw)
+                    rows.append(row)
+    return np.array(rows)
+
+
+@pytest.fixture(scope="module", params=[
+    (RandomForestClassifier, {"n_estimators": 20}),
+    (RandomForestClassifier, {"n_estimators": 10, "max_depth": 5}),
+    (ExtraTreesClassifier, {"n_estimators": 10}),
+], ids=["full_depth", "shallow", "extra_trees"])
+def fitted(request):
+    estimator, params = request.param
+    return fit_forest(estimator, **params)
+
+
+def test_leaves_match_sklearn_on_and_around_every_threshold(fitted):
+    model, scaler, X = fitted
+    flat = FlatForest.from_sklearn(model, scaler)
+    rows = np.vstack([X, threshold_rows(model, scaler, X)])
+
+    np.testing.assert_array_equal(flat.apply(rows) - flat.roots, model.apply(scaler.transform(rows)))
+    np.testing.assert_allclose(flat.predict_proba(rows), model.predict_proba(scaler.transform(rows)),
+                               rtol=0, atol=1e-12)
+
+
+def test_without_a_scaler_thresholds_apply_to_scaled_inputs(fitted):
+    model, scaler, X = fitted
+    flat = FlatForest.from_sklearn(model)
+    scaled = scaler.transform(np.vstack([X, threshold_rows(model, scaler, X)]))
+    np.testing.assert_array_equal(flat.apply(scaled) - flat.roots, model.apply(scaled))
+
+
+def test_float32_boundary_is_the_last_value_that_goes_left():
+    thresholds = np.array([0.1, -0.35, 1.5, 25.45, 1e-8, 3.0000001])
+    boundary = float32_boundary(thresholds)
+    assert (boundary.astype(np.float32) <= thresholds).all()
+    assert (np.nextafter(boundary, np.inf).astype(np.float32) > thresholds).all()
+
+
+def test_fold_scaler_agrees_with_the_scaled_comparison():
+    rng = np.random.default_rng(1)
+    boundary, mean, scale = rng.normal(0, 1, 500), rng.uniform(0, 50, 500), rng.uniform(0.1, 20, 500)
+    # Boundaries that fold to (almost) zero, where floats are far denser than the estimate's error
+    boundary[:3], mean[:3], scale[:3] = -2.0, [40.0, 0.6, 33.3], [20.0, 0.3, 16.65]
+    folded = fold_scaler(boundary, mean, scale)
+    assert ((folded - mean) / scale <= boundary).all()
+    assert ((np.nextafter(folded, np.inf) - mean) / scale > boundary).all()
+
+
+def test_save_and_load_round_trip(fitted, tmp_path):
+    model, scaler, X = fitted
+    flat = FlatForest.from_sklearn(model, scaler)
+    flat.save(str(tmp_path / "flat.npz"), data_hash="abc")
+    loaded, metadata = FlatForest.load(str(tmp_path / "flat.npz"))
+    assert metadata == {"data_hash": "abc"}
+    assert list(loaded.classes_) == list(model.classes_)
+    np.testing.assert_array_equal(loaded.predict_proba(X), flat.predict_proba(X))
+
+
+def test_non_tree_models_are_rejected():
+    from sklearn.ensemble import HistGradientBoostingClassifier
+
+    model, _, X = fit_forest()
+    boosting = HistGradientBoostingClassifier(max_iter=5).fit(X, model.classes_[(X[:, 0] > 30).astype(int)])
+    with pytest.raises(TypeError, match="sklearn engine"):
+        FlatForest.from_sklearn(boosting)
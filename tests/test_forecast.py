@@ -0,0 +1,104 @@
+"""Forecast rain state and scoring against a per-day loop, including days with missing inputs."""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from fdi import fdi, fdi_band
+from forecast import forecast_risk, rolling_rain_state
+from rain_store import RainStore
+from weather_fixture import ReplayClient, WeatherFixture, _key
+
+TODAY = date(2026, 7, 1)
+LOOKBACK = 90
+
+
+def per_day_rain_state(rain, days_before, rainfall_before):
+    """Days since rain and its amount, walking each location's forecast one day at a time."""
+    days_since = np.empty(rain.shape, dtype=np.int64)
+    rainfall = np.empty(rain.shape)
+    for i in range(rain.shape[0]):
+        since, amount = days_before[i], rainfall_before[i]
+        for day in range(rain.shape[1]):
+            if rain[i, day] > 0:
+                since, amount = 0, rain[i, day]
+            elif day > 0:
+                since += 1
+            days_since[i, day], rainfall[i, day] = since, amount
+    return days_since, rainfall
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rolling_rain_state_matches_the_per_day_loop(seed):
+    rng = np.random.default_rng(seed)
+    rain = np.where(rng.random((40, 16)) < 0.25, np.round(rng.exponential(5, (40, 16)), 1), 0.0)
+    rain[rng.random((40, 16)) < 0.05] = np.nan
+    rain[0] = 0.0  # no rain at all in the forecast
+    rain[1, 0] = 12.5  # rain today
+    days_before = rng.integers(0, LOOKBACK + 1, 40)
+    rainfall_before = np.where(days_before < LOOKBACK, rng.uniform(0.1, 30, 40), 0.0)
+
+    days_since, rainfall = rolling_rain_state(rain, days_before, rainfall_before)
+    expected_days, expected_rainfall = per_day_rain_state(rain, days_before, rainfall_before)
+
+    np.testing.assert_array_equal(days_since, expected_days)
+    np.testing.assert_array_equal(rainfall, expected_rainfall)
+
+
+def predict(features):
+    assert np.isfinite(features).all()
+    prob_fire = np.clip((features[:, 0] - features[:, 1] / 3 + features[:, 2]) / 60, 0, 1)
+    return prob_fire, 1 - prob_fire
+
+
+COORDS = [(round(30 + i * 0.1, 4), -100.0) for i in range(6)]
+# (location, day, variable) set to null: temperature, humidity, wind, and a rain gap
+GAPS = [(0, 5, 0), (1, 2, 1), (1, 3, 2), (2, 4, 3)]
+
+
+@pytest.fixture
+def replay():
+    fixture = WeatherFixture.synthetic(COORDS, TODAY, LOOKBACK)
+    for location, day, variable in GAPS:
+        fixture.forecast[_key(*COORDS[location])][day][variable] = None
+    client = ReplayClient(fixture)
+    store = RainStore(":memory:", client=client)
+    yield client, store
+    store.close()
+
+
+def test_forecast_risk_matches_per_day_scoring_with_null_gaps(replay):
+    client, store = replay
+    days = 8
+    locations = forecast_risk(COORDS, predict, days, client, store, LOOKBACK)
+    assert len(locations) == len(COORDS)
+
+    for (lat, lon), location in zip(COORDS, locations):
+        _, features = client.daily_forecast([(lat, lon)], days)
+        history_days, history = store.daily_rain(lat, lon, TODAY - timedelta(days=LOOKBACK), TODAY - timedelta(days=1))
+        series = [(day.astype(object), mm) for day, mm in zip(history_days, history)]
+        assert location["dates"] == [str(TODAY + timedelta(days=day)) for day in range(days)]
+        for day in range(days):
+            current = TODAY + timedelta(days=day)
+            row = features[0, day]
+            rain = 0.0 if np.isnan(row[3]) else row[3]
+            series.append((current, rain))
+            rainy = [(rain_day, mm) for rain_day, mm in series if mm > 0]
+            days_since, rainfall = ((current - rainy[-1][0]).days, rainy[-1][1]) if rainy else (LOOKBACK + day, 0)
+
+            assert location["days_since_rain"][day] == days_since
+            assert location["rain"][day] == rain
+            if np.isnan(row[:3]).any():
+                assert location["fire_probability"][day] is None
+                assert location["fdi"][day] is None and location["band"][day] is None
+                # The whole day's inputs are reported as null, not just the missing one
+                assert location["temperature"][day] is None and location["wind"][day] is None
+                continue
+            value = fdi(row[0], row[1], row[2], days_since, rainfall)
+            assert location["fdi"][day] == value and location["band"][day] == fdi_band(value)
+            scored = np.array([[row[0], row[1], row[2], rain]])
+            assert location["fire_probability"][day] == round(float(predict(scored)[0][0]) * 100, 2)
+            assert location["temperature"][day] == row[0]
+
+    gaps = sum(value is None for location in locations for value in location["fdi"])
+    assert gaps == len({(location, day) for location, day, variable in GAPS if variable < 3})
@@ -0,0 +1,98 @@
+"""Registry exposition format, and the /metrics endpoint, per-stage timers and FIRESHIELD_METRICS=0 on the app."""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+from metrics import HTTP_REQUESTS, STAGE_SECONDS, Registry, stage
+
+# One sample line of the text exposition format: name, optional labels, value
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? -?[0-9.e+-]+$')
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def test_registry_renders_counters_histograms_and_gauges():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Requests", ["route"])
+    seconds = registry.histogram("demo_seconds", "Time", ["route"], buckets=(0.1, 1.0))
+    registry.gauge_callback("demo_generation", "Generation", lambda: 3)
+    requests.inc("/a")
+    requests.inc("/a", amount=2)
+    for value in (0.05, 0.5, 5.0):
+        seconds.observe(value, "/a")
+
+    assert registry.render() == "\n".join([
+        "# HELP demo_requests_total Requests",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{route="/a"} 3',
+        "# HELP demo_seconds Time",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a",le="1.0"} 2',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 3',
+        'demo_seconds_sum{route="/a"} 5.55',
+        'demo_seconds_count{route="/a"} 3',
+        "# HELP demo_generation Generation",
+        "# TYPE demo_generation gauge",
+        "demo_generation 3",
+    ]) + "\n"
+    assert seconds.summary("/a") == {"count": 3, "sum": 5.55}
+    assert seconds.summary("/b") == {"count": 0, "sum": 0.0}
+
+
+def test_metrics_endpoint_is_prometheus_text(client):
+    client.get("/predict/batcher")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    for line in lines:
+        assert line.startswith(("# HELP ", "# TYPE ")) or SAMPLE.match(line), line
+    assert "# TYPE fireshield_stage_seconds histogram" in lines
+    assert "# TYPE fireshield_http_requests_total counter" in lines
+    assert "# TYPE fireshield_model_generation gauge" in lines
+    assert any(line.startswith('fireshield_http_requests_total{route="/predict/batcher",method="GET",status="200"}')
+               for line in lines)
+
+
+def test_predict_records_each_stage_and_the_request(client):
+    before = {name: STAGE_SECONDS.summary("predict", name)["count"]
+              for name in ("build_array", "serialize", "validate_and_route")}
+    requests_before = HTTP_REQUESTS.value("/predict", "POST", 200)
+
+    response = client.post("/predict", json={"Temperature": 31.7, "RH": 23.3, "WS": 14.1, "Rain": 0.0})
+
+    assert response.status_code == 200
+    for name, count in before.items():
+        assert STAGE_SECONDS.summary("predict", name)["count"] == count + 1, name
+    assert HTTP_REQUESTS.value("/predict", "POST", 200) == requests_before + 1
+    assert 'fireshield_stage_seconds_count{component="predict",stage="serialize"}' in client.get("/metrics").text
+
+
+def test_unmatched_routes_share_one_label(client):
+    before = HTTP_REQUESTS.value("unmatched", "GET", 404)
+    assert client.get("/no-such-route").status_code == 404
+    assert HTTP_REQUESTS.value("unmatched", "GET", 404) == before + 1
+
+
+def test_disabled_metrics_record_nothing(client, monkeypatch):
+    # FIRESHIELD_METRICS is read once at import; this is the flag it sets
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    stages_before = STAGE_SECONDS.summary("predict", "serialize")["count"]
+    requests_before = HTTP_REQUESTS.value("/predict", "POST", 200)
+
+    response = client.post("/predict", json={"Temperature": 28.2, "RH": 41.9, "WS": 12.6, "Rain": 0.3})
+    with stage("test", "noop"):
+        pass
+
+    assert response.status_code == 200
+    assert STAGE_SECONDS.summary("predict", "serialize")["count"] == stages_before
+    assert STAGE_SECONDS.summary("test", "noop")["count"] == 0
+    assert HTTP_REQUESTS.value("/predict", "POST", 200) == requests_before
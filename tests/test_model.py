@@ -0,0 +1,73 @@
+"""ForestFireModel.train_incremental on copies of dataset.csv."""
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from model import ForestFireModel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    """(csv path holding the first 150 rows, the remaining rows as CSV text to append)."""
+    with open(os.path.join(ROOT, "dataset.csv")) as f:
+        header, *rows = f.read().splitlines(keepends=True)
+    path = tmp_path / "data.csv"
+    path.write_text(header + "".join(rows[:150]))
+    return str(path), "".join(rows[150:])
+
+
+def _fitted(csv_path: str, cache_path: str, **params) -> ForestFireModel:
+    fire_model = ForestFireModel(csv_path)
+    fire_model.model = RandomForestClassifier(**params)
+    fire_model.train(cache_path)
+    return fire_model
+
+
+def test_rescaled_trees_keep_every_training_row_on_its_side(split_csv, tmp_path):
+    csv_path, appended = split_csv
+    cache_path = str(tmp_path / "cache.npz")
+    fire_model = _fitted(csv_path, cache_path, n_estimators=20, random_state=0)
+    before, old_scaler = copy.deepcopy(fire_model.model), copy.deepcopy(fire_model.scaler)
+    X_seen = pd.DataFrame(np.load(cache_path)["X"], columns=fire_model.features)
+
+    with open(csv_path, "a") as f:
+        f.write(appended)
+    assert fire_model.train_incremental(cache_path, new_trees=5) > 0
+    assert fire_model.scaler.mean_.tolist() != old_scaler.mean_.tolist()
+
+    old_X = old_scaler.transform(X_seen).astype(np.float32)
+    new_X = fire_model.scaler.transform(X_seen).astype(np.float32)
+    for old_tree, new_tree in zip(before.estimators_, fire_model.model.estimators_):
+        np.testing.assert_array_equal(old_tree.apply(old_X), new_tree.apply(new_X))
+
+
+def test_full_retrain_fallback_keeps_the_estimator_settings(split_csv, tmp_path):
+    csv_path, _ = split_csv
+    fire_model = _fitted(csv_path, None, n_estimators=7, max_depth=3, random_state=5)
+    fire_model.data_hash = "no cache was written for this"
+    assert fire_model.train_incremental(str(tmp_path / "missing.npz")) == -1
+    params = fire_model.model.get_params()
+    assert (params["n_estimators"], params["max_depth"], params["random_state"]) == (7, 3, 5)
+    assert len(fire_model.model.estimators_) == 7
+
+
+def test_updates_at_the_tree_cap_draw_new_seeds(split_csv, tmp_path):
+    csv_path, appended = split_csv
+    cache_path = str(tmp_path / "cache.npz")
+    fire_model = _fitted(csv_path, cache_path, n_estimators=10, random_state=0)
+    lines = appended.splitlines(keepends=True)
+
+    seeds = []
+    for chunk in (lines[:30], lines[30:60]):
+        with open(csv_path, "a") as f:
+            f.write("".join(chunk))
+        fire_model.train_incremental(cache_path, new_trees=5, max_estimators=10)
+        assert len(fire_model.model.estimators_) == 10
+        seeds.append([tree.random_state for tree in fire_model.model.estimators_[-5:]])
+    assert not set(seeds[0]) & set(seeds[1])
@@ -0,0 +1,98 @@
+"""PredictionTable on a small forest fitted to synthetic rows."""
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from flat_forest import FlatForest
+from prediction_table import TABLE_MODES, PredictionTable
+from serving_model import ServingModel
+
+GRID = "20:30:1,20:60:5,6:20:2,0:2:0.5"
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(18, 32, 400), rng.uniform(15, 65, 400),
+                         rng.uniform(5, 22, 400), rng.uniform(0, 3, 400)])
+    y = np.where(X[:, 0] - X[:, 1] / 3 + X[:, 3] * -4 > 10, "fire", "not fire")
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0).fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+@pytest.mark.parametrize("mode", TABLE_MODES)
+def test_table_equals_forest_on_grid_points(fitted, mode):
+    model, scaler, _ = fitted
+    table = PredictionTable.build(FlatForest.from_sklearn(model, scaler), GRID, mode=mode)
+    axes = [table.start[f] + np.arange(table.count[f]) * table.step[f] for f in range(4)]
+    points = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 4)
+    np.testing.assert_allclose(table.predict_proba(points), model.predict_proba(scaler.transform(points)),
+                               atol=1 / 65535)
+
+
+def test_rows_off_the_grid_fall_back_to_the_forest(fitted):
+    model, scaler, _ = fitted
+    table = PredictionTable.build(FlatForest.from_sklearn(model, scaler), GRID)
+    rows = np.array([[40.0, 30.0, 10.0, 0.0], [25.0, 30.0, 10.0, np.nan]])
+    assert not table.inside(rows).any()
+    np.testing.assert_array_equal(table.predict_proba(rows), table.forest.predict_proba(rows))
+
+
+def test_report_has_an_error_per_mode_and_describe_uses_the_served_one(fitted, tmp_path):
+    model, scaler, X = fitted
+    flat = FlatForest.from_sklearn(model, scaler)
+    table = PredictionTable.build(flat, GRID, probe=X, mode="nearest")
+    for mode in TABLE_MODES:
+        assert table.report["max_abs_error"][mode] == max(stats["max_abs_error"]
+                                                          for stats in table.report[mode].values())
+
+    table.save(str(tmp_path / "table.npz"))
+    linear, _ = PredictionTable.load(str(tmp_path / "table.npz"), flat, mode="linear")
+    described = ServingModel(None, None, "table", flat_model=linear).describe()["table"]
+    assert described["mode"] == "linear"
+    assert described["max_abs_error"] == table.report["max_abs_error"]["linear"]
+
+
+
+def _forbid_building(monkeypatch):
+    # Serving must never build a table itself
+    monkeypatch.setattr(PredictionTable, "build", lambda *args, **kwargs: pytest.fail("table built while serving"))
+
+
+@pytest.fixture
+def artifact(fitted, tmp_path):
+    from artifact import save_artifact
+
+    model, scaler, _ = fitted
+    path = str(tmp_path / "model.joblib")
+    save_artifact(model, scaler, ["Temperature", "RH", "WS", "Rain"], "0" * 64, path)
+    return path
+
+
+def test_table_engine_without_a_table_serves_flat_with_a_warning(artifact, capsys, monkeypatch):
+    _forbid_building(monkeypatch)
+    serving = ServingModel.from_artifact(artifact, "table")
+    assert serving.engine == "flat" and serving.requested_engine == "table"
+    assert "python artifact.py --table" in capsys.readouterr().err
+
+
+def test_table_engine_serves_a_table_for_the_configured_grid_only(fitted, artifact, monkeypatch):
+    import prediction_table
+    from artifact import load_artifact, save_table_artifact
+
+    model, scaler, _ = fitted
+    table = PredictionTable.build(FlatForest.from_sklearn(model, scaler), GRID)
+    save_table_artifact(load_artifact(artifact), artifact, table=table)
+    _forbid_building(monkeypatch)
+
+    assert ServingModel.from_artifact(artifact, "table").engine == "flat"
+    monkeypatch.setattr(prediction_table, "DEFAULT_TABLE_GRID", GRID)
+    assert ServingModel.from_artifact(artifact, "table").engine == "table"
+
+
+def test_table_engine_is_never_built_from_a_forest(fitted):
+    model, scaler, _ = fitted
+    with pytest.raises(ValueError, match="artifact.py --table"):
+        ServingModel(model, scaler, "table")
@@ -0,0 +1,154 @@
+"""RainStore against the local Open-Meteo stub: grouped syncs, pruning, last_rain and backfill."""
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from rain_store import RainStore
+from weather_client import WeatherClient
+from weather_stub import start_stub_server, stub_url, synthetic_rain
+
+TODAY = date(2026, 6, 30)
+
+
+@pytest.fixture
+def server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(server):
+    with WeatherClient(stub_url(server)) as client:
+        yield client
+
+
+def _store(client, **kwargs) -> RainStore:
+    return RainStore(":memory:", client=client, **kwargs)
+
+
+def _expected_last_rain(lat, lon, lookback_days, today=TODAY):
+    for days_since in range(lookback_days + 1):
+        day = today - timedelta(days=days_since)
+        mm = synthetic_rain(lat, lon, day.isoformat())
+        if mm > 0:
+            return day, mm, days_since
+    return None, None, lookback_days
+
+
+def _dry_spell(length: int, within: int):
+    """A stub location whose last rain is more than ``length`` but at most ``within`` days before TODAY."""
+    for i in range(1000):
+        lat, lon = round(40 + i * 0.01, 4), -90.0
+        _, _, days_since = _expected_last_rain(lat, lon, within)
+        if length < days_since < within:
+            return lat, lon
+    raise AssertionError("no such location in the stub data")
+
+
+def test_sync_groups_locations_by_first_missing_day(client, server):
+    store = _store(client)
+    a, b, c = (30.0, -100.0), (30.1, -100.0), (30.2, -100.0)
+    assert store.sync([a], 10, TODAY - timedelta(days=3)) == 11
+    assert server.request_count == 1
+
+    # a is missing its last 3 days, b and c the whole window: two requests, not three
+    assert store.sync([a, b, c], 10, TODAY) == 3 + 2 * 11
+    assert server.request_count == 3
+
+    # Everything is up to date now
+    assert store.sync([a, b, c], 10, TODAY) == 0
+    assert server.request_count == 3
+
+
+def test_last_rain_matches_the_archive(client):
+    store = _store(client)
+    coords = [(round(31 + i * 0.01, 4), -98.5) for i in range(20)]
+    store.sync(coords, 30, TODAY)
+    for lat, lon in coords:
+        assert store.last_rain(lat, lon, 30, TODAY) == _expected_last_rain(lat, lon, 30)
+
+    days, rain = store.daily_rain(*coords[0], TODAY - timedelta(days=4), TODAY)
+    assert len(days) == 5
+    assert rain.tolist() == [synthetic_rain(*coords[0], str(day)) for day in days]
+
+
+def test_last_rain_outside_the_lookback_counts_as_none(client):
+    lat, lon = _dry_spell(5, 30)
+    store = _store(client)
+    store.sync([(lat, lon)], 30, TODAY)
+    assert store.last_rain(lat, lon, 5, TODAY) == (None, None, 5)
+    assert store.last_rain(lat, lon, 30, TODAY)[0] is not None
+    assert store.last_rain(99.0, 0.0, 30, TODAY) == (None, None, 30)
+
+
+def test_longer_lookback_backfills_older_days(client, server):
+    lat, lon = _dry_spell(5, 30)
+    store = _store(client)
+    store.sync([(lat, lon)], 5, TODAY)
+    assert store.last_rain(lat, lon, 30, TODAY) == (None, None, 30)
+
+    assert store.sync([(lat, lon)], 30, TODAY) == 31
+    assert store.last_rain(lat, lon, 30, TODAY) == _expected_last_rain(lat, lon, 30)
+    # Once fetched that far back, a shorter or equal lookback needs nothing new
+    requests = server.request_count
+    assert store.sync([(lat, lon)], 30, TODAY) == 0 and store.sync([(lat, lon)], 5, TODAY) == 0
+    assert server.request_count == requests
+
+
+def test_null_days_are_retried_on_the_next_sync(client, server):
+    class UnfilledToday(WeatherClient):
+        def _fetch_batch(self, coords, start_date, end_date):
+            series = super()._fetch_batch(coords, start_date, end_date)
+            for _, rain in series:
+                rain[-1] = np.nan
+            return series
+
+    with UnfilledToday(stub_url(server)) as gappy:
+        store = _store(gappy)
+        store.sync([(30.0, -100.0)], 10, TODAY)
+        store.client = client
+        assert store.sync([(30.0, -100.0)], 10, TODAY) == 1
+
+
+def test_prune_drops_old_rows_and_idle_locations(client):
+    store = _store(client, retention_days=20, max_idle_days=5)
+    store.sync([(30.0, -100.0)], 10, TODAY - timedelta(days=20))
+    store.sync([(30.1, -100.0)], 30, TODAY)
+
+    # The first location went unused for 20 days; the second keeps only 20 days of rows
+    assert store.stats()["locations"] == 1
+    assert store.last_rain(30.0, -100.0, 30, TODAY) == (None, None, 30)
+    assert store.stats()["daily_rows"] == 21
+
+
+def test_prune_keeps_only_the_most_recently_used_locations(client):
+    store = _store(client, max_locations=2)
+    coords = [(30.0, -100.0), (30.1, -100.0), (30.2, -100.0)]
+    for offset, coord in enumerate(coords):
+        store.sync([coord], 3, TODAY - timedelta(days=len(coords) - offset))
+    # Using the oldest location again makes the middle one the least recently used
+    store.sync([coords[0]], 3, TODAY)
+    store.sync([(30.3, -100.0)], 3, TODAY)
+
+    kept = {row[0] for row in store._conn.execute("SELECT location FROM locations")}
+    assert kept == {"30.0000,-100.0000", "30.3000,-100.0000"}
+
+
+def test_stores_from_older_versions_are_migrated(client, tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE locations (location TEXT PRIMARY KEY, complete_through INTEGER,
+                                    last_rain_day INTEGER, last_rain_mm REAL);
+            CREATE TABLE daily_rain (location TEXT NOT NULL, day INTEGER NOT NULL, rain_mm REAL,
+                                     PRIMARY KEY (location, day)) WITHOUT ROWID;
+        """)
+        conn.execute("INSERT INTO locations VALUES ('30.0000,-100.0000', ?, NULL, NULL)", (TODAY.toordinal(),))
+    store = RainStore(path, client=client)
+    # The old row has no fetched_from, so its window is fetched once in full
+    assert store.sync([(30.0, -100.0)], 10, TODAY) == 11
+    assert store.last_rain(30.0, -100.0, 10, TODAY) == _expected_last_rain(30.0, -100.0, 10)
+    store.close()
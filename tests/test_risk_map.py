@@ -0,0 +1,86 @@
+"""score_tile and stream_tiles against the local Open-Meteo stub, including null weather values."""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from fdi import fdi_array
+from rain_store import RainStore
+from risk_map import BoundingBox, score_tile, stream_tiles
+from weather_client import WeatherClient
+from weather_stub import current_payload, start_stub_server, stub_url
+
+BBOX = BoundingBox(30.0, -100.0, 30.04, -99.96)
+# Open-Meteo returns null for a variable it has no value for yet
+NULL_POINTS = {(30.01, -99.99): "temperature_2m", (30.03, -100.0): "relative_humidity_2m",
+               (30.04, -99.96): "wind_speed_10m"}
+
+
+class GappyClient(WeatherClient):
+    """Stub client whose current conditions have nulls at NULL_POINTS."""
+
+    def _get_locations(self, url, coords, params):
+        locations = super()._get_locations(url, coords, params)
+        for coord, location in zip(coords, locations):
+            if coord in NULL_POINTS and "current" in location:
+                location["current"][NULL_POINTS[coord]] = None
+        return locations
+
+
+def predict(features):
+    assert np.isfinite(features).all()
+    prob_fire = (features[:, 0] - features[:, 1] / 4) / 100
+    return prob_fire, 1 - prob_fire
+
+
+@pytest.fixture
+def client():
+    server = start_stub_server()
+    client = GappyClient(stub_url(server), forecast_url=stub_url(server, "forecast"), batch_size=10)
+    yield client
+    client.close()
+    server.shutdown()
+
+
+def test_score_tile_reports_points_with_null_weather_as_null(client):
+    latitudes, longitudes = np.array([30.0, 30.01, 30.02, 30.03]), np.array([-100.0, -99.99, -99.98])
+    store = RainStore(":memory:", client=client)
+    tile = score_tile(0, 0, latitudes, longitudes, predict, client, store)
+
+    for i, lat in enumerate(latitudes.tolist()):
+        for j, lon in enumerate(longitudes.tolist()):
+            if (lat, lon) in NULL_POINTS:
+                assert tile["fire_probability"][i][j] is None
+                assert tile["fdi"][i][j] is None and tile["band"][i][j] is None
+                continue
+            current = current_payload(lat, lon)["current"]
+            row = np.array([[current["temperature_2m"], current["relative_humidity_2m"],
+                             current["wind_speed_10m"], tile["rain"][i][j]]])
+            _, mm, days = store.last_rain(lat, lon)
+            assert tile["temperature"][i][j] == current["temperature_2m"]
+            assert tile["days_since_rain"][i][j] == days
+            assert tile["fire_probability"][i][j] == round(predict(row)[0][0] * 100, 2)
+            assert tile["fdi"][i][j] == fdi_array(*row[0, :3], days, mm or 0)
+    assert tile["temperature"][1][1] is None
+    assert tile["humidity"][3][0] is None
+
+
+def test_score_tile_with_every_point_missing(client):
+    store = RainStore(":memory:", client=client)
+    tile = score_tile(0, 0, np.array([30.01]), np.array([-99.99]), predict, client, store)
+    assert tile["fire_probability"] == [[None]] and tile["fdi"] == [[None]]
+
+
+def test_stream_tiles_completes_through_null_weather(client):
+    async def collect():
+        return [tile async for tile in stream_tiles(BBOX, 0.01, predict, tile_size=2, client=client,
+                                                    store=RainStore(":memory:", client=client))]
+
+    tiles = asyncio.run(collect())
+
+    assert [tile["tile"] for tile in tiles] == [[row, col] for row in range(3) for col in range(3)]
+    nulls = sum(value is None for tile in tiles for row in tile["fdi"] for value in row)
+    assert nulls == len(NULL_POINTS)
+    for tile in tiles:
+        json.dumps(tile, allow_nan=False)
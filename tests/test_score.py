@@ -0,0 +1,86 @@
+"""score_file on CSV and Parquet inputs that span several chunks, against scoring the whole file at once."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from artifact import DEFAULT_ARTIFACT_PATH
+from score import ChunkScorer, read_chunks, score_file
+
+ROWS = 250
+CHUNKSIZE = 40
+
+
+@pytest.fixture(scope="module")
+def observations():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "Station": [f"s{i:03d}" for i in range(ROWS)],
+        "Temperature": rng.uniform(18, 40, ROWS).round(1),
+        "RH (Relative Humidity)": rng.uniform(10, 90, ROWS).round(1),
+        "WS (Wind Speed)": rng.uniform(5, 30, ROWS).round(1),
+        # Padded like the training CSV's header, which clean strips
+        "Rain ": rng.choice([0, 0, 0, 0.4, 2.5], ROWS),
+        "Days Since Rain": rng.integers(0, 30, ROWS).astype(float),
+    })
+    # Gaps in one chunk only, so later chunks read these columns with other inferred types
+    df.loc[45:50, "Temperature"] = np.nan
+    df.loc[100:105, "Days Since Rain"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def expected(observations):
+    scorer = ChunkScorer(DEFAULT_ARTIFACT_PATH, days_column="Days Since Rain")
+    return scorer.score(observations.copy())
+
+
+def _write(df: pd.DataFrame, path) -> str:
+    path = str(path)
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def _read(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+def _assert_matches(scored: pd.DataFrame, expected: pd.DataFrame):
+    assert len(scored) == ROWS
+    assert scored["Station"].tolist() == expected["Station"].tolist()
+    assert scored["prediction"].tolist() == expected["prediction"].tolist()
+    np.testing.assert_allclose(scored["prob_fire"], expected["prob_fire"])
+    np.testing.assert_allclose(scored["prob_not_fire"], expected["prob_not_fire"])
+    np.testing.assert_array_equal(scored["fdi"], expected["fdi"])
+    assert scored["fdi_band"].isna().tolist() == expected["fdi_band"].isna().tolist()
+    assert scored["fdi_band"].dropna().tolist() == expected["fdi_band"].dropna().tolist()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_input_spans_several_chunks(observations, expected, tmp_path, suffix):
+    input_path = _write(observations, tmp_path / f"in{suffix}")
+    assert len(list(read_chunks(input_path, CHUNKSIZE))) == -(-ROWS // CHUNKSIZE)
+
+    output_path = str(tmp_path / f"out{suffix}")
+    rows = score_file(input_path, output_path, chunksize=CHUNKSIZE, days_column="Days Since Rain")
+
+    assert rows == ROWS
+    _assert_matches(_read(output_path), expected)
+
+
+def test_worker_pool_keeps_input_order(observations, expected, tmp_path):
+    input_path = _write(observations, tmp_path / "in.csv")
+    output_path = str(tmp_path / "out.parquet")
+
+    rows = score_file(input_path, output_path, chunksize=CHUNKSIZE, workers=2, days_column="Days Since Rain")
+
+    assert rows == ROWS
+    _assert_matches(_read(output_path), expected)
+
+
+def test_missing_feature_column_is_reported(observations, tmp_path):
+    input_path = _write(observations.drop(columns="WS (Wind Speed)"), tmp_path / "in.csv")
+    with pytest.raises(ValueError, match="WS"):
+        score_file(input_path, str(tmp_path / "out.csv"), chunksize=CHUNKSIZE)
@@ -0,0 +1,98 @@
+"""ModelHolder hot reload: atomic swap, failed reloads and the allowed artifact locations."""
+import os
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from artifact import save_artifact
+from serving_model import ModelHolder, ServingModel
+
+FEATURES = ["Temperature", "RH", "WS", "Rain"]
+ROWS = np.array([[30.0, 30.0, 15.0, 0.0], [20.0, 70.0, 8.0, 2.0]])
+
+
+def _save(path: str, seed: int, data_hash: str) -> str:
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(18, 32, 200), rng.uniform(15, 65, 200),
+                         rng.uniform(5, 22, 200), rng.uniform(0, 3, 200)])
+    y = np.where(X[:, 0] - X[:, 1] / 3 > 10, "fire", "not fire")
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=seed).fit(scaler.transform(X), y)
+    return save_artifact(model, scaler, FEATURES, data_hash, path)
+
+
+def _wait(holder: ModelHolder) -> dict:
+    deadline = time.monotonic() + 30
+    while holder.reloading:
+        assert time.monotonic() < deadline, "reload did not finish"
+        time.sleep(0.01)
+    return holder.last_reload
+
+
+@pytest.fixture
+def holder(tmp_path):
+    path = _save(str(tmp_path / "current.joblib"), 0, "a" * 64)
+    return ModelHolder(ServingModel.from_artifact(path, "flat"), artifact_dir=str(tmp_path),
+                       train_data=str(tmp_path / "train.csv"))
+
+
+def test_reload_swaps_in_the_new_model_and_leaves_the_old_one_intact(holder, tmp_path):
+    old = holder.current
+    expected_old = old.predict_matrix(ROWS)
+    new_path = _save(str(tmp_path / "next.joblib"), 1, "b" * 64)
+
+    assert holder.reload_in_background("artifact", new_path)
+    status = _wait(holder)
+
+    assert status["status"] == "ok" and status["previous_version"] == old.version
+    assert holder.current is not old and holder.current.version.startswith("b" * 12)
+    assert holder.current.engine == "flat" and holder.generation == 2
+    # A request that read the old model before the swap finishes on it unchanged
+    np.testing.assert_array_equal(old.predict_matrix(ROWS), expected_old)
+
+
+def test_failed_reload_keeps_the_current_model(holder, tmp_path):
+    old = holder.current
+    broken = tmp_path / "broken.joblib"
+    broken.write_bytes(b"not a joblib file")
+
+    assert holder.reload_in_background("artifact", str(broken))
+    status = _wait(holder)
+
+    assert status["status"] == "error"
+    assert holder.current is old and holder.generation == 1
+    holder.current.predict_matrix(ROWS)
+
+
+def test_only_one_reload_runs_at_a_time(holder):
+    holder._reload_lock.acquire()
+    try:
+        assert not holder.reload_in_background("artifact")
+    finally:
+        holder._reload_lock.release()
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "../outside.joblib"])
+def test_paths_outside_the_artifact_directory_are_rejected(holder, tmp_path, path):
+    with pytest.raises(ValueError, match="FIRESHIELD_ARTIFACT_DIR"):
+        holder.reload_in_background("artifact", os.path.join(str(tmp_path), path))
+    assert not holder.reloading and holder.last_reload is None
+
+
+def test_symlinks_out_of_the_artifact_directory_are_rejected(holder, tmp_path, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside") / "model.joblib"
+    _save(str(outside), 1, "c" * 64)
+    (tmp_path / "link.joblib").symlink_to(outside)
+    with pytest.raises(ValueError, match="FIRESHIELD_ARTIFACT_DIR"):
+        holder.reload_in_background("artifact", str(tmp_path / "link.joblib"))
+
+
+def test_retraining_is_limited_to_the_configured_training_data(holder):
+    with pytest.raises(ValueError, match="FIRESHIELD_TRAIN_DATA"):
+        holder.reload_in_background("retrain", data_url="https://example.com/other.csv")
+    with pytest.raises(ValueError, match="Unknown reload source"):
+        holder.reload_in_background("pickle")
+    assert holder.last_reload is None
@@ -0,0 +1,58 @@
+"""pareto_front and select on small hand-built search results."""
+from tune import pareto_front, select
+
+
+def result(name, cv_accuracy, latency_ms, size_kb, engine="flat"):
+    return {"name": name, "cv_accuracy": cv_accuracy, "latency_ms": {engine: latency_ms, "sklearn": 1.0},
+            "best_engine": engine, "size_kb": size_kb}
+
+
+def names(results):
+    return [r["name"] for r in results]
+
+
+def test_front_drops_results_beaten_on_every_objective():
+    results = [
+        result("best", 0.95, 0.02, 100),
+        result("worse_everywhere", 0.90, 0.05, 200),
+        result("worse_on_one", 0.95, 0.02, 150),
+        result("fastest", 0.85, 0.01, 300),
+        result("smallest", 0.80, 0.30, 10),
+    ]
+    assert names(pareto_front(results)) == ["best", "fastest", "smallest"]
+
+
+def test_latency_is_read_from_the_best_engine():
+    sklearn_only = result("sklearn_only", 0.95, 0.5, 100, engine="sklearn")
+    flat = result("flat", 0.95, 0.02, 100)
+    assert names(pareto_front([sklearn_only, flat])) == ["flat"]
+
+
+def test_identical_results_do_not_dominate_each_other():
+    results = [result("a", 0.9, 0.02, 100), result("b", 0.9, 0.02, 100)]
+    assert names(pareto_front(results)) == ["a", "b"]
+
+
+def test_empty_results():
+    assert pareto_front([]) == []
+    assert select([]) is None
+
+
+def test_select_picks_the_most_accurate_result_within_budget():
+    front = [result("accurate", 0.95, 0.40, 500), result("fast", 0.90, 0.02, 50), result("tiny", 0.85, 0.05, 5)]
+    assert select(front)["name"] == "accurate"
+    assert select(front, latency_budget_ms=0.1)["name"] == "fast"
+    assert select(front, max_size_kb=10)["name"] == "tiny"
+    assert select(front, latency_budget_ms=0.02, max_size_kb=50)["name"] == "fast"
+
+
+def test_select_breaks_accuracy_ties_by_latency():
+    front = [result("slow", 0.9, 0.08, 10), result("quick", 0.9, 0.03, 90)]
+    assert select(front)["name"] == "quick"
+
+
+def test_select_returns_none_when_budgets_exclude_every_candidate():
+    front = [result("a", 0.95, 0.40, 500), result("b", 0.90, 0.02, 50)]
+    assert select(front, latency_budget_ms=0.01) is None
+    assert select(front, max_size_kb=1) is None
+    assert select(front, latency_budget_ms=0.1, max_size_kb=40) is None
@@ -0,0 +1,115 @@
+"""WeatherClient against the local Open-Meteo stub (weather_stub.py)."""
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+
+from weather_client import FORECAST_DAILY_VARIABLES, WeatherClient
+from weather_stub import current_payload, start_stub_server, stub_url, synthetic_rain
+
+COORDS = [(round(30 + i * 0.01, 4), -100.0) for i in range(25)]
+
+
+@pytest.fixture
+def server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+
+def _client(server, **kwargs) -> WeatherClient:
+    return WeatherClient(stub_url(server), forecast_url=stub_url(server, "forecast"), **kwargs)
+
+
+def test_daily_rain_batches_locations_and_keeps_input_order(server):
+    with _client(server, batch_size=10) as client:
+        series = client.daily_rain(COORDS, date(2026, 6, 1), "2026-06-10")
+
+    assert server.request_count == 3
+    assert len(series) == len(COORDS)
+    for (lat, lon), (days, rain) in zip(COORDS, series):
+        assert days[0] == np.datetime64("2026-06-01") and len(days) == 10
+        assert rain.tolist() == [synthetic_rain(lat, lon, str(day)) for day in days]
+
+
+def test_single_location_response_is_an_object(server):
+    with _client(server) as client:
+        (days, rain), = client.daily_rain(COORDS[:1], "2026-06-01", "2026-06-01")
+    assert rain.tolist() == [synthetic_rain(*COORDS[0], "2026-06-01")]
+
+
+def test_daily_rain_concurrency_is_bounded():
+    server = start_stub_server(delay=0.05)
+    try:
+        with _client(server, batch_size=2, max_concurrency=3) as client:
+            client.daily_rain(COORDS, "2026-06-01", "2026-06-02")
+    finally:
+        server.shutdown()
+    assert server.request_count == 13
+    # Batches overlap, but never more than max_concurrency of them
+    assert server.max_in_flight == 3
+
+
+def test_concurrency_of_one_fetches_sequentially():
+    server = start_stub_server(delay=0.01)
+    try:
+        with _client(server, batch_size=5, max_concurrency=1) as client:
+            client.daily_rain(COORDS, "2026-06-01", "2026-06-02")
+    finally:
+        server.shutdown()
+    assert server.request_count == 5
+    assert server.max_in_flight == 1
+
+
+def test_daily_rain_async_matches_daily_rain_with_bounded_concurrency():
+    server = start_stub_server(delay=0.05)
+    try:
+        with _client(server, batch_size=2, max_concurrency=3) as client:
+            expected = client.daily_rain(COORDS, "2026-06-01", "2026-06-05")
+            server.max_in_flight = 0
+            series = asyncio.run(client.daily_rain_async(COORDS, date(2026, 6, 1), "2026-06-05"))
+    finally:
+        server.shutdown()
+    assert server.request_count == 26
+    assert server.max_in_flight == 3
+    assert len(series) == len(COORDS)
+    for (days, rain), (expected_days, expected_rain) in zip(series, expected):
+        assert days.tolist() == expected_days.tolist() and rain.tolist() == expected_rain.tolist()
+
+
+def test_current_conditions_and_forecast_concurrency_is_bounded():
+    server = start_stub_server(delay=0.05)
+    try:
+        with _client(server, batch_size=2, max_concurrency=3) as client:
+            features = client.current_conditions(COORDS)
+            assert server.max_in_flight == 3
+            server.max_in_flight = 0
+            dates, forecast = client.daily_forecast(COORDS, days=3)
+            assert server.max_in_flight == 3
+    finally:
+        server.shutdown()
+    assert server.request_count == 26
+    assert features.shape == (len(COORDS), 4)
+    assert len(dates) == 3 and forecast.shape == (len(COORDS), 3, len(FORECAST_DAILY_VARIABLES))
+
+
+def test_current_conditions_are_in_feature_order(server):
+    with _client(server, batch_size=10) as client:
+        features = client.current_conditions(COORDS)
+
+    assert features.shape == (len(COORDS), 4)
+    assert server.request_count == 3
+    current = current_payload(*COORDS[7])
+    assert features[7].tolist() == [current["current"]["temperature_2m"],
+                                    current["current"]["relative_humidity_2m"],
+                                    current["current"]["wind_speed_10m"], current["daily"]["rain_sum"][0]]
+
+
+def test_daily_forecast_shape_and_day_limits(server):
+    with _client(server, batch_size=10) as client:
+        dates, features = client.daily_forecast(COORDS, days=5)
+        assert len(dates) == 5
+        assert features.shape == (len(COORDS), 5, len(FORECAST_DAILY_VARIABLES))
+        with pytest.raises(ValueError):
+            client.daily_forecast(COORDS, days=17)
@@ -0,0 +1,98 @@
+"""Offline record/replay of the weather client, recorded from the local Open-Meteo stub."""
+import json
+import threading
+from datetime import date
+
+import numpy as np
+import pytest
+
+from weather_fixture import RecordingClient, ReplayClient, WeatherFixture
+from weather_stub import start_stub_server, stub_url
+
+COORDS = [(30.0, -100.0), (30.5, -99.5), (31.0, -99.0)]
+
+
+@pytest.fixture
+def server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def recorded(server, tmp_path):
+    """Everything a live client fetched while recording, and the fixture file it wrote."""
+    path = str(tmp_path / "fixture.json")
+    with RecordingClient(path, base_url=stub_url(server), forecast_url=stub_url(server, "forecast"),
+                         batch_size=2) as client:
+        live = {
+            "rain": client.daily_rain(COORDS, "2026-06-01", "2026-06-20"),
+            "current": client.current_conditions(COORDS),
+            "forecast": client.daily_forecast(COORDS, 5),
+            "today": client.today(),
+        }
+    return path, live
+
+
+def test_replay_returns_what_was_recorded_without_network(recorded, server):
+    path, live = recorded
+    requests = server.request_count
+    client = ReplayClient(WeatherFixture.load(path))
+
+    assert client.today() == live["today"]
+    for (days, rain), (live_days, live_rain) in zip(client.daily_rain(COORDS, "2026-06-01", "2026-06-20"),
+                                                     live["rain"]):
+        assert days.tolist() == live_days.tolist() and rain.tolist() == live_rain.tolist()
+    np.testing.assert_array_equal(client.current_conditions(COORDS), live["current"])
+    dates, features = client.daily_forecast(COORDS, 5)
+    np.testing.assert_array_equal(dates, live["forecast"][0])
+    np.testing.assert_array_equal(features, live["forecast"][1])
+    assert server.request_count == requests
+
+
+def test_replay_reports_unrecorded_days_as_missing_and_refuses_the_network(recorded):
+    path, _ = recorded
+    client = ReplayClient(WeatherFixture.load(path))
+
+    (days, rain), = client.daily_rain(COORDS[:1], "2026-05-30", "2026-06-02")
+    assert np.isnan(rain[:2]).all() and not np.isnan(rain[2:]).any()
+    with pytest.raises(LookupError, match="FIRESHIELD_WEATHER_MODE=record"):
+        client.daily_rain([(45.0, 10.0)], "2026-06-01", "2026-06-02")
+    with pytest.raises(LookupError):
+        client.daily_forecast(COORDS, 16)
+    with pytest.raises(RuntimeError, match="offline"):
+        client._get_locations("http://example.com", COORDS, {})
+
+
+def test_recordings_accumulate_across_runs(recorded, server):
+    path, _ = recorded
+    with RecordingClient(path, base_url=stub_url(server), forecast_url=stub_url(server, "forecast")) as client:
+        client.daily_rain([(45.0, 10.0)], "2026-06-01", "2026-06-02")
+
+    fixture = WeatherFixture.load(path)
+    assert {"30.0000,-100.0000", "45.0000,10.0000"} <= set(fixture.daily_rain)
+    assert len(fixture.forecast) == len(COORDS)
+
+
+def test_concurrent_saves_never_share_a_temporary_file(tmp_path):
+    path = str(tmp_path / "fixture.json")
+    fixture = WeatherFixture(date(2026, 6, 1), {"30.0000,-100.0000": {"2026-06-01": 1.5}})
+    errors = []
+
+    def save_repeatedly():
+        try:
+            for _ in range(25):
+                fixture.save(path)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=save_repeatedly) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(path) as f:
+        assert json.load(f)["daily_rain"] == fixture.daily_rain
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fixture.json"]
@@ -0,0 +1,218 @@
+"""
+Cross-validated model search with accuracy, latency and size trade-offs.
+
+    python tune.py --data dataset.csv --workers 4
+    python tune.py --latency-budget-ms 0.5 --report tune_report.json --save fire_model.joblib
+
+Every candidate (random forests and extra-trees of several sizes and depths,
+plus histogram gradient boosting) is cross-validated on the training split in
+a process pool, refit on the whole training split and scored on the held-out
+test split that ForestFireModel.train() sets aside. Single-row latency and
+model size are then measured one candidate at a time in this process, so the
+timings are not skewed by the pool. Candidates nobody beats on all of CV
+accuracy, latency and size form the Pareto front; the selected model is the
+most accurate one on the front that fits the latency budget.
+"""
+import argparse
+import json
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from artifact import save_artifact
+from flat_forest import FlatForest, is_tree_ensemble
+from model import ForestFireModel
+
+ESTIMATORS = {
+    "random_forest": RandomForestClassifier,
+    "extra_trees": ExtraTreesClassifier,
+    "hist_gradient_boosting": HistGradientBoostingClassifier,
+}
+
+_data = None
+
+
+def candidate_grid(quick: bool = False) -> list:
+    """(name, estimator, params) for every configuration to try."""
+    sizes = [10, 50, 100] if quick else [10, 25, 50, 100, 200]
+    depths = [None, 8] if quick else [None, 4, 8, 16]
+    candidates = []
+    for estimator in ("random_forest", "extra_trees"):
+        for n_estimators in sizes:
+            for max_depth in depths:
+                params = {"n_estimators": n_estimators, "max_depth": max_depth, "random_state": 42}
+                candidates.append((f"{estimator}(n={n_estimators}, depth={max_depth})", estimator, params))
+    for max_iter in ([50] if quick else [50, 100, 200]):
+        params = {"max_iter": max_iter, "random_state": 42}
+        candidates.append((f"hist_gradient_boosting(iter={max_iter})", "hist_gradient_boosting", params))
+    return candidates
+
+
+def _init_worker(X_train, y_train, folds):
+    global _data
+    _data = X_train, y_train, folds
+
+
+def _evaluate(candidate):
+    """Cross-validate one candidate, then refit scaler + estimator on the full training split."""
+    name, estimator, params = candidate
+    X_train, y_train, folds = _data
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", ESTIMATORS[estimator](**params))])
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+
+    start = time.perf_counter()
+    scores = cross_val_score(pipeline, X_train, y_train, cv=cv)
+    pipeline.fit(X_train, y_train)
+    return {
+        "name": name,
+        "estimator": estimator,
+        "params": params,
+        "cv_accuracy": round(float(scores.mean()), 4),
+        "cv_accuracy_std": round(float(scores.std()), 4),
+        "fit_s": round(time.perf_counter() - start, 3),
+    }, pipeline
+
+
+def _latency_ms(predict, X: np.ndarray, repeat: int) -> float:
+    """Median single-row latency of ``predict`` in milliseconds."""
+    for row in X[:10]:
+        predict(row[None, :])
+    samples = []
+    for i in range(repeat):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        predict(row)
+        samples.append(time.perf_counter() - start)
+    return round(float(np.median(samples)) * 1000, 4)
+
+
+def measure(result: dict, pipeline: Pipeline, X_test: np.ndarray, y_test: np.ndarray, repeat: int = 500) -> dict:
+    """Add held-out accuracy, per-engine single-row latency and model size to ``result``."""
+    scaler, model = pipeline.named_steps["scaler"], pipeline.named_steps["model"]
+    result["test_accuracy"] = round(float((model.predict(scaler.transform(X_test)) == y_test).mean()), 4)
+
+    latency = {"sklearn": _latency_ms(lambda row: model.predict_proba(scaler.transform(row)), X_test, repeat)}
+    if is_tree_ensemble(model):
+        flat_model = FlatForest.from_sklearn(model, scaler)
+        latency["flat"] = _latency_ms(flat_model.predict_proba, X_test, repeat)
+        result["nodes"] = int(sum(tree.tree_.node_count for tree in model.estimators_))
+    result["latency_ms"] = latency
+    result["best_engine"] = min(latency, key=latency.get)
+    result["size_kb"] = round(len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024, 1)
+    return result
+
+
+def pareto_front(results: list) -> list:
+    """Results not dominated on (higher CV accuracy, lower best-engine latency, smaller size)."""
+    def objectives(result):
+        return -result["cv_accuracy"], result["latency_ms"][result["best_engine"]], result["size_kb"]
+
+    front = []
+    for result in results:
+        mine = objectives(result)
+        dominated = any(
+            all(a <= b for a, b in zip(objectives(other), mine)) and objectives(other) != mine
+            for other in results
+        )
+        if not dominated:
+            front.append(result)
+    return front
+
+
+def select(front: list, latency_budget_ms: float = None, max_size_kb: float = None):
+    """Most accurate Pareto-optimal result within the budgets (faster wins ties), or None."""
+    eligible = [
+        result for result in front
+        if (latency_budget_ms is None or result["latency_ms"][result["best_engine"]] <= latency_budget_ms)
+        and (max_size_kb is None or result["size_kb"] <= max_size_kb)
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda result: (result["cv_accuracy"], -result["latency_ms"][result["best_engine"]]))
+
+
+def search(data_url: str, workers: int = 1, folds: int = 5, quick: bool = False, repeat: int = 500):
+    """
+    Run the whole search.
+
+    Returns:
+        tuple: (results sorted by CV accuracy, fitted pipelines by name, ForestFireModel with the data hash).
+    """
+    fire_model = ForestFireModel(data_url=data_url)
+    df = fire_model.load_data()
+    fire_model.data_hash = fire_model.data_fingerprint(df)
+    # Same split as ForestFireModel.train(), so test accuracy is comparable with the served model
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[fire_model.features], df[fire_model.target_column], test_size=0.2, random_state=42)
+
+    candidates = candidate_grid(quick)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(X_train.to_numpy(np.float64), y_train.to_numpy(), folds)) as pool:
+        evaluated = list(pool.map(_evaluate, candidates))
+
+    X_test_array = X_test.to_numpy(np.float64)
+    results, pipelines = [], {}
+    for result, pipeline in evaluated:
+        results.append(measure(result, pipeline, X_test_array, y_test.to_numpy(), repeat))
+        pipelines[result["name"]] = pipeline
+    results.sort(key=lambda result: -result["cv_accuracy"])
+    return results, pipelines, fire_model
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="dataset.csv", help="CSV path or URL to train on")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used for cross-validation")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--quick", action="store_true", help="Smaller candidate grid")
+    parser.add_argument("--latency-budget-ms", type=float, help="Single-row latency budget for selection")
+    parser.add_argument("--max-size-kb", type=float, help="Model size budget for selection")
+    parser.add_argument("--report", help="Write every result and the selection as JSON")
+    parser.add_argument("--save", help="Write the selected model as an artifact to this path")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results, pipelines, fire_model = search(args.data, args.workers, args.folds, args.quick)
+    front = pareto_front(results)
+    selected = select(front, args.latency_budget_ms, args.max_size_kb)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'':2}{'candidate':42}{'cv acc':>14}{'test acc':>10}{'latency ms':>16}{'size KB':>10}")
+    for result in results:
+        marker = ">" if result is selected else ("*" if result in front else "")
+        latency = result["latency_ms"][result["best_engine"]]
+        print(f"{marker:2}{result['name']:42}{result['cv_accuracy']:>8.4f} ±{result['cv_accuracy_std']:.3f}"
+              f"{result['test_accuracy']:>10.4f}{latency:>9.4f} {result['best_engine']:6}{result['size_kb']:>10.1f}")
+    print(f"✅ {len(results)} candidates evaluated in {elapsed:.1f}s; * = Pareto front, > = selected")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({
+                "data_hash": fire_model.data_hash,
+                "latency_budget_ms": args.latency_budget_ms,
+                "max_size_kb": args.max_size_kb,
+                "results": results,
+                "pareto_front": [result["name"] for result in front],
+                "selected": selected["name"] if selected else None,
+            }, f, indent=2)
+        print(f"✅ Report saved to: {args.report}")
+
+    if selected is None:
+        print("No Pareto-optimal candidate fits the budget; nothing selected")
+    elif args.save:
+        pipeline = pipelines[selected["name"]]
+        save_artifact(pipeline.named_steps["model"], pipeline.named_steps["scaler"], fire_model.features,
+                      fire_model.data_hash, args.save)
+        print(f"✅ Selected {selected['name']} saved to: {args.save} (serve with FIRESHIELD_ENGINE={selected['best_engine']})")
+        if not is_tree_ensemble(pipeline.named_steps["model"]):
+            print("   not a forest of decision trees: no flat/compact companions, only the sklearn engine can serve it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Long-lived, pooled Open-Meteo client for many locations at once.
+
+Coordinates are sent in batches using Open-Meteo's multi-location support
+(comma-separated latitude/longitude lists), so hundreds of stations cost a
+handful of HTTP requests. The batches of one call are fetched on a bounded
+number of threads. The blocking methods are called from FastAPI's threadpool
+(plain ``def`` endpoints, or asyncio.to_thread as the risk map does);
+daily_rain_async is the asyncio entry point for coroutines.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import stage
+
+ARCHIVE_URL = os.environ.get("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+# "live", "record" (live, saving responses to the fixture) or "replay" (fixture only); see weather_fixture.py
+WEATHER_MODE = os.environ.get("FIRESHIELD_WEATHER_MODE", "live")
+WEATHER_FIXTURE = os.environ.get("FIRESHIELD_WEATHER_FIXTURE", "weather_fixture.json")
+
+Coordinate = Tuple[float, float]
+
+# Daily forecast variables in the model's feature order: the day's hottest, driest
+# and windiest values (the dataset's readings are taken at the hot part of the day)
+FORECAST_DAILY_VARIABLES = ("temperature_2m_max", "relative_humidity_2m_min", "wind_speed_10m_max", "rain_sum")
+MAX_FORECAST_DAYS = 16
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) else datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class WeatherClient:
+    """
+    Pooled HTTP client for daily rain history (archive) and current conditions (forecast).
+
+    Parameters:
+        base_url (str): Archive endpoint (point this at weather_stub.py for offline runs).
+        forecast_url (str): Forecast endpoint used by current_conditions.
+        batch_size (int): Locations per HTTP request.
+        max_concurrency (int): Upper bound on in-flight requests per call.
+        retries (int): Retries for connection errors and 429/5xx responses.
+        backoff_factor (float): Exponential backoff between retries.
+        timeout (float): Per-request timeout in seconds.
+    """
+
+    def __init__(self, base_url: str = ARCHIVE_URL, batch_size: int = 50, max_concurrency: int = 8,
+                 retries: int = 5, backoff_factor: float = 0.2, timeout: float = 30.0,
+                 forecast_url: str = FORECAST_URL):
+        self.base_url = base_url
+        self.forecast_url = forecast_url
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _batches(self, coords: Sequence[Coordinate]):
+        for start in range(0, len(coords), self.batch_size):
+            yield coords[start:start + self.batch_size]
+
+    def _get_locations(self, url: str, coords: Sequence[Coordinate], params: dict) -> list:
+        params = {
+            "latitude": ",".join(f"{lat:.4f}" for lat, _ in coords),
+            "longitude": ",".join(f"{lon:.4f}" for _, lon in coords),
+            "timezone": "GMT",
+            **params,
+        }
+        with stage("weather", "http_fetch"):
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+        with stage("weather", "decode"):
+            payload = response.json()
+        # A single location comes back as an object, several as a list in request order
+        locations = payload if isinstance(payload, list) else [payload]
+        if len(locations) != len(coords):
+            raise ValueError(f"Expected {len(coords)} locations from {url}, got {len(locations)}")
+        return locations
+
+    def _fetch_batch(self, coords: Sequence[Coordinate], start_date: date, end_date: date):
+        locations = self._get_locations(self.base_url, coords, {
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "daily": "rain_sum",
+        })
+        series = []
+        for location in locations:
+            daily = location["daily"]
+            days = np.array(daily["time"], dtype="datetime64[D]")
+            rain = np.array(daily["rain_sum"], dtype=np.float64)  # nulls become NaN
+            series.append((days, rain))
+        return series
+
+    def _map_batches(self, fetch, coords: Sequence[Coordinate]) -> list:
+        """``fetch(batch)`` for every batch of ``coords`` in order, at most ``max_concurrency`` in flight."""
+        batches = list(self._batches(list(coords)))
+        if len(batches) <= 1 or self.max_concurrency <= 1:
+            return [fetch(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            return list(pool.map(fetch, batches))
+
+    def _fetch_current_batch(self, coords: Sequence[Coordinate]) -> list:
+        rows = []
+        for location in self._get_locations(self.forecast_url, coords, {
+            "current": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+            "daily": "rain_sum",
+            "forecast_days": 1,
+        }):
+            current = location["current"]
+            rows.append((current["temperature_2m"], current["relative_humidity_2m"],
+                         current["wind_speed_10m"], location["daily"]["rain_sum"][0]))
+        return rows
+
+    def _fetch_forecast_batch(self, coords: Sequence[Coordinate], days: int):
+        locations = self._get_locations(self.forecast_url, coords, {
+            "daily": ",".join(FORECAST_DAILY_VARIABLES),
+            "forecast_days": days,
+        })
+        with stage("weather", "decode"):
+            dates = np.array(locations[0]["daily"]["time"], dtype="datetime64[D]")
+            blocks = [np.array([location["daily"][name] for name in FORECAST_DAILY_VARIABLES],
+                               dtype=np.float64).T for location in locations]
+        return dates, blocks
+
+    def current_conditions(self, coords: Sequence[Coordinate]) -> np.ndarray:
+        """
+        Current temperature (°C), relative humidity (%), wind speed (km/h) and today's rain (mm).
+
+        Batches are fetched concurrently, at most ``max_concurrency`` at a time.
+
+        Returns:
+            np.ndarray: (n, 4) float64 array in input order, the feature layout the model expects.
+        """
+        rows = [row for batch in self._map_batches(self._fetch_current_batch, coords) for row in batch]
+        return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+    def daily_forecast(self, coords: Sequence[Coordinate], days: int = 7) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Daily forecast from today for ``days`` days, one request per batch of locations.
+
+        Batches are fetched concurrently, at most ``max_concurrency`` at a time.
+
+        Returns:
+            tuple: (dates, features) where dates is a (days,) datetime64[D] array and
+            features an (n, days, 4) float64 array of FORECAST_DAILY_VARIABLES
+            (°C, %, km/h, mm), NaN where the forecast has no value.
+        """
+        if not 1 <= days <= MAX_FORECAST_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_FORECAST_DAYS}")
+        results = self._map_batches(lambda batch: self._fetch_forecast_batch(batch, days), coords)
+        if not results:
+            return np.empty(0, dtype="datetime64[D]"), np.empty((0, days, len(FORECAST_DAILY_VARIABLES)))
+        return results[0][0], np.stack([block for _, blocks in results for block in blocks])
+
+    def daily_rain(self, coords: Sequence[Coordinate], start_date, end_date) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Daily rain totals (days, rain_mm) for each coordinate, in input order.
+
+        Batches are fetched concurrently, at most ``max_concurrency`` at a time.
+        """
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        results = self._map_batches(lambda batch: self._fetch_batch(batch, start_date, end_date), coords)
+        return [item for batch in results for item in batch]
+
+    async def daily_rain_async(self, coords: Sequence[Coordinate], start_date,
+                               end_date) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        daily_rain for asyncio callers: each batch is fetched on a worker thread, at most
+        ``max_concurrency`` at a time, so the event loop is never blocked.
+        """
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_batch, batch, start_date, end_date)
+
+        results = await asyncio.gather(*(fetch(batch) for batch in self._batches(list(coords))))
+        return [item for batch in results for item in batch]
+
+    def today(self) -> date:
+        """The current UTC date; the day lookback windows end on."""
+        return datetime.now(timezone.utc).date()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> WeatherClient:
+    """Process-wide WeatherClient for WEATHER_MODE, created on first use and reused afterwards."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            if WEATHER_MODE == "replay":
+                from weather_fixture import ReplayClient, WeatherFixture
+                _default_client = ReplayClient(WeatherFixture.load(WEATHER_FIXTURE))
+            elif WEATHER_MODE == "record":
+                from weather_fixture import RecordingClient
+                _default_client = RecordingClient(WEATHER_FIXTURE)
+            elif WEATHER_MODE == "live":
+                _default_client = WeatherClient()
+            else:
+                raise ValueError(f"Unknown FIRESHIELD_WEATHER_MODE {WEATHER_MODE!r}; "
+                                 f"expected 'live', 'record' or 'replay'")
+        return _default_client
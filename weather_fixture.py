@@ -0,0 +1,193 @@
+"""
+Offline record and replay of Open-Meteo data, so FDI and the risk map run without network.
+
+    FIRESHIELD_WEATHER_MODE=record python rain.py          # fetch live, save weather_fixture.json
+    FIRESHIELD_WEATHER_MODE=replay uvicorn main:app         # serve from the fixture only
+
+(FIRESHIELD_WEATHER_FIXTURE picks another file.) A fixture holds daily rain per
+location and day, current conditions and the daily forecast per location, and
+the date it was recorded on. Replay serves any date range out of those days,
+with days that were never recorded coming back as nulls, like days the archive
+has not filled in yet. "Today" is pinned to the recording date, so
+days-since-rain results are reproducible. Replay never opens a connection.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from metrics import stage
+from weather_client import Coordinate, WeatherClient, _as_date
+
+
+def _key(latitude: float, longitude: float) -> str:
+    return f"{latitude:.4f},{longitude:.4f}"
+
+
+class WeatherFixture:
+    """
+    Recorded weather: {location: {day: rain_mm}}, {location: [temperature, RH, wind, rain]},
+    {location: [[temperature max, RH min, wind max, rain], ...]} from the recording date, and that date.
+
+    Parameters:
+        today (date): The date the data was recorded on; replay treats it as today.
+    """
+
+    def __init__(self, today: Optional[date] = None, daily_rain: dict = None, current: dict = None,
+                 forecast: dict = None):
+        self.today = today or date.today()
+        self.daily_rain = daily_rain or {}
+        self.current = current or {}
+        self.forecast = forecast or {}
+
+    @classmethod
+    def load(cls, path: str) -> "WeatherFixture":
+        with open(path) as f:
+            payload = json.load(f)
+        return cls(_as_date(payload["today"]), payload["daily_rain"], payload["current"], payload.get("forecast"))
+
+    def save(self, path: str) -> None:
+        """Write atomically, so readers never see a partial file."""
+        # Unique per process and thread, so concurrent writers never share a temporary file
+        tmp_path = f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"today": self.today.isoformat(), "daily_rain": self.daily_rain, "current": self.current,
+                           "forecast": self.forecast}, f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def synthetic(cls, coords: Sequence[Coordinate], today: date, lookback_days: int = 90) -> "WeatherFixture":
+        """The weather_stub.py data for ``coords`` as a fixture, for benchmarks without a recording."""
+        from weather_client import FORECAST_DAILY_VARIABLES, MAX_FORECAST_DAYS
+        from weather_stub import current_payload, forecast_payload, synthetic_rain
+
+        fixture = cls(today)
+        days = [(today - timedelta(days=offset)).isoformat() for offset in range(lookback_days, -1, -1)]
+        for lat, lon in coords:
+            fixture.daily_rain[_key(lat, lon)] = {day: synthetic_rain(lat, lon, day) for day in days}
+            current = current_payload(lat, lon)["current"]
+            fixture.current[_key(lat, lon)] = [current["temperature_2m"], current["relative_humidity_2m"],
+                                               current["wind_speed_10m"], fixture.daily_rain[_key(lat, lon)][days[-1]]]
+            daily = forecast_payload(lat, lon, MAX_FORECAST_DAYS, today)["daily"]
+            fixture.forecast[_key(lat, lon)] = [list(row) for row in
+                                                zip(*(daily[name] for name in FORECAST_DAILY_VARIABLES))]
+        return fixture
+
+    def add_daily(self, latitude: float, longitude: float, days: np.ndarray, rain: np.ndarray) -> None:
+        recorded = self.daily_rain.setdefault(_key(latitude, longitude), {})
+        for day, mm in zip(days.astype(str).tolist(), rain.tolist()):
+            if mm == mm:  # leave unfilled (NaN) days out so replay reports them as missing
+                recorded[day] = mm
+
+    def daily(self, latitude: float, longitude: float, start_date: date, end_date: date):
+        """(days, rain_mm) between two dates inclusive, NaN where nothing was recorded."""
+        recorded = self.daily_rain.get(_key(latitude, longitude))
+        if recorded is None:
+            raise LookupError(f"No rain history recorded for {_key(latitude, longitude)}; "
+                              f"record it first with FIRESHIELD_WEATHER_MODE=record")
+        days = np.arange(np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1)
+        rain = np.array([recorded.get(day, np.nan) for day in days.astype(str).tolist()], dtype=np.float64)
+        return days, rain
+
+    def current_row(self, latitude: float, longitude: float) -> list:
+        try:
+            return self.current[_key(latitude, longitude)]
+        except KeyError:
+            raise LookupError(f"No current conditions recorded for {_key(latitude, longitude)}; "
+                              f"record them first with FIRESHIELD_WEATHER_MODE=record") from None
+
+    def forecast_rows(self, latitude: float, longitude: float, days: int) -> list:
+        rows = self.forecast.get(_key(latitude, longitude))
+        if rows is None or len(rows) < days:
+            raise LookupError(f"No {days}-day forecast recorded for {_key(latitude, longitude)}; "
+                              f"record it first with FIRESHIELD_WEATHER_MODE=record")
+        return rows[:days]
+
+
+class ReplayClient(WeatherClient):
+    """WeatherClient answering from a WeatherFixture; any attempt to reach the network raises."""
+
+    def __init__(self, fixture: WeatherFixture, **kwargs):
+        super().__init__(**kwargs)
+        self.fixture = fixture
+
+    def today(self) -> date:
+        return self.fixture.today
+
+    def _get_locations(self, url: str, coords: Sequence[Coordinate], params: dict) -> list:
+        raise RuntimeError(f"ReplayClient is offline and cannot fetch {url}")
+
+    def _fetch_batch(self, coords: Sequence[Coordinate], start_date: date, end_date: date):
+        with stage("weather", "replay"):
+            return [self.fixture.daily(lat, lon, start_date, end_date) for lat, lon in coords]
+
+    def current_conditions(self, coords: Sequence[Coordinate]) -> np.ndarray:
+        with stage("weather", "replay"):
+            rows = [self.fixture.current_row(lat, lon) for lat, lon in coords]
+        return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+    def daily_forecast(self, coords: Sequence[Coordinate], days: int = 7):
+        with stage("weather", "replay"):
+            features = np.array([self.fixture.forecast_rows(lat, lon, days) for lat, lon in coords],
+                                dtype=np.float64).reshape(len(coords), days, 4)
+        dates = np.arange(np.datetime64(self.fixture.today, "D"), np.datetime64(self.fixture.today, "D") + days)
+        return dates, features
+
+
+class RecordingClient(WeatherClient):
+    """
+    Live WeatherClient that also writes everything it fetches into a fixture file.
+
+    New data is merged into whatever the file holds when it is saved, so separate
+    recording runs accumulate into one fixture. Record from a single process.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _record(self, update) -> None:
+        with self._lock:
+            fixture = WeatherFixture.load(self.path) if os.path.exists(self.path) else WeatherFixture()
+            fixture.today = self.today()
+            update(fixture)
+            fixture.save(self.path)
+
+    def _fetch_batch(self, coords: Sequence[Coordinate], start_date: date, end_date: date):
+        series = super()._fetch_batch(coords, start_date, end_date)
+
+        def update(fixture):
+            for (lat, lon), (days, rain) in zip(coords, series):
+                fixture.add_daily(lat, lon, days, rain)
+
+        self._record(update)
+        return series
+
+    def current_conditions(self, coords: Sequence[Coordinate]) -> np.ndarray:
+        conditions = super().current_conditions(coords)
+
+        def update(fixture):
+            for (lat, lon), row in zip(coords, conditions.tolist()):
+                fixture.current[_key(lat, lon)] = row
+
+        self._record(update)
+        return conditions
+
+    def daily_forecast(self, coords: Sequence[Coordinate], days: int = 7):
+        dates, features = super().daily_forecast(coords, days)
+
+        def update(fixture):
+            for (lat, lon), rows in zip(coords, features.tolist()):
+                fixture.forecast[_key(lat, lon)] = rows
+
+        self._record(update)
+        return dates, features
@@ -0,0 +1,164 @@
+"""
+Local stand-in for the Open-Meteo archive and forecast APIs, for tests and benchmarks.
+
+Serves deterministic synthetic daily rain (/v1/archive), and current conditions
+or a daily forecast (/v1/forecast) for any coordinates, including the comma-separated
+multi-location form, so WeatherClient can run without network:
+
+    python weather_stub.py --port 8099
+    OPEN_METEO_ARCHIVE_URL=http://127.0.0.1:8099/v1/archive \
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:8099/v1/forecast uvicorn main:app
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def synthetic_rain(latitude: float, longitude: float, day: str) -> float:
+    """Deterministic rain amount (mm) for a location and day; roughly one day in four is wet."""
+    seed = zlib.crc32(f"{latitude:.4f},{longitude:.4f},{day}".encode())
+    if seed % 4:
+        return 0.0
+    return round((seed >> 8) % 400 / 10, 1)
+
+
+def location_payload(latitude: float, longitude: float, start_date: str, end_date: str) -> dict:
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "GMT",
+        "daily_units": {"time": "iso8601", "rain_sum": "mm"},
+        "daily": {"time": days, "rain_sum": [synthetic_rain(latitude, longitude, day) for day in days]},
+    }
+
+
+def current_payload(latitude: float, longitude: float) -> dict:
+    """Deterministic current conditions for a location, within the ranges of dataset.csv."""
+    seed = zlib.crc32(f"{latitude:.4f},{longitude:.4f}".encode())
+    today = datetime.now(timezone.utc).date().isoformat()
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "GMT",
+        "current": {
+            "temperature_2m": 20 + seed % 260 / 10,
+            "relative_humidity_2m": 20 + (seed >> 9) % 71,
+            "wind_speed_10m": 6 + (seed >> 17) % 250 / 10,
+        },
+        "daily": {"time": [today], "rain_sum": [synthetic_rain(latitude, longitude, today)]},
+    }
+
+
+def forecast_payload(latitude: float, longitude: float, days: int, today=None) -> dict:
+    """Deterministic daily forecast from ``today`` for ``days`` days, as the weather_client variables."""
+    today = today or datetime.now(timezone.utc).date()
+    dates = [(today + timedelta(days=i)).isoformat() for i in range(days)]
+    seeds = [zlib.crc32(f"{latitude:.4f},{longitude:.4f},{day},forecast".encode()) for day in dates]
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "GMT",
+        "daily": {
+            "time": dates,
+            "temperature_2m_max": [22 + seed % 200 / 10 for seed in seeds],
+            "relative_humidity_2m_min": [20 + (seed >> 9) % 61 for seed in seeds],
+            "wind_speed_10m_max": [6 + (seed >> 17) % 250 / 10 for seed in seeds],
+            "rain_sum": [synthetic_rain(latitude, longitude, day) for day in dates],
+        },
+    }
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        forecast = url.path.endswith("/forecast")
+        try:
+            latitudes = [float(v) for v in query["latitude"][0].split(",")]
+            longitudes = [float(v) for v in query["longitude"][0].split(",")]
+            if not forecast:
+                start_date, end_date = query["start_date"][0], query["end_date"][0]
+            if len(latitudes) != len(longitudes):
+                raise ValueError("latitude and longitude must have the same number of elements")
+        except (KeyError, ValueError) as exc:
+            self._send(400, {"error": True, "reason": str(exc)})
+            return
+
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            time.sleep(self.server.delay)
+            if forecast and "current" in query:
+                locations = [current_payload(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+            elif forecast:
+                days = int(query.get("forecast_days", ["7"])[0])
+                locations = [forecast_payload(lat, lon, days) for lat, lon in zip(latitudes, longitudes)]
+            else:
+                locations = [location_payload(lat, lon, start_date, end_date)
+                             for lat, lon in zip(latitudes, longitudes)]
+            self._send(200, locations if len(locations) > 1 else locations[0])
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _send(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _stub_server(host: str, port: int, delay: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _ArchiveHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = delay
+    return server
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread and return the server.
+
+    Use ``server.server_address`` for the bound port, ``server.request_count``
+    to check batching, ``server.max_in_flight`` (with a ``delay`` in seconds per
+    request, so requests overlap) to check concurrency limits, and
+    ``server.shutdown()`` to stop it.
+    """
+    server = _stub_server(host, port, delay)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server: ThreadingHTTPServer, endpoint: str = "archive") -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1/{endpoint}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic Open-Meteo archive responses.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    server = _stub_server(args.host, args.port)
+    print(f"Open-Meteo stub listening on http://{args.host}:{args.port}/v1/archive and /v1/forecast")
+    server.serve_forever()